@@ -1,168 +1,26 @@
 import tkinter as tk #
 from tkinter import filedialog, messagebox, scrolledtext, ttk
-import requests
 import os
-import hashlib
 import json
-from dotenv import load_dotenv
-from datetime import datetime, timedelta
-
-# Carrega variáveis do .env
-load_dotenv()
-deepseek_api_key = os.getenv("DEEPSEEK_API_KEY")
-FEEDBACK_FILE = "feedback_logs.json"
-
-# Cache de resultados com expiração
-class ResultCache:
-    def __init__(self, max_size=100, ttl_hours=24):
-        self.cache = {}
-        self.max_size = max_size
-        self.ttl = timedelta(hours=ttl_hours)
-    
-    def add(self, key, value):
-        if len(self.cache) >= self.max_size:
-            self.cleanup()
-        self.cache[key] = {
-            'value': value,
-            'timestamp': datetime.now()
-        }
-    
-    def get(self, key):
-        item = self.cache.get(key)
-        if item and (datetime.now() - item['timestamp']) < self.ttl:
-            return item['value']
-        return None
-    
-    def cleanup(self):
-        oldest_key = min(self.cache.keys(), key=lambda k: self.cache[k]['timestamp'])
-        del self.cache[oldest_key]
-
-cache_resultados = ResultCache()
-
-# Gera um hash único baseado no input
-def gerar_hash(input_str):
-    return hashlib.md5(input_str.encode("utf-8")).hexdigest()
-
-# Função para montar bloco reduzido do hardware
-def montar_bloco_hardware(banco_json, nome_hardware):
-    if nome_hardware in banco_json:
-        hw = banco_json[nome_hardware]
-        bloco = f"""
-Hardware: {nome_hardware}
-Softwares: {', '.join(hw['Softwares'])}
-Regiões: {', '.join(hw['Regioes'] if isinstance(hw['Regioes'], list) else hw['Regioes'].keys())}
-Androids disponíveis: {', '.join(hw['Androids_disponiveis'])}
-Android mais recente: {hw['Android_mais_recente']}
-Tecnologias suportadas: {json.dumps(hw['Tecnologias_suportadas'], indent=2)}
-"""
-        return bloco.strip()
-    return "Hardware não encontrado."
-
-def validar_estrutura_input(input_json):
-    campos_obrigatorios = [
-        "Hardware", "Software", "Regiao_Execucao",
-        "Versao_Android", "WiFi", "NFC", "Bluetooth", "SIM", "Rede"
-    ]
-    for campo in campos_obrigatorios:
-        if campo not in input_json:
-            raise ValueError(f"Campo obrigatório faltando: {campo}")
-
-def comparar_versoes(versao_input, versao_db):
-    try:
-        # Extrai números e pontos para comparação
-        v_input = float(''.join(filter(lambda x: x.isdigit() or x == '.', versao_input)))
-        v_db = float(''.join(filter(lambda x: x.isdigit() or x == '.', versao_db)))
-        return v_input >= v_db
-    except:
-        return False
-
-def validar_relacao_software_regiao(banco, hardware, software, regiao):
-    hw_data = banco.get(hardware, {})
-    regioes = hw_data.get("Regioes", {})
-    
-    if isinstance(regioes, dict):
-        # Caso dicionário: verifica se o software está na lista da região
-        if regiao in regioes:
-            return software in regioes[regiao]
-        return False
-    elif isinstance(regioes, list):
-        # Caso lista: verifica apenas se a região existe
-        return regiao in regioes
-    return False
-
-# Função para análise via DeepSeek
-def analisar_deepseek(banco_de_dados, input_de_teste):
-    headers = {
-        "Authorization": f"Bearer {deepseek_api_key}",
-        "Content-Type": "application/json"
-    }
-    
-    payload = {
-        "model": "deepseek-chat",
-        "messages": [
-            {
-                "role": "system", 
-                "content": """Você é um validador técnico. Formato OBRIGATÓRIO:
-
-RESULTADOS:
-- HARDWARE: PASS/FAIL [valor]
-- SOFTWARE: PASS/FAIL [valor]
-- RELAÇÃO_SOFTWARE_REGIAO: PASS/FAIL [Software/Região] 
-  → Se 'Regioes' for dicionário: FAIL se software não estiver na lista da região
-  → Se 'Regioes' for lista: FAIL se região não existir
-- VERSAO_ANDROID: PASS/FAIL [valor]
-- WIFI: PASS/FAIL [valor]
-- NFC: PASS/FAIL [valor]
-- BLUETOOTH: PASS/FAIL [valor]
-- SIM: PASS/FAIL [valor]
-- REDE: PASS/FAIL [valor]
-
-REGRAS RÍGIDAS:
-1. Para RELAÇÃO_SOFTWARE_REGIAO:
-   - Caso 1: Se 'Regioes' for um dicionário {região: [softwares]}, o software deve estar na lista da região especificada.
-   - Caso 2: Se 'Regioes' for uma lista [regiões], a região do input deve existir na lista.
-2. Para tecnologias (WiFi, NFC, etc.): comparação exata de valores entre aspas. Exemplo: se o valor do input for 2.4GHz e no banco tiver uma das opções como 2.4GHZ, considere como PASS.
-3. Sempre mostre o valor esperado no banco em caso de FAIL."""
-            },
-            {
-                "role": "user", 
-                "content": f"""Dados para análise:
-
-BANCO DE DADOS:
-{json.dumps(banco_de_dados, indent=2)}
-
-INPUT:
-{json.dumps(input_de_teste, indent=2)}
-
-INSTRUÇÕES:
-1. Para cada campo no input, verifique no banco
-2. Seja rigoroso nas comparações
-3. Mostre valores reais do banco em caso de FAIL"""
-            }
-        ],
-        "temperature": 0,
-        "max_tokens": 800
-    }
-
-    try:
-        response = requests.post(
-            "https://api.deepseek.com/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=60
-        )
-        response.raise_for_status()
-        return response.json()['choices'][0]['message']['content']
-    except Exception as e:
-        return f"ERRO: {str(e)}"
-
+import time
+from datetime import datetime
+from cache_resultados import ResultCachePersistente, gerar_chave_cache, impressao_digital_banco
+from indice_banco import obter_indice
+from historico_resultados import MOTOR_LOCAL, HistoricoResultados, resumo_conteudo
+from motor_regras import rotear_campos, validar_estrutura_input
+from registro_feedback import RegistroFeedback
+from correcoes import CacheCorrecoes
+from resultados import ORIGEM_LOCAL_INCERTO, contar_origens, de_json, falhas, formatar_resultados, para_dicionarios, para_json
+from metricas import metricas
+from tarefas_ui import ExecutorEmSegundoPlano, abrir_janela_metricas
+from cliente_deepseek import MODELO_DEEPSEEK, VERSAO_PROMPT_HIBRIDO, completar_com_deepseek, postar_deepseek
+
+cache_resultados = ResultCachePersistente()
+registro_feedback = RegistroFeedback() # Na primeira execução importa o feedback_logs.json antigo
+correcoes = CacheCorrecoes(registro_feedback) # Vereditos corrigidos pelos feedbacks, aplicados antes de chamar a API
+historico = HistoricoResultados() # Cada análise concluída fica gravada, já com as correções aplicadas
 
 def enviar_feedback(resultado_original, feedback_usuario, tipo_feedback):
-    headers = {
-        "Authorization": f"Bearer {deepseek_api_key}",
-        "Content-Type": "application/json"
-    }
-    
     # Mapeia o tipo de feedback para uma mensagem mais específica
     tipo_mensagem = {
         "correcao": "Correção de resultado incorreto",
@@ -172,7 +30,7 @@ def enviar_feedback(resultado_original, feedback_usuario, tipo_feedback):
     }.get(tipo_feedback, "Feedback geral")
     
     payload = {
-        "model": "deepseek-chat",
+        "model": MODELO_DEEPSEEK,
         "messages": [
             {
                 "role": "system",
@@ -188,94 +46,123 @@ def enviar_feedback(resultado_original, feedback_usuario, tipo_feedback):
     }
 
     try:
-        response = requests.post(
-            "https://api.deepseek.com/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
-        resposta = response.json()['choices'][0]['message']['content']
+        resposta = postar_deepseek(payload, timeout=30)
         return f"Feedback ({tipo_mensagem}) enviado com sucesso!\nResposta: {resposta}"
     except Exception as e:
         return f"Erro ao enviar feedback: {str(e)}"
 
 
 
-def salvar_feedback(tipo, feedback, resultado_original, resposta_api):
-    "Armazena feedback em um arquivo JSON"
+def salvar_feedback(tipo, feedback, resultado_original, resposta_api, impressao_banco=None):
+    "Acrescenta o feedback ao registro (SQLite, só de acréscimo: não relê nem regrava os anteriores)"
     novo_registro = {
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "tipo": tipo,
         "feedback": feedback,
-        "resultado_original": resultado_original,
-        "resposta_api": resposta_api
+        "resultado_original": resultado_original if isinstance(resultado_original, str) else formatar_resultados(resultado_original),
+        "resposta_api": resposta_api,
+        "impressao_banco": impressao_banco # Entrada do hardware no banco usada na análise: a correção só vale para ela
     }
+    if not isinstance(resultado_original, str):
+        novo_registro["resultados"] = para_dicionarios(resultado_original) # Campo a campo, para consultas sem reler o texto
 
-    try:
-        # Tenta carregar feedbacks existentes
-        with open(FEEDBACK_FILE, "r", encoding="utf-8") as f:
-            dados = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        dados = {"feedbacks": []}
-
-    dados["feedbacks"].append(novo_registro)
+    registro_feedback.adicionar(novo_registro)
+    correcoes.registrar(novo_registro) # Já vale para a próxima análise
 
-    with open(FEEDBACK_FILE, "w", encoding="utf-8") as f:
-        json.dump(dados, f, indent=2, ensure_ascii=False)
 
 
 
 
 
-
-def executar_analise():
-    caminho = input_path_var.get()
-    if not caminho:
-        messagebox.showwarning("Aviso", "Selecione um arquivo de input primeiro.")
-        return
+# Executada na thread de trabalho; erros voltam como exceção para a thread da interface.
+# Roteamento híbrido: o motor local decide os campos que consegue com certeza e só os duvidosos
+# (hardware desconhecido, "Yes" em vez de true, versões escritas de outra forma...) vão para o DeepSeek.
+# Campos com correção registrada por feedback usam a correção e também não vão para o DeepSeek.
+# Devolve (resultados, impressão digital da entrada do hardware no banco), guardada com o feedback.
+def analisar_arquivo(caminho):
+    inicio = time.perf_counter()
+    try:
+        with metricas.cronometrar("carregar_arquivo"):
+            with open(caminho, "rb") as f:
+                conteudo = f.read()
+    except Exception as e:
+        raise ValueError(f"Erro ao ler arquivo JSON: {str(e)}")
 
     try:
-        with open(caminho, "r", encoding="utf-8") as f:
-            input_json = json.load(f)
-            validar_estrutura_input(input_json)
-            input_teste = json.dumps(input_json, indent=4)
+        indice = obter_indice("software_db.json")
     except Exception as e:
-        messagebox.showerror("Erro", f"Erro ao ler arquivo JSON: {str(e)}")
-        return
+        raise ValueError(f"Erro ao ler banco de dados: {str(e)}")
 
+    registro = {"arquivo": caminho, "erro": None, "hash": resumo_conteudo(conteudo), "motor": MOTOR_LOCAL}
     try:
-        with open("software_db.json", "r", encoding="utf-8") as f:
-            banco = json.load(f)
+        input_json = json.loads(conteudo.decode("utf-8"))
+        validar_estrutura_input(input_json)
     except Exception as e:
-        messagebox.showerror("Erro", f"Erro ao ler banco de dados: {str(e)}")
-        return
-    
-    relacao_valida = validar_relacao_software_regiao(
-        banco, input_json["Hardware"], input_json["Software"], input_json["Regiao_Execucao"]
+        registro["erro"] = f"Erro ao ler arquivo JSON: {str(e)}"
+        registrar_historico(registro, indice, inicio)
+        raise ValueError(registro["erro"])
+
+    resultados, consultou_ia = analisar_input(indice, input_json)
+    if consultou_ia:
+        registro["motor"] = f"{MOTOR_LOCAL}+deepseek-hibrido"
+    registro.update(
+        hardware=input_json["Hardware"], software=input_json["Software"], regiao=input_json["Regiao_Execucao"],
+        falhas=falhas(resultados), resultado=para_dicionarios(resultados)
     )
-    if not relacao_valida:
-        messagebox.showwarning("Aviso", "Relação Software/Região inválida localmente!")
-        return  # Interrompe a execução se a validação local falhar    
+    registro["valido"] = not registro["falhas"]
+    registrar_historico(registro, indice, inicio, "hibrido" if consultou_ia else None)
+    return resultados, impressao_digital_banco(indice.banco, input_json["Hardware"])
+
+def registrar_historico(registro, indice, inicio, modo_ia=None):
+    registro["latencia_ms"] = (time.perf_counter() - inicio) * 1000
+    historico.registrar([registro], indice.impressao_digital, "interface", modo_ia=modo_ia)
+
+# Devolve (resultados, se o DeepSeek foi consultado ou a resposta dele veio do cache)
+def analisar_input(indice, input_json):
+    with metricas.cronometrar("validacao_local"):
+        resultados, duvidosos = rotear_campos(indice, input_json)
+        resultados, corrigidos = correcoes.aplicar(resultados, indice)
+    duvidosos -= corrigidos # Erro já corrigido por feedback: não paga outra chamada
+    if not duvidosos:
+        return resultados, False # Tudo decidido localmente: nenhuma chamada à API
+
+    chave = gerar_chave_cache(input_json, indice.banco, MODELO_DEEPSEEK, VERSAO_PROMPT_HIBRIDO)
+    em_cache = cache_resultados.get(chave)
+    if em_cache:
+        return correcoes.aplicar(de_json(em_cache), indice)[0], True # Correções enviadas depois que a resposta foi guardada
+    resultados = completar_com_deepseek(indice, input_json, resultados, duvidosos)
+    if not any(r.origem == ORIGEM_LOCAL_INCERTO for r in resultados): # Sem resposta da IA: não guarda no cache
+        cache_resultados.add(chave, para_json(resultados))
+    return resultados, True
 
-    nome_hw = input_json["Hardware"]
-    if nome_hw not in banco:
-        messagebox.showwarning("Aviso", f"Hardware '{nome_hw}' não encontrado no banco de dados.")
+def executar_analise():
+    caminho = input_path_var.get()
+    if not caminho:
+        messagebox.showwarning("Aviso", "Selecione um arquivo de input primeiro.")
         return
+    executor.enviar(analisar_arquivo, (caminho,), mostrar_resultado)
 
-    bloco_hw = montar_bloco_hardware(banco, nome_hw)
-    entrada_hash = nome_hw + input_teste
-    chave = gerar_hash(entrada_hash)
-
-    resultado = cache_resultados.get(chave)
-    if not resultado:
-        resultado = analisar_deepseek(bloco_hw, input_teste)
-        cache_resultados.add(chave, resultado)
-
+def mostrar_resultado(resposta, erro):
+    if erro:
+        messagebox.showerror("Erro", str(erro))
+        return
+    resultado, executar_analise.ultimo_banco = resposta
     output_text.delete(1.0, tk.END)
-    output_text.insert(tk.END, resultado)
+    output_text.insert(tk.END, formatar_resultados(resultado))
+    origens = contar_origens(resultado)
+    output_text.insert(tk.END, "\n\nDecididos por: " + ", ".join(f"{origem} ({n})" for origem, n in origens.items()))
     executar_analise.ultimo_resultado = resultado
 
+def atualizar_estado(pendentes):
+    if pendentes:
+        status_bar.config(text=f"Analisando... ({pendentes} arquivo(s) na fila)")
+        barra_progresso.start(10)
+        botao_cancelar.config(state=tk.NORMAL)
+    else:
+        status_bar.config(text="Pronto")
+        barra_progresso.stop()
+        botao_cancelar.config(state=tk.DISABLED)
+
 def escolher_arquivo():
     caminho = filedialog.askopenfilename(
         title="Selecione o arquivo de input",
@@ -351,7 +238,31 @@ tk.Button(
     font=fonte_titulo,
     padx=20,
     pady=5
-).pack()
+).pack(side=tk.LEFT, expand=True)
+
+# Indicador de progresso e botão para cancelar a fila de análises
+barra_progresso = ttk.Progressbar(frame_botoes, mode="indeterminate", length=200)
+barra_progresso.pack(side=tk.LEFT, padx=5)
+
+botao_cancelar = tk.Button(
+    frame_botoes,
+    text="Cancelar",
+    command=lambda: executor.cancelar(),
+    bg="#f44336",
+    fg="white",
+    font=fonte_padrao,
+    state=tk.DISABLED
+)
+botao_cancelar.pack(side=tk.LEFT, padx=5)
+
+tk.Button(
+    frame_botoes,
+    text="Métricas",
+    command=lambda: abrir_janela_metricas(janela),
+    bg=cor_botao_sec,
+    fg="white",
+    font=fonte_padrao
+).pack(side=tk.LEFT, padx=5)
 
 # Área de resultados
 frame_resultados = tk.Frame(janela, bg="#f0f0f0", padx=10, pady=10)
@@ -421,17 +332,32 @@ def enviar_feedback_handler():
         messagebox.showwarning("Aviso", "Execute uma análise primeiro antes de enviar feedback.")
         return
         
-    # Envia para a API e armazena localmente
-    resposta_api = enviar_feedback(executar_analise.ultimo_resultado, feedback, tipo_feedback)
+    # A chamada à API (com retentativas) roda na thread de trabalho, como as análises
+    executor.enviar(
+        processar_feedback,
+        (executar_analise.ultimo_resultado, feedback, tipo_feedback, executar_analise.ultimo_banco),
+        lambda resposta_api, erro: feedback_enviado(feedback, resposta_api, erro)
+    )
+
+# Executada na thread de trabalho: envia para a API e armazena localmente
+def processar_feedback(resultado, feedback, tipo_feedback, impressao_banco):
+    resposta_api = enviar_feedback(formatar_resultados(resultado), feedback, tipo_feedback)
     salvar_feedback(
         tipo=tipo_feedback,
         feedback=feedback,
-        resultado_original=executar_analise.ultimo_resultado,
-        resposta_api=resposta_api
+        resultado_original=resultado,
+        resposta_api=resposta_api,
+        impressao_banco=impressao_banco
     )
-    
+    return resposta_api
+
+def feedback_enviado(feedback, resposta_api, erro):
+    if erro:
+        messagebox.showerror("Erro", f"Erro ao salvar feedback: {str(erro)}")
+        return
     messagebox.showinfo("Feedback", resposta_api)
-    feedback_entry.delete(0, tk.END)
+    if feedback_entry.get() == feedback: # Não apaga um novo feedback digitado enquanto este era enviado
+        feedback_entry.delete(0, tk.END)
 
 tk.Button(
     frame_feedback,
@@ -455,4 +381,6 @@ status_bar = tk.Label(
 )
 status_bar.pack(fill=tk.X, side=tk.BOTTOM)
 
+executor = ExecutorEmSegundoPlano(janela, ao_mudar_estado=atualizar_estado)
+
 janela.mainloop()
\ No newline at end of file
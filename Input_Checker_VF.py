@@ -1,15 +1,18 @@
 import tkinter as tk #importa bliblioteca tkinter, responsavel pela parte grafica
-from tkinter import filedialog, messagebox, scrolledtext #Importação dos componentes do Tkinter para interface gráfica
-import requests #Permite fazer requisições HTTP para comunicação com com a DeepSeek.
+from tkinter import filedialog, messagebox, scrolledtext, ttk #Importação dos componentes do Tkinter para interface gráfica
 import os #Fornece acesso a funções do sistema operacional
-import hashlib # Utilizado para criar hashes (resumos únicos) de dados, útil para identificar arquivos ou entradas de forma segura.
 import json # Permite ler, escrever e manipular dados no formato JSON
-from dotenv import load_dotenv # Carrega variáveis de ambiente do arquivo .env, protegendo a chave de API.
-from datetime import datetime, timedelta # Fornece ferramentas para manipular datas e horários.
+import tarfile # Erros de leitura de arquivos .tar
+import zipfile # Erros de leitura de arquivos .zip
+from cache_resultados import ResultCachePersistente, gerar_chave_cache # Cache de resultados persistente em disco
+from indice_banco import obter_indice # Índice do banco compilado uma vez e compartilhado
+from historico_resultados import HistoricoResultados # Histórico consultável de todas as validações
+from metricas import metricas # Tempo de cada etapa e contadores de cache, API e tokens
+from tarefas_ui import ExecutorEmSegundoPlano, abrir_janela_metricas # Executa as análises fora da thread da interface
+from resultados import formatar_resultados # Bloco RESULTADOS mostrado na tela
+from validador_lote import iterar_inputs, validar_input # Mesma validação do modo em lote, inclusive de arquivos .zip e .tar
+from cliente_deepseek import MODELO_DEEPSEEK, VERSAO_PROMPT_EXPLICACAO, explicar_deepseek # Chamadas à API do DeepSeek (com retentativas e limite de taxa)
 
-# Carrega variáveis do .env
-load_dotenv()
-deepseek_api_key = os.getenv("DEEPSEEK_API_KEY") #Local onde a API key está localizada
 LAST_DIR_FILE = "last_dir.json" #Local onde está localizado a ultima pasta aberta do programa
 
 # Abre o arquivo que armazena o último diretório usado, lê os dados em formato JSON
@@ -30,203 +33,140 @@ def salvar_ultimo_dir(caminho):
     with open(LAST_DIR_FILE, "w") as f: # Abre o arquivo para escrita
         json.dump({"last_dir": os.path.dirname(caminho)}, f) # Salva o caminho da pasta do arquivo selecionado em formato JSON
 
-# Cache de resultados com expiração
-class ResultCache:
-    def __init__(self, max_size=100, ttl_hours=24): 
-        self.cache = {} #Dicionário para armazenar os resultados em cache
-        self.max_size = max_size  #Número máximo de itens permitidos no cache
-        self.ttl = timedelta(hours=ttl_hours) #Tempo de vida (TTL) dos itens no cache
-    
-    def add(self, key, value):
-        if len(self.cache) >= self.max_size:
-            self.cleanup() #Remove o item mais antigo se o cache estiver cheio
-        self.cache[key] = {
-            'value': value, #Valor do resultado em cache
-            'timestamp': datetime.now() #Momento em que o item foi adicionado (para expiração)
-        }
-    
-    def get(self, key):
-        item = self.cache.get(key) #Tenta recuperar o item pelo identificador
-        # Verifica se o item existe e se ainda está dentro do tempo de validade (TTL)
-        if item and (datetime.now() - item['timestamp']) < self.ttl:
-            return item['value'] # Retorna o valor do cache se estiver válido
-        return None  # Retorna None se não existir ou se já expirou
-    
-    def cleanup(self): # Remove o item mais antigo do cache para liberar espaço
-        oldest_key = min(self.cache.keys(), key=lambda k: self.cache[k]['timestamp'])
-        del self.cache[oldest_key]
-
-cache_resultados = ResultCache() # Instancia a classe ResultCache para uso no programa
-
-# Gera um hash único baseado no input
-def gerar_hash(input_str):
-    return hashlib.sha256(input_str.encode()).hexdigest()
-
-#A função garante que o arquivo de entrada tenha todas as informações essenciais antes de prosseguir com a análise. 
-# Se faltar algum campo importante, ela interrompe o processo e avisa qual campo está faltando, evitando que a validação continue com dados incompletos.
-def validar_estrutura_input(input_json): 
-    campos_obrigatorios = [
-        "Hardware", "Software", "Regiao_Execucao",
-        "Versao_Android", "WiFi", "NFC", "Bluetooth", "SIM", "Rede"
-    ]
-    for campo in campos_obrigatorios:
-        if campo not in input_json:
-            raise ValueError(f"Campo obrigatório faltando: {campo}")
-
-# A função verifica se o software informado pode ser usado em determinada região,
-# de acordo com o banco de dados do hardware. Isso garante que testes e validações respeitem regras regionais de compatibilidade.
-def validar_relacao_software_regiao(banco, hardware, software, regiao):
-    hw_data = banco.get(hardware, {})
-    regioes = hw_data.get("Regioes", {})
-    
-    if isinstance(regioes, dict):
-        # Caso dicionário: verifica se o software está na lista da região
-        if regiao in regioes:
-            return software in regioes[regiao]
-        return False
-    elif isinstance(regioes, list):
-        # Caso lista: verifica apenas se a região existe
-        return regiao in regioes
-    return False
-
-# Função para análise via DeepSeek, onde são passadas as instruções necessárias para a IA verificar os inputs
-def analisar_deepseek(banco_de_dados, input_de_teste):
-    headers = {
-        "Authorization": f"Bearer {deepseek_api_key}",
-        "Content-Type": "application/json"
-    }
-    
-    payload = {
-        "model": "deepseek-chat",
-        "messages": [
-            {
-                "role": "system", 
-                "content": """Você é um validador técnico. Formato OBRIGATÓRIO:
-
-RESULTADOS:
-- HARDWARE: PASS/FAIL [valor no input]
-- SOFTWARE: PASS/FAIL [valor no input]
-- RELAÇÃO_SOFTWARE_REGIAO: PASS/FAIL [Software/Região] 
-  → Se 'Regioes' for dicionário: FAIL se software não estiver na lista da região
-  → Se 'Regioes' for lista: FAIL se região não existir
-- VERSAO_ANDROID: PASS/FAIL [valor no input]
-- WIFI: PASS/FAIL [valor no input]
-- NFC: PASS/FAIL [valor no input]
-- BLUETOOTH: PASS/FAIL [valor no input]
-- SIM: PASS/FAIL [valor no input]
-- REDE: PASS/FAIL [valor no input]
-
-Exemplo de RESULTADOS:
-
-RESULTADOS:
-- HARDWARE: PASS [Hardware_A]
-- SOFTWARE: PASS [TREVAN-VS7]
-- RELAÇÃO_SOFTWARE_REGIAO: PASS [TREVAN-VS7 está na lista da região Germany]
-- VERSAO_ANDROID: PASS [Android 15]
-- WIFI: PASS [2.4GHz]
-- NFC: PASS [true]
-- BLUETOOTH: FAIL [4.0] → Valor esperado: "5.0+"
-- SIM: FAIL [Single SIM] → Valor esperado: "Dual SIM"
-- REDE: FAIL [8G] → Valores esperados: ["4G", "5G", "6G"]
-
-REGRAS RÍGIDAS:
-1. Para RELAÇÃO_SOFTWARE_REGIAO:
-   - Caso 1: Se 'Regioes' for um dicionário {região: [softwares]}, o software deve estar na lista da região especificada.
-   - Caso 2: Se 'Regioes' for uma lista [regiões], a região do input deve existir na lista.
-2. Para tecnologias (WiFi, NFC, Bluetooth, SIM, Rede): comparação exata de valores entre aspas. 
-Exemplo: se o valor do input for 2.4GHz e no banco tiver uma das opções como 2.4GHZ, considere como PASS.
-3. Sempre mostre o valor esperado no banco em caso de FAIL.
-4. Para Bluetooth:
-   - Se o valor no banco terminar com '+' (ex: "5.0+"), considere PASS para versões iguais ou superiores.
-   - Caso contrário, faça comparação exata.
-   """
-            },
-            {
-                "role": "user", 
-                "content": f"""Dados para análise:
-
-BANCO DE DADOS:
-{json.dumps(banco_de_dados, indent=2)}
-
-INPUT:
-{json.dumps(input_de_teste, indent=2)}
-
-INSTRUÇÕES:
-1. Para cada campo no input, verifique no banco
-2. Seja rigoroso nas comparações e consulte apenas o banco de dados.
-3. Mostre valores reais do banco em caso de FAIL"""
-            }
-        ],
-        "temperature": 0,
-        "max_tokens": 800
-    }
+cache_resultados = ResultCachePersistente() # Cache em disco (SQLite), mantido entre execuções do programa
+historico = HistoricoResultados() # Cada input analisado fica gravado, com o veredito de cada campo
 
+def carregar_indice():
     try:
-        response = requests.post(
-            "https://api.deepseek.com/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=60
-        )
-        response.raise_for_status()
-        return response.json()['choices'][0]['message']['content']
+        return obter_indice("software_db.json") # Só relê o arquivo se ele tiver mudado
     except Exception as e:
-        return f"ERRO: {str(e)}"
+        raise ValueError(f"Erro ao ler banco de dados: {str(e)}")
 
+# Executada na thread de trabalho: não pode tocar nos widgets, só devolve o texto ou levanta exceção
+def analisar_arquivo(caminho, explicar):
+    if not caminho.lower().endswith(".json"):
+        return analisar_compactado(caminho, explicar)
+    try:
+        with metricas.cronometrar("carregar_arquivo"):
+            with open(caminho, "rb") as f:
+                conteudo = f.read()
+    except Exception as e:
+        raise ValueError(f"Erro ao ler arquivo JSON: {str(e)}")
+    indice = carregar_indice()
+    registro = validar_input(indice, caminho, conteudo)
+    historico.registrar([registro], indice.impressao_digital, "interface", modo_ia="explicar" if explicar else None)
+    if registro["erro"]:
+        raise ValueError(registro["erro"])
+    return analisar_input(os.path.basename(caminho), registro, indice, explicar)
+
+# Arquivo .zip ou .tar: cada input é lido e analisado na hora, sem extrair nada para o disco
+# e sem carregar o arquivo inteiro na memória. O botão Cancelar interrompe entre um input e outro.
+def analisar_compactado(caminho, explicar):
+    indice = carregar_indice()
+    try:
+        analisados = 0
+        for nome, conteudo in iterar_inputs([caminho]):
+            if executor.tarefa_cancelada():
+                break
+            registro = validar_input(indice, nome, conteudo)
+            historico.registrar([registro], indice.impressao_digital, "interface", modo_ia="explicar" if explicar else None)
+            nome = nome[len(caminho) + 1:] # Só o caminho dentro do arquivo compactado
+            if registro["erro"]:
+                executor.na_interface(iniciar_bloco, nome, registro["erro"])
+            else:
+                analisar_input(nome, registro, indice, explicar)
+            analisados += 1
+    except (OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+        raise ValueError(f"Erro ao ler arquivo compactado: {str(e)}")
+    if not analisados and not executor.tarefa_cancelada():
+        raise ValueError("Nenhum arquivo .json encontrado no arquivo compactado.")
+    return f"{analisados} inputs analisados"
+
+# registro: resultado de validar_input, já validado localmente pelo motor de regras (sem rede)
+def analisar_input(nome_arquivo, registro, indice, explicar):
+    banco = indice.banco
+    input_json = registro["input"]
+    resultado = formatar_resultados(registro["campos"]) # Mostrado imediatamente
+    executor.na_interface(iniciar_bloco, nome_arquivo, resultado)
+
+    if explicar:
+        chave = gerar_chave_cache(input_json, banco, MODELO_DEEPSEEK, VERSAO_PROMPT_EXPLICACAO)
+        executor.na_interface(escrever_saida, "\n\nEXPLICAÇÃO (DeepSeek):\n")
+
+        explicacao = cache_resultados.get(chave)
+        if explicacao:
+            executor.na_interface(escrever_saida, explicacao)
+        else:
+            # Streaming: cada trecho aparece na tela assim que chega da API
+            explicacao = explicar_deepseek(
+                banco, input_json, resultado,
+                ao_receber=lambda trecho: executor.na_interface(escrever_saida, trecho),
+                deve_parar=executor.tarefa_cancelada
+            )
+            if explicacao.startswith("ERRO"):
+                executor.na_interface(escrever_saida, explicacao)
+            elif not executor.tarefa_cancelada(): # Erros e respostas interrompidas não ficam guardados no cache
+                cache_resultados.add(chave, explicacao)
+        resultado += f"\n\nEXPLICAÇÃO (DeepSeek):\n{explicacao}"
+    return resultado
+
+# Coloca o arquivo selecionado na fila de análise. Pode ser chamada de novo enquanto outro arquivo está em andamento.
 def executar_analise():
-    status_bar.config(text="Analisando...")
     caminho = input_path_var.get()
     if not caminho:
         messagebox.showwarning("Aviso", "Selecione um arquivo de input primeiro.")
         return
 
-    try:
-        with open(caminho, "r", encoding="utf-8") as f:
-            input_json = json.load(f)
-            validar_estrutura_input(input_json)
-            input_teste = json.dumps(input_json, indent=4)
-    except Exception as e:
-        messagebox.showerror("Erro", f"Erro ao ler arquivo JSON: {str(e)}")
-        return
-
-    try:
-        with open("software_db.json", "r", encoding="utf-8") as f:
-            banco = json.load(f)
-    except Exception as e:
-        messagebox.showerror("Erro", f"Erro ao ler banco de dados: {str(e)}")
-        return
-    
-    relacao_valida = validar_relacao_software_regiao(
-        banco, input_json["Hardware"], input_json["Software"], input_json["Regiao_Execucao"]
+    if not executor.ocupado:
+        output_text.delete(1.0, tk.END) # Nova rodada: limpa os resultados anteriores
+    executor.enviar(
+        analisar_arquivo,
+        (caminho, explicar_var.get()), # Variáveis do Tkinter só podem ser lidas na thread da interface
+        mostrar_erro
     )
-    if not relacao_valida:
-        messagebox.showwarning("Aviso", "Relação Hardware/Software/Região inválida!")
-        return  # Interrompe a execução se a validação local falhar    
-
-    nome_hw = input_json["Hardware"]
-    if nome_hw not in banco:
-        messagebox.showwarning("Aviso", f"Hardware '{nome_hw}' não encontrado no banco de dados.")
-        return
-
-    entrada_hash = f"{input_json['Hardware']}{input_json['Software']}{input_json['Regiao_Execucao']}"
-    chave = gerar_hash(entrada_hash)
 
-    resultado = cache_resultados.get(chave)
-    if not resultado:
-        resultado = analisar_deepseek(banco, input_teste)
-        cache_resultados.add(chave, resultado)
-
-    output_text.delete(1.0, tk.END)
-    output_text.insert(tk.END, resultado)
-    status_bar.config(text="Pronto")
-
-def escolher_arquivo(): #Função para selecionar o arquivo .json
+# As funções abaixo rodam na thread da interface, chamadas pelo executor
+def iniciar_bloco(nome_arquivo, resultado):
+    if output_text.get(1.0, tk.END).strip():
+        output_text.insert(tk.END, "\n\n")
+    escrever_saida(f"=== {nome_arquivo} ===\n{resultado}")
+
+def escrever_saida(texto):
+    output_text.insert(tk.END, texto)
+    output_text.see(tk.END)
+
+# O texto já foi exibido durante a análise; ao final só é preciso tratar erros
+def mostrar_erro(resultado, erro):
+    if erro:
+        messagebox.showerror("Erro", str(erro))
+
+def cancelar_analise():
+    executor.cancelar()
+    status_bar.config(text="Análise cancelada")
+
+# Atualiza barra de status, indicador de progresso e botão Cancelar conforme a fila de análises
+def atualizar_estado(pendentes):
+    if pendentes:
+        status_bar.config(text=f"Analisando... ({pendentes} arquivo(s) na fila)")
+        barra_progresso.start(10)
+        botao_cancelar.config(state=tk.NORMAL)
+    else:
+        barra_progresso.stop()
+        botao_cancelar.config(state=tk.DISABLED)
+        if status_bar.cget("text").startswith("Analisando"):
+            status_bar.config(text="Pronto")
+
+def escolher_arquivo(): #Função para selecionar o arquivo .json (ou um .zip/.tar com vários inputs)
     # Carrega o último diretório usado
     ultimo_dir = carregar_ultimo_dir()
     
     caminho = filedialog.askopenfilename(
         title="Selecione o arquivo de input",
-        filetypes=[("Arquivos JSON", "*.json")],
+        filetypes=[
+            ("Inputs (JSON ou compactados)", "*.json *.zip *.tar *.tar.gz *.tgz"),
+            ("Arquivos JSON", "*.json"),
+            ("Arquivos compactados", "*.zip *.tar *.tar.gz *.tgz")
+        ],
         initialdir=ultimo_dir  # Abre no último diretório acessado
     )
     
@@ -263,7 +203,7 @@ frame_arquivo.pack(fill=tk.X)
 
 tk.Label(
     frame_arquivo,
-    text="Arquivo de Input (.json):",
+    text="Arquivo de Input (.json, .zip ou .tar):",
     font=fonte_padrao,
     bg="#f0f0f0"
 ).pack(side=tk.LEFT)
@@ -301,6 +241,43 @@ tk.Button(
     pady=5
 ).pack()
 
+# Indicador de progresso e botão para cancelar a fila de análises
+frame_progresso = tk.Frame(frame_botoes, bg="#f0f0f0")
+frame_progresso.pack(pady=5)
+
+barra_progresso = ttk.Progressbar(frame_progresso, mode="indeterminate", length=300)
+barra_progresso.pack(side=tk.LEFT, padx=5)
+
+botao_cancelar = tk.Button(
+    frame_progresso,
+    text="Cancelar",
+    command=cancelar_analise,
+    bg="#f44336",
+    fg="white",
+    font=fonte_padrao,
+    state=tk.DISABLED
+)
+botao_cancelar.pack(side=tk.LEFT)
+
+tk.Button(
+    frame_progresso,
+    text="Métricas",
+    command=lambda: abrir_janela_metricas(janela),
+    bg=cor_botao_sec,
+    fg="white",
+    font=fonte_padrao
+).pack(side=tk.LEFT, padx=5)
+
+# Opção para pedir uma explicação ao DeepSeek depois da validação local
+explicar_var = tk.BooleanVar(value=False)
+tk.Checkbutton(
+    frame_botoes,
+    text="Explicar resultado com DeepSeek",
+    variable=explicar_var,
+    font=fonte_padrao,
+    bg="#f0f0f0"
+).pack(pady=5)
+
 # Área de resultados
 frame_resultados = tk.Frame(janela, bg="#f0f0f0", padx=10, pady=10)
 frame_resultados.pack(fill=tk.BOTH, expand=True)
@@ -335,6 +312,8 @@ status_bar = tk.Label(
 )
 status_bar.pack(fill=tk.X, side=tk.BOTTOM)
 
+executor = ExecutorEmSegundoPlano(janela, ao_mudar_estado=atualizar_estado) # Thread de trabalho das análises
+
 janela.mainloop() # Programa entra no loop principal esperando interações do usuário.
 
 # Fluxo de funcionamento do Validador de Testes Android com DeepSeek
@@ -356,29 +335,35 @@ janela.mainloop() # Programa entra no loop principal esperando interações do u
     - Usuário clica no botão "Executar Análise".
     - Chama a função executar_analise():
         - Obtém o caminho do arquivo de input selecionado.
+        - Coloca o arquivo na fila do executor (tarefas_ui.py); outros arquivos podem ser enfileirados enquanto um está em andamento.
+        - A barra de progresso gira e o botão "Cancelar" fica ativo até a fila esvaziar.
+    - Em uma thread separada, analisar_arquivo(caminho, explicar):
         - Abre e lê o arquivo JSON de entrada.
-        - Chama validar_estrutura_input(input_json):
-            - Verifica se todos os campos obrigatórios estão presentes no arquivo de entrada.
-            - Se faltar algum campo, interrompe o processo e exibe mensagem de erro.
-        - Abre e lê o banco de dados técnico (software_db.json). Caso não abra, um popup aparece
-
-4. Validação local da relação hardware/software/região
-    - Chama validar_relacao_software_regiao(banco, hardware, software, regiao):
-        - Verifica se o hardware, software e região informados são compatíveis no banco de dados.
-        - Se não for válido, exibe aviso e interrompe a análise.
-
-5. Checagem de cache
-    - Gera um hash exclusivo para a combinação hardware, software e região (gerar_hash).
-    - Verifica se já existe resultado em cache (cache_resultados.get(chave)):
-        - Se existir, exibe o resultado armazenado na interface.
+        - Obtém o índice do banco de dados técnico (obter_indice), que só relê o software_db.json se ele mudou. Caso não abra, um popup aparece
+
+4. Validação local (motor_regras.py)
+    - Chama validar_input(indice, caminho, conteudo), a mesma do modo em lote (validador_lote.py):
+        - Verifica se todos os campos obrigatórios estão presentes (validar_estrutura_input); se faltar algum, exibe mensagem de erro.
+        - Aplica as mesmas regras do prompt: relação software/região (dicionário ou lista),
+          comparação exata de WiFi/NFC/SIM/Rede e "5.0+" como versão mínima de Bluetooth.
+        - O bloco RESULTADOS é montado sem nenhuma chamada de rede.
+    - Grava o resultado no histórico (historico_resultados.py): hash do arquivo, veredito de cada campo,
+      latência e impressão digital do banco.
+
+5. Explicação opcional via DeepSeek
+    - Só acontece se a opção "Explicar resultado com DeepSeek" estiver marcada.
+    - Gera uma chave exclusiva com o input completo, a entrada do hardware no banco, o modelo e a versão do prompt (gerar_chave_cache).
+    - Verifica se já existe explicação em cache (cache_resultados.get(chave)):
+        - Se existir, reaproveita a explicação armazenada.
         - Se não existir:
-            - Chama analisar_deepseek(banco, input_teste):
-                - Monta o prompt com regras e dados do banco/input.
-                - Envia para a API do DeepSeek usando requests.post().
-                - Recebe o resultado da análise IA.
-            - Salva o resultado no cache (cache_resultados.add).
+            - Chama explicar_deepseek(banco, input_json, resultado):
+                - Envia o resultado local e só o trecho do banco relevante (prompts_deepseek.py) para a API do DeepSeek.
+                - Recebe a explicação dos FAILs em streaming: cada trecho é acrescentado à área de resultados assim que chega.
+            - Salva a explicação no cache (cache_resultados.add).
 
 6. Exibição do resultado
+    - iniciar_bloco() e escrever_saida() rodam de volta na thread da interface (via janela.after).
+    - O resultado local aparece assim que a validação termina, antes de qualquer chamada à API.
     - Exibe o resultado detalhado (PASS/FAIL por campo, valores esperados e recebidos) na área de resultados da interface.
     - Atualiza a barra de status para "Pronto".
 """
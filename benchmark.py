@@ -0,0 +1,295 @@
+import argparse # Leitura dos argumentos da linha de comando
+import json # Permite ler, escrever e manipular dados no formato JSON
+import os # Fornece acesso a funções do sistema operacional
+import platform
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc # Mede a memória alocada pelo Python durante a carga do catálogo
+from datetime import datetime # Fornece ferramentas para manipular datas e horários.
+
+import cliente_deepseek
+import gerador_sintetico
+from cache_resultados import ResultCachePersistente, gerar_chave_cache
+from cliente_deepseek import MODELO_DEEPSEEK, VERSAO_PROMPT_ANALISE, analisar_deepseek, configurar_cliente, executar_em_paralelo
+from indice_banco import BANCO_PADRAO, IndiceBanco, obter_indice
+from motor_regras import avaliar_campos, validar_estrutura_input, validar_relacao_software_regiao
+from prompts_deepseek import montar_mensagens_analise
+from resultados import ORIGEM_DEEPSEEK, de_json, interpretar_resultados, para_json
+from servidor_mock_deepseek import iniciar_servidor_mock
+from validacao_colunar import NUMPY_DISPONIVEL, avaliar_colunar, obter_tabelas
+from validador_lote import iterar_inputs
+
+# Medição de desempenho de cada etapa da validação: leitura do JSON, validação da estrutura, relação
+# software/região, motor local, montagem do prompt, consulta ao cache e chamada à API (contra o servidor local
+# servidor_mock_deepseek.py, nunca contra a API real). Para cada etapa: p50/p95/p99 e vazão.
+# O resultado pode ser salvo como referência (baseline) e comparado nas próximas execuções. Uso:
+#   python benchmark.py --salvar-baseline
+#   python benchmark.py            (compara com benchmark_baseline.json e aponta regressões)
+#   python benchmark.py --escala 1000 10000 50000   (catálogos sintéticos: carga, memória, índice e vazão por tamanho)
+
+BASELINE_PADRAO = "benchmark_baseline.json"
+CONCORRENCIAS_PADRAO = [1, 8, 64]
+DIFERENCA_MINIMA_MS = 0.1 # Diferenças menores que isso são ruído de medição, não regressão
+VAZAO_A_PARTIR_DE_MS = 1.0 # Vazão só é comparada em etapas lentas (nas rápidas ela só repete o p50)
+
+def _percentil(ordenados, p):
+    if not ordenados:
+        return 0.0
+    posicao = (len(ordenados) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+def resumir(duracoes, tempo_total):
+    """Estatísticas de uma etapa: tempos por operação em ms e vazão em operações por segundo."""
+    ordenados = sorted(duracoes)
+    return {
+        "n": len(ordenados),
+        "p50_ms": round(_percentil(ordenados, 50) * 1000, 4),
+        "p95_ms": round(_percentil(ordenados, 95) * 1000, 4),
+        "p99_ms": round(_percentil(ordenados, 99) * 1000, 4),
+        "vazao_por_s": round(len(ordenados) / tempo_total, 1) if tempo_total > 0 else None
+    }
+
+def medir(funcao, itens, repeticoes=1, concorrencia=1):
+    """Executa funcao(item) para cada item (repeticoes vezes) e mede cada chamada."""
+    duracoes = []
+    lock = threading.Lock()
+
+    def cronometrar(item):
+        inicio = time.perf_counter()
+        funcao(item)
+        duracao = time.perf_counter() - inicio
+        with lock:
+            duracoes.append(duracao)
+
+    lista = [(item,) for item in itens] * repeticoes
+    inicio = time.perf_counter()
+    if concorrencia > 1:
+        executar_em_paralelo(cronometrar, lista, concorrencia)
+    else:
+        for argumentos in lista:
+            cronometrar(*argumentos)
+    return resumir(duracoes, time.perf_counter() - inicio)
+
+def carregar_inputs(caminhos):
+    conteudos = []
+    for _, conteudo in iterar_inputs(caminhos):
+        try:
+            validar_estrutura_input(json.loads(conteudo.decode("utf-8")))
+        except Exception:
+            continue # Arquivos inválidos não entram na medição
+        conteudos.append(conteudo)
+    return conteudos
+
+def medir_etapas_locais(indice, conteudos, inputs, repeticoes):
+    banco = indice.banco
+    etapas = {}
+    etapas["carregar_json"] = medir(lambda conteudo: json.loads(conteudo.decode("utf-8")), conteudos, repeticoes)
+    etapas["validar_estrutura"] = medir(validar_estrutura_input, inputs, repeticoes)
+    etapas["relacao_software_regiao"] = medir(
+        lambda i: validar_relacao_software_regiao(indice, i["Hardware"], i["Software"], i["Regiao_Execucao"]),
+        inputs, repeticoes
+    )
+    etapas["motor_local"] = medir(lambda i: avaliar_campos(indice, i), inputs, repeticoes)
+    etapas["montar_prompt"] = medir(lambda i: montar_mensagens_analise(banco, i), inputs, repeticoes)
+    etapas["chave_cache"] = medir(lambda i: gerar_chave_cache(i, banco, MODELO_DEEPSEEK, VERSAO_PROMPT_ANALISE), inputs, repeticoes)
+    return etapas
+
+def medir_cache(banco, inputs, pasta):
+    cache = ResultCachePersistente(os.path.join(pasta, "cache_consulta.db"))
+    chaves = [gerar_chave_cache(i, banco, MODELO_DEEPSEEK, VERSAO_PROMPT_ANALISE) for i in inputs]
+    valor = para_json(avaliar_campos(banco, inputs[0]))
+    etapas = {"cache_consulta_fria": medir(cache.get, chaves)} # Todas as consultas falham (cache vazio)
+    etapas["cache_gravacao"] = medir(lambda chave: cache.add(chave, valor), chaves)
+    etapas["cache_consulta_quente"] = medir(cache.get, chaves)
+    cache.memoria = type(cache.memoria)(max_size=1) # Sem a camada em memória: toda consulta vai ao SQLite
+    etapas["cache_consulta_quente_disco"] = medir(cache.get, chaves)
+    return etapas
+
+def medir_api(banco, inputs, concorrencias, pasta):
+    etapas = {}
+    for concorrencia in concorrencias:
+        configurar_cliente(tamanho_pool=concorrencia)
+        etapas[f"api_c{concorrencia}"] = medir(lambda i: analisar_deepseek(banco, i), inputs, concorrencia=concorrencia)
+
+        # Sequência completa com cache: consulta, chamada à API se faltar, interpretação e gravação
+        cache = ResultCachePersistente(os.path.join(pasta, f"cache_c{concorrencia}.db"))
+
+        def pipeline(input_json):
+            chave = gerar_chave_cache(input_json, banco, MODELO_DEEPSEEK, VERSAO_PROMPT_ANALISE)
+            em_cache = cache.get(chave)
+            if em_cache:
+                return de_json(em_cache)
+            resultados = interpretar_resultados(analisar_deepseek(banco, input_json), ORIGEM_DEEPSEEK)
+            cache.add(chave, para_json(resultados))
+            return resultados
+
+        etapas[f"pipeline_frio_c{concorrencia}"] = medir(pipeline, inputs, concorrencia=concorrencia)
+        etapas[f"pipeline_quente_c{concorrencia}"] = medir(pipeline, inputs, concorrencia=concorrencia)
+    return etapas
+
+def comparar_com_baseline(atual, baseline, tolerancia):
+    """Etapas que pioraram além da tolerância (p50, p95 ou vazão): lista de (etapa, métrica, antes, agora)."""
+    regressoes = []
+    for etapa, medida in atual["etapas"].items():
+        referencia = baseline["etapas"].get(etapa)
+        if not referencia:
+            continue
+        for metrica in ("p50_ms", "p95_ms"):
+            limite = max(referencia[metrica] * (1 + tolerancia), referencia[metrica] + DIFERENCA_MINIMA_MS)
+            if medida[metrica] > limite:
+                regressoes.append((etapa, metrica, referencia[metrica], medida[metrica]))
+        if referencia["p50_ms"] >= VAZAO_A_PARTIR_DE_MS and referencia["vazao_por_s"] and medida["vazao_por_s"] and \
+                medida["vazao_por_s"] < referencia["vazao_por_s"] / (1 + tolerancia):
+            regressoes.append((etapa, "vazao_por_s", referencia["vazao_por_s"], medida["vazao_por_s"]))
+    return regressoes
+
+def executar_benchmark(caminhos, caminho_banco=BANCO_PADRAO, sinteticos=200, repeticoes=20,
+                       concorrencias=CONCORRENCIAS_PADRAO, latencia_ms=20, latencia_p99_ms=100, semente=0):
+    indice = obter_indice(caminho_banco)
+    conteudos = carregar_inputs(caminhos)
+    sinteticos_gerados = gerador_sintetico.gerar_inputs(indice.banco, sinteticos, semente=semente)
+    inputs = [json.loads(c.decode("utf-8")) for c in conteudos] + [i for _, i in sinteticos_gerados]
+    conteudos += [json.dumps(i).encode("utf-8") for i in inputs[len(conteudos):]]
+
+    servidor = iniciar_servidor_mock(latencia_ms=latencia_ms, latencia_p99_ms=latencia_p99_ms, semente=semente)
+    url_anterior = cliente_deepseek.DEEPSEEK_BASE_URL
+    configurar_cliente(url_base=servidor.url_base)
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            etapas = medir_etapas_locais(indice, conteudos, inputs, repeticoes)
+            etapas.update(medir_cache(indice.banco, inputs, pasta))
+            etapas.update(medir_api(indice.banco, inputs, concorrencias, pasta))
+    finally:
+        configurar_cliente(url_base=url_anterior)
+        servidor.shutdown()
+        servidor.server_close()
+
+    return {
+        "gerado_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "ambiente": {"python": platform.python_version(), "sistema": platform.platform()},
+        "parametros": {"inputs": len(inputs), "sinteticos": sinteticos, "repeticoes": repeticoes,
+                       "concorrencias": concorrencias, "latencia_ms": latencia_ms, "latencia_p99_ms": latencia_p99_ms},
+        "etapas": etapas
+    }
+
+# Escala: para cada tamanho de catálogo sintético (gerador_sintetico.py), mede a leitura do arquivo, a memória
+# ocupada pelo banco e pelo índice, a construção do índice e a vazão do motor local com inputs válidos e inválidos
+def medir_escala(tamanho, regioes=300, inputs_por_tamanho=2000, semente=0):
+    banco = gerador_sintetico.gerar_catalogo(tamanho, regioes, semente=semente)
+    inputs = [i for _, i in gerador_sintetico.gerar_inputs(banco, inputs_por_tamanho, semente=semente)]
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho, _ = gerador_sintetico.gravar_conjunto(pasta, banco, [])
+        tamanho_arquivo = os.path.getsize(caminho)
+        del banco
+
+        # Tempos medidos sem o tracemalloc, que deixa as alocações várias vezes mais lentas
+        inicio = time.perf_counter()
+        with open(caminho, "r", encoding="utf-8") as f:
+            banco = json.load(f)
+        tempo_carga = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        indice = IndiceBanco(banco)
+        tempo_indice = time.perf_counter() - inicio
+        del banco, indice
+
+        tracemalloc.start()
+        with open(caminho, "r", encoding="utf-8") as f:
+            banco = json.load(f)
+        memoria_banco = tracemalloc.get_traced_memory()[0]
+        indice = IndiceBanco(banco)
+        memoria_total = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+    validacao = medir(lambda i: avaliar_campos(indice, i), inputs)
+    colunar = None
+    if NUMPY_DISPONIVEL:
+        obter_tabelas(indice) # As tabelas são compiladas uma vez por banco; a medida é só da matriz
+        colunar = medir(lambda lista: avaliar_colunar(indice, lista), [inputs])
+    return {
+        "hardwares": tamanho,
+        "arquivo_mb": round(tamanho_arquivo / 1e6, 2),
+        "carga_ms": round(tempo_carga * 1000, 1),
+        "memoria_banco_mb": round(memoria_banco / 1e6, 1),
+        "indice_ms": round(tempo_indice * 1000, 1),
+        "memoria_indice_mb": round((memoria_total - memoria_banco) / 1e6, 1),
+        "validacao_p50_ms": validacao["p50_ms"],
+        "validacao_por_s": validacao["vazao_por_s"],
+        "colunar_por_s": round(len(inputs) / (colunar["p50_ms"] / 1000), 1) if colunar else None
+    }
+
+def imprimir_escala(medidas):
+    print(f"{'hardwares':>10}{'arquivo MB':>12}{'carga ms':>11}{'mem MB':>9}{'índice ms':>11}{'mem índ MB':>12}"
+          f"{'p50 ms':>10}{'inputs/s':>11}{'colunar/s':>12}")
+    for m in medidas:
+        print(f"{m['hardwares']:>10}{m['arquivo_mb']:>12.2f}{m['carga_ms']:>11.1f}{m['memoria_banco_mb']:>9.1f}"
+              f"{m['indice_ms']:>11.1f}{m['memoria_indice_mb']:>12.1f}{m['validacao_p50_ms']:>10.4f}"
+              f"{m['validacao_por_s'] or 0:>11.1f}{m['colunar_por_s'] or 0:>12.1f}")
+
+def imprimir_tabela(resultado):
+    print(f"{'etapa':<30}{'n':>7}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'ops/s':>12}")
+    for etapa, medida in resultado["etapas"].items():
+        print(f"{etapa:<30}{medida['n']:>7}{medida['p50_ms']:>11.3f}{medida['p95_ms']:>11.3f}"
+              f"{medida['p99_ms']:>11.3f}{medida['vazao_por_s'] or 0:>12.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o desempenho de cada etapa da validação (API simulada localmente).")
+    parser.add_argument("caminhos", nargs="*", default=["Inputs.zip"], help="Inputs reais (padrão: Inputs.zip)")
+    parser.add_argument("--banco", default=BANCO_PADRAO, help="Banco de dados técnico (padrão: software_db.json)")
+    parser.add_argument("--sinteticos", type=int, default=200, help="Inputs sintéticos gerados a partir do banco (padrão: 200)")
+    parser.add_argument("--repeticoes", type=int, default=20, help="Repetições das etapas locais (padrão: 20)")
+    parser.add_argument("--concorrencias", type=int, nargs="+", default=CONCORRENCIAS_PADRAO, help="Níveis de concorrência da API (padrão: 1 8 64)")
+    parser.add_argument("--latencia", type=float, default=20, help="Latência mediana da API simulada, em ms (padrão: 20)")
+    parser.add_argument("--latencia-p99", type=float, default=100, help="Percentil 99 da latência simulada, em ms (padrão: 100)")
+    parser.add_argument("--baseline", default=BASELINE_PADRAO, help="Arquivo de referência (padrão: benchmark_baseline.json)")
+    parser.add_argument("--salvar-baseline", action="store_true", help="Grava este resultado como nova referência")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Piora aceita antes de apontar regressão (padrão: 0.25 = 25%%)")
+    parser.add_argument("--saida", help="Grava também o resultado completo neste arquivo JSON")
+    parser.add_argument("--escala", type=int, nargs="+", metavar="HARDWARES",
+                        help="Mede só o crescimento com catálogos sintéticos destes tamanhos (ex.: 1000 10000 50000)")
+    parser.add_argument("--regioes", type=int, default=300, help="Regiões distintas nos catálogos de --escala (padrão: 300)")
+    args = parser.parse_args(argv)
+
+    if args.escala:
+        medidas = [medir_escala(tamanho, args.regioes, args.sinteticos * 10) for tamanho in args.escala]
+        imprimir_escala(medidas)
+        if args.saida:
+            with open(args.saida, "w", encoding="utf-8") as f:
+                json.dump({"gerado_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "escala": medidas},
+                          f, indent=2, ensure_ascii=False)
+        return 0
+
+    resultado = executar_benchmark(args.caminhos, args.banco, args.sinteticos, args.repeticoes, args.concorrencias,
+                                   args.latencia, args.latencia_p99)
+    imprimir_tabela(resultado)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+
+    if args.salvar_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"\nReferência gravada em {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nSem referência para comparar ({args.baseline}). Use --salvar-baseline para criar uma.")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("parametros") != resultado["parametros"]:
+        print("\nAviso: a referência foi medida com outros parâmetros; a comparação pode não ser justa.")
+    regressoes = comparar_com_baseline(resultado, baseline, args.tolerancia)
+    if not regressoes:
+        print(f"\nSem regressões em relação a {baseline.get('gerado_em')} (tolerância {args.tolerancia:.0%}).")
+        return 0
+    print(f"\nREGRESSÕES em relação a {baseline.get('gerado_em')} (tolerância {args.tolerancia:.0%}):")
+    for etapa, metrica, antes, agora in regressoes:
+        print(f"- {etapa}: {metrica} {antes} -> {agora}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+import hashlib # Utilizado para criar hashes (resumos únicos) de dados, útil para identificar arquivos ou entradas de forma segura.
+import json # Permite ler, escrever e manipular dados no formato JSON
+import os # Fornece acesso a funções do sistema operacional
+import sqlite3 # Banco SQLite usado como cache persistente em disco
+import threading
+import time
+from collections import OrderedDict # Dicionário que preserva a ordem, base da política LRU
+from datetime import timedelta # Fornece ferramentas para manipular datas e horários.
+
+from metricas import metricas
+
+CACHE_DB_PADRAO = os.getenv("CACHE_RESULTADOS_DB", "cache_resultados.db") # Arquivo do cache persistente
+
+# Serialização canônica: chaves ordenadas e sem espaços, para que a ordem dos campos no arquivo não mude o hash
+def _json_canonico(dados):
+    return json.dumps(dados, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+# Impressão digital do trecho do banco que decide o resultado de um input: a entrada do hardware.
+# Editar um hardware invalida só as entradas de cache daquele hardware.
+# Para hardware desconhecido, o que importa é a lista de hardwares existentes.
+def impressao_digital_banco(banco, hardware=None):
+    if isinstance(hardware, str) and hardware in banco:
+        trecho = {hardware: banco[hardware]}
+    else:
+        trecho = sorted(banco.keys())
+    return hashlib.sha256(_json_canonico(trecho).encode("utf-8")).hexdigest()
+
+# Chave única do cache: input completo normalizado + impressão digital do banco + modelo + versão do prompt.
+# Dois inputs que diferem em qualquer campo (Bluetooth, Rede, ...) nunca compartilham a mesma chave.
+def gerar_chave_cache(input_json, banco, modelo, versao_prompt):
+    partes = {
+        "input": input_json,
+        "banco": impressao_digital_banco(banco, input_json.get("Hardware")),
+        "modelo": modelo,
+        "prompt": versao_prompt
+    }
+    return hashlib.sha256(_json_canonico(partes).encode("utf-8")).hexdigest()
+
+# Tamanho aproximado (em bytes) de um valor guardado no cache, usado no limite por memória
+def _tamanho_bytes(valor):
+    if isinstance(valor, str):
+        return len(valor.encode("utf-8"))
+    return len(json.dumps(valor, ensure_ascii=False, default=str).encode("utf-8"))
+
+# Cache de resultados com expiração e política LRU (remove o item usado há mais tempo).
+# Todas as operações são O(1): o OrderedDict mantém a ordem de uso, e um segundo OrderedDict
+# mantém a ordem de inserção, que é a própria ordem de expiração (o TTL é o mesmo para todos).
+class ResultCache:
+    def __init__(self, max_size=100, ttl_hours=24, max_bytes=None, intervalo_limpeza=1000):
+        self.cache = OrderedDict() #Itens em cache, do menos para o mais recentemente usado
+        self.insercao = OrderedDict() #Chave -> momento da inserção, do mais antigo para o mais novo
+        self.max_size = max_size  #Número máximo de itens permitidos no cache
+        self.max_bytes = max_bytes #Limite opcional de memória ocupada pelos valores
+        self.ttl = timedelta(hours=ttl_hours) #Tempo de vida (TTL) dos itens no cache
+        self.intervalo_limpeza = intervalo_limpeza #A cada quantas operações os itens expirados são removidos
+        self.bytes_usados = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._operacoes = 0
+
+    def add(self, key, value):
+        tamanho = _tamanho_bytes(value)
+        if self.max_bytes and tamanho > self.max_bytes:
+            return # Valor maior que o cache inteiro: não vale a pena guardar
+        if key in self.cache:
+            self._remover(key)
+        self.cache[key] = {
+            'value': value, #Valor do resultado em cache
+            'timestamp': time.monotonic(), #Momento em que o item foi adicionado (para expiração)
+            'tamanho': tamanho
+        }
+        self.insercao[key] = self.cache[key]['timestamp']
+        self.bytes_usados += tamanho
+        self._limpeza_periodica()
+        while len(self.cache) > self.max_size or (self.max_bytes and self.bytes_usados > self.max_bytes):
+            self.cleanup() #Remove o item menos usado se o cache estiver cheio
+
+    def get(self, key):
+        self._limpeza_periodica() # Antes da consulta: a limpeza pode remover justamente o item procurado
+        item = self.cache.get(key) #Tenta recuperar o item pelo identificador
+        if item is None:
+            self.misses += 1
+            return None
+        # Expiração preguiçosa: o item vencido é removido no momento em que é consultado
+        if (time.monotonic() - item['timestamp']) >= self.ttl.total_seconds():
+            self._remover(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self.cache.move_to_end(key) # Marca como usado recentemente
+        self.hits += 1
+        return item['value'] # Retorna o valor do cache se estiver válido
+
+    def cleanup(self): # Remove o item usado há mais tempo (LRU) para liberar espaço
+        oldest_key = next(iter(self.cache))
+        self._remover(oldest_key)
+        self.evictions += 1
+
+    def remover_expirados(self):
+        """Remove todos os itens vencidos, começando pelos inseridos há mais tempo."""
+        limite = time.monotonic() - self.ttl.total_seconds()
+        while self.insercao:
+            key, timestamp = next(iter(self.insercao.items()))
+            if timestamp > limite:
+                break
+            self._remover(key)
+            self.expirations += 1
+
+    def estatisticas(self):
+        return {
+            "itens": len(self.cache),
+            "bytes": self.bytes_usados,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+    def _remover(self, key):
+        item = self.cache.pop(key)
+        del self.insercao[key]
+        self.bytes_usados -= item['tamanho']
+
+    def _limpeza_periodica(self):
+        self._operacoes += 1
+        if self._operacoes >= self.intervalo_limpeza:
+            self._operacoes = 0
+            self.remover_expirados()
+
+# Cache persistente em SQLite, com a mesma interface add/get e a mesma expiração por TTL do ResultCache.
+# O arquivo sobrevive ao fechamento da janela e pode ser usado por vários processos ao mesmo tempo
+# (modo WAL + espera por bloqueio), inclusive a partir de uma pasta compartilhada.
+# Como as chaves incluem o conteúdo do banco (gerar_chave_cache), o TTL padrão pode ser bem maior.
+# Um ResultCache em memória fica na frente do SQLite para evitar leituras repetidas do disco.
+class ResultCachePersistente:
+    def __init__(self, caminho=CACHE_DB_PADRAO, max_size=10000, ttl_hours=24 * 30, max_size_memoria=1000,
+                 intervalo_limpeza=100):
+        self.caminho = caminho
+        self.max_size = max_size
+        # A cada quantas gravações o limite max_size é conferido (contar as linhas percorre a tabela inteira);
+        # entre uma conferência e outra o cache pode passar do limite em até intervalo_limpeza - 1 itens por processo
+        self.intervalo_limpeza = intervalo_limpeza
+        self._gravacoes = 0
+        self.ttl = timedelta(hours=ttl_hours)
+        # TTL curto na memória: o item é recarregado do disco e não ultrapassa o TTL do SQLite em mais de 1 hora
+        self.memoria = ResultCache(max_size=max_size_memoria, ttl_hours=min(ttl_hours, 1))
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local() # Uma conexão por thread (sqlite3 não compartilha conexões entre threads)
+        with self._conexao() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "chave TEXT PRIMARY KEY, valor TEXT NOT NULL, timestamp REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_timestamp ON cache(timestamp)")
+
+    def _conexao(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.caminho, timeout=30)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL") # Leitores não bloqueiam o processo que está gravando
+            except sqlite3.OperationalError:
+                pass # Outro processo está ativando o WAL ao mesmo tempo; o modo fica gravado no arquivo
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, key, value):
+        conn = self._conexao()
+        with conn: # Cada "with" é uma transação atômica
+            conn.execute("BEGIN IMMEDIATE") # Pega a trava de escrita antes de marcar o horário do item
+            agora = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (chave, valor, timestamp) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), agora)
+            )
+            self._gravacoes += 1
+            if self._gravacoes >= self.intervalo_limpeza:
+                self._gravacoes = 0
+                self.cleanup(conn, agora)
+        self.memoria.add(key, value)
+
+    def get(self, key):
+        with metricas.cronometrar("consulta_cache"):
+            valor = self._buscar(key)
+        if valor is None:
+            self.misses += 1
+            metricas.incrementar("cache_falhas")
+        else:
+            self.hits += 1
+            metricas.incrementar("cache_acertos")
+        return valor
+
+    def _buscar(self, key):
+        valor = self.memoria.get(key)
+        if valor is not None:
+            return valor
+        linha = self._conexao().execute(
+            "SELECT valor, timestamp FROM cache WHERE chave = ?", (key,)
+        ).fetchone()
+        # Verifica se o item existe e se ainda está dentro do tempo de validade (TTL)
+        if linha and (time.time() - linha[1]) < self.ttl.total_seconds():
+            valor = json.loads(linha[0])
+            self.memoria.add(key, valor)
+            return valor
+        return None
+
+    def estatisticas(self):
+        return {"hits": self.hits, "misses": self.misses, "memoria": self.memoria.estatisticas()}
+
+    def cleanup(self, conn, agora):
+        """Remove itens expirados e, se o cache passar do limite, os mais antigos."""
+        conn.execute("DELETE FROM cache WHERE timestamp < ?", (agora - self.ttl.total_seconds(),))
+        excesso = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_size
+        if excesso > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE chave IN (SELECT chave FROM cache ORDER BY timestamp LIMIT ?)",
+                (excesso,)
+            )
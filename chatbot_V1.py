@@ -1,14 +1,11 @@
 import tkinter as tk
 from tkinter import scrolledtext, messagebox, simpledialog
 import json
-import requests
 from datetime import datetime
-import os
-from dotenv import load_dotenv
+from cliente_deepseek import MODELO_DEEPSEEK, postar_deepseek, postar_deepseek_stream
+from tarefas_ui import ExecutorEmSegundoPlano
 
 # Configurações
-load_dotenv()
-DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
 BANCO_DADOS = "software_db.json"
 
 class DeepSeekChatbot:
@@ -22,6 +19,8 @@ class DeepSeekChatbot:
         
         # Interface
         self.criar_interface()
+        # Consulta a API sem travar a janela; o envio fica bloqueado enquanto uma resposta chega
+        self.executor = ExecutorEmSegundoPlano(master, ao_mudar_estado=self.atualizar_estado)
         self.adicionar_mensagem("Chatbot", 
             "Olá! Sou um assistente técnico integrado com DeepSeek.\n"
             "Você pode perguntar sobre:\n"
@@ -62,13 +61,14 @@ class DeepSeekChatbot:
         self.entrada.pack(side=tk.LEFT, fill=tk.X, expand=True)
         self.entrada.bind("<Return>", self.enviar_pergunta)
         
-        tk.Button(
+        self.botao_enviar = tk.Button(
             frame_entrada,
             text="Enviar",
             command=self.enviar_pergunta,
             bg="#4CAF50",
             fg="white"
-        ).pack(side=tk.LEFT, padx=5)
+        )
+        self.botao_enviar.pack(side=tk.LEFT, padx=5)
     
     def carregar_banco_dados(self):
         try:
@@ -80,8 +80,8 @@ class DeepSeekChatbot:
 
     def enviar_pergunta(self, event=None):
         pergunta = self.entrada.get().strip()
-        if not pergunta:
-            return
+        if not pergunta or self.executor.ocupado:
+            return # Uma pergunta por vez: o texto da resposta em andamento não pode ir parar sob outro cabeçalho
             
         self.adicionar_mensagem("Você", pergunta, "user")
         self.entrada.delete(0, tk.END)
@@ -96,18 +96,21 @@ class DeepSeekChatbot:
             )
         }
         
-        resposta = self.consultar_deepseek(contexto)
-        self.adicionar_mensagem("Assistente", resposta, "bot")
+        # A resposta chega em streaming: o cabeçalho aparece já e o texto vai sendo acrescentado
+        self.iniciar_mensagem("Assistente", "bot")
+        self.executor.enviar(
+            self.consultar_deepseek,
+            (contexto, lambda trecho: self.executor.na_interface(self.acrescentar_texto, trecho)),
+            self.finalizar_resposta
+        )
 
-    def consultar_deepseek(self, contexto):
-        """Consulta a API do DeepSeek com contexto estruturado"""
-        headers = {
-            "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
+    def atualizar_estado(self, pendentes):
+        self.botao_enviar.config(state=tk.DISABLED if pendentes else tk.NORMAL)
+
+    def consultar_deepseek(self, contexto, ao_receber=None):
+        """Consulta a API do DeepSeek com contexto estruturado (em streaming se ao_receber for informado)"""
         payload = {
-            "model": "deepseek-chat",
+            "model": MODELO_DEEPSEEK,
             "messages": [
                 {
                     "role": "system",
@@ -130,17 +133,31 @@ class DeepSeekChatbot:
         }
         
         try:
-            response = requests.post(
-                "https://api.deepseek.com/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
+            if ao_receber:
+                return postar_deepseek_stream(payload, ao_receber, timeout=30,
+                                              deve_parar=self.executor.tarefa_cancelada)
+            return postar_deepseek(payload, timeout=30) # Sessão compartilhada: reaproveita a conexão entre perguntas
         except Exception as e:
             return f"⚠ Erro na consulta à API: {str(e)}"
 
+    def iniciar_mensagem(self, remetente, tag=None):
+        self.conversa.config(state='normal')
+        agora = datetime.now().strftime("%H:%M:%S")
+        self.conversa.insert(tk.END, f"[{agora}] {remetente}:\n", tag)
+        self.conversa.config(state='disabled')
+        self.conversa.see(tk.END)
+
+    def acrescentar_texto(self, texto, tag=None):
+        self.conversa.config(state='normal')
+        self.conversa.insert(tk.END, texto, tag)
+        self.conversa.config(state='disabled')
+        self.conversa.see(tk.END)
+
+    def finalizar_resposta(self, resposta, erro):
+        if erro or (resposta or "").startswith("⚠"):
+            self.acrescentar_texto(str(erro or resposta), "error") # Erros só aparecem no final
+        self.acrescentar_texto("\n\n")
+
     def adicionar_mensagem(self, remetente, mensagem, tag=None):
         self.conversa.config(state='normal')
         agora = datetime.now().strftime("%H:%M:%S")
@@ -0,0 +1,277 @@
+import json # Permite ler, escrever e manipular dados no formato JSON
+import os # Fornece acesso a funções do sistema operacional
+import random # Variação aleatória (jitter) no tempo de espera entre retentativas
+import threading # Controle de acesso ao limitador de taxa entre várias threads
+import time
+from concurrent.futures import ThreadPoolExecutor # Pool de threads para manter várias requisições em andamento
+import requests #Permite fazer requisições HTTP para comunicação com com a DeepSeek.
+from dotenv import load_dotenv # Carrega variáveis de ambiente do arquivo .env, protegendo a chave de API.
+from indice_banco import IndiceBanco
+from metricas import metricas
+from motor_regras import CAMPOS_RESULTADO, rotear_campos
+from prompts_deepseek import (
+    VERSAO_PROMPT_ANALISE, VERSAO_PROMPT_EXPLICACAO, VERSAO_PROMPT_HIBRIDO, montar_mensagens_analise,
+    montar_mensagens_analise_lote, montar_mensagens_explicacao
+)
+from resultados import ORIGEM_DEEPSEEK, ORIGEM_LOCAL_INCERTO, interpretar_resultados
+
+# Cliente compartilhado da API do DeepSeek: sessão HTTP com pool de conexões, retentativas com backoff em 429/5xx,
+# limitador de taxa (token bucket) e execução concorrente para o modo em lote.
+
+# Carrega variáveis do .env
+load_dotenv()
+deepseek_api_key = os.getenv("DEEPSEEK_API_KEY") #Local onde a API key está localizada
+# Endereço base da API. Pode apontar para o servidor local de testes (servidor_mock_deepseek.py), ex: http://127.0.0.1:8765/v1
+DEEPSEEK_BASE_URL = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1").rstrip("/")
+DEEPSEEK_URL = f"{DEEPSEEK_BASE_URL}/chat/completions"
+MODELO_DEEPSEEK = "deepseek-chat"
+
+TAMANHO_POOL = int(os.getenv("DEEPSEEK_POOL", "10")) # Conexões mantidas abertas (keep-alive) com a API
+TIMEOUT_CONEXAO = float(os.getenv("DEEPSEEK_TIMEOUT_CONEXAO", "10")) # Tempo máximo para abrir a conexão TCP+TLS
+
+MAX_TENTATIVAS = 4 # Número máximo de tentativas por requisição
+ESPERA_BASE = 1.0 # Espera inicial (segundos) do backoff exponencial
+ESPERA_MAXIMA = 30.0 # Teto da espera entre tentativas
+STATUS_RETENTAVEIS = {429, 500, 502, 503, 504} # Respostas que valem uma nova tentativa
+MAX_TOKENS_POR_INPUT_LOTE = 400 # Resposta reservada para cada input no modo lote (um bloco RESULTADOS)
+MAX_TOKENS_RESPOSTA = 8000 # Limite de tokens de saída aceito pela API
+
+# Sessão HTTP compartilhada por todas as chamadas (validador, feedback e chatbot): as conexões ficam
+# abertas entre requisições, evitando um novo handshake TCP+TLS a cada chamada.
+_sessao = None
+_lock_sessao = threading.Lock()
+
+def configurar_cliente(tamanho_pool=None, timeout_conexao=None, url_base=None):
+    """Recria a sessão com outro tamanho de pool (ex: igual à concorrência do modo em lote) ou outro endereço da API."""
+    global _sessao, TAMANHO_POOL, TIMEOUT_CONEXAO, DEEPSEEK_BASE_URL, DEEPSEEK_URL
+    with _lock_sessao:
+        if tamanho_pool:
+            TAMANHO_POOL = tamanho_pool
+        if timeout_conexao:
+            TIMEOUT_CONEXAO = timeout_conexao
+        if url_base:
+            DEEPSEEK_BASE_URL = url_base.rstrip("/")
+            DEEPSEEK_URL = f"{DEEPSEEK_BASE_URL}/chat/completions"
+        if _sessao is not None:
+            _sessao.close()
+        _sessao = None
+
+def obter_sessao():
+    global _sessao
+    with _lock_sessao:
+        if _sessao is None:
+            sessao = requests.Session()
+            adaptador = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=TAMANHO_POOL)
+            sessao.mount("https://", adaptador)
+            sessao.mount("http://", adaptador)
+            sessao.headers.update({
+                "Authorization": f"Bearer {deepseek_api_key}",
+                "Content-Type": "application/json"
+            })
+            _sessao = sessao
+        return _sessao
+
+# Limitador de taxa no modelo token bucket: cada requisição consome uma ficha,
+# e as fichas são repostas continuamente na taxa configurada (requisições por segundo).
+class LimitadorTaxa:
+    def __init__(self, taxa_por_segundo, capacidade=None):
+        self.taxa = float(taxa_por_segundo)
+        self.capacidade = float(capacidade or max(1.0, taxa_por_segundo)) # Rajada máxima permitida
+        self.fichas = self.capacidade
+        self.ultimo = time.monotonic()
+        self.lock = threading.Lock()
+
+    def adquirir(self):
+        """Bloqueia até existir uma ficha disponível."""
+        while True:
+            with self.lock:
+                agora = time.monotonic()
+                self.fichas = min(self.capacidade, self.fichas + (agora - self.ultimo) * self.taxa)
+                self.ultimo = agora
+                if self.fichas >= 1:
+                    self.fichas -= 1
+                    return
+                espera = (1 - self.fichas) / self.taxa
+            time.sleep(espera)
+
+# Calcula o tempo de espera antes da próxima tentativa, respeitando o cabeçalho Retry-After quando existir
+def _tempo_espera(tentativa, response=None):
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(ESPERA_MAXIMA, float(retry_after))
+            except ValueError:
+                pass
+    espera = min(ESPERA_MAXIMA, ESPERA_BASE * (2 ** tentativa))
+    return espera * random.uniform(0.5, 1.0)
+
+# Envia o payload para a API e devolve a resposta HTTP já verificada.
+# Erros de conexão, timeout, 429 e 5xx são repetidos com backoff exponencial; os demais erros sobem como exceção.
+# Cada tentativa conta como uma requisição nas métricas, e cada repetição como uma retentativa.
+# timeout é o tempo máximo de leitura da resposta; a conexão tem o limite próprio TIMEOUT_CONEXAO.
+def _enviar_com_retentativa(payload, timeout, limitador, max_tentativas, stream=False):
+    sessao = obter_sessao()
+    for tentativa in range(max_tentativas):
+        ultima = tentativa == max_tentativas - 1
+        if limitador:
+            limitador.adquirir()
+        metricas.incrementar("api_requisicoes")
+        try:
+            response = sessao.post(DEEPSEEK_URL, json=payload, timeout=(TIMEOUT_CONEXAO, timeout), stream=stream)
+        except (requests.ConnectionError, requests.Timeout):
+            if ultima:
+                raise
+            metricas.incrementar("api_retentativas")
+            time.sleep(_tempo_espera(tentativa))
+            continue
+
+        if response.status_code in STATUS_RETENTAVEIS and not ultima:
+            response.close()
+            metricas.incrementar("api_retentativas")
+            time.sleep(_tempo_espera(tentativa, response))
+            continue
+        response.raise_for_status()
+        return response
+
+# Envia o payload para a API e devolve o conteúdo da resposta completa
+def postar_deepseek(payload, timeout=60, limitador=None, max_tentativas=MAX_TENTATIVAS):
+    response = _enviar_com_retentativa(payload, timeout, limitador, max_tentativas)
+    dados = response.json()
+    metricas.registrar_uso(dados.get("usage"))
+    return dados['choices'][0]['message']['content']
+
+# Versão em streaming (SSE, "stream": true): cada trecho de texto é repassado a ao_receber assim que chega,
+# e o texto completo é devolvido no final. deve_parar() permite interromper a leitura (ex: botão Cancelar).
+# As retentativas só acontecem antes do primeiro trecho, nunca no meio da resposta.
+# include_usage pede o consumo de tokens no último evento do stream, que vai para as métricas.
+def postar_deepseek_stream(payload, ao_receber, timeout=60, limitador=None, deve_parar=None,
+                           max_tentativas=MAX_TENTATIVAS):
+    payload = dict(payload, stream=True, stream_options={"include_usage": True})
+    response = _enviar_com_retentativa(payload, timeout, limitador, max_tentativas, stream=True)
+    partes = []
+    with response:
+        response.encoding = "utf-8"
+        for linha in response.iter_lines(chunk_size=None, decode_unicode=True): # Entrega cada pedaço assim que chega
+            if deve_parar and deve_parar():
+                break
+            # Formato SSE: linhas "data: {json}", encerradas por "data: [DONE]"; linhas vazias e comentários são ignorados
+            if not linha or not linha.startswith("data:"):
+                continue
+            dados = linha[len("data:"):].strip()
+            if dados == "[DONE]":
+                break
+            evento = json.loads(dados)
+            metricas.registrar_uso(evento.get("usage"))
+            escolhas = evento.get("choices") or [{}]
+            trecho = (escolhas[0].get("delta") or {}).get("content")
+            if trecho:
+                partes.append(trecho)
+                ao_receber(trecho)
+    return "".join(partes)
+
+# Junta os trechos recebidos em streaming e chama ao_completar_linha para cada linha terminada,
+# permitindo processar cada linha do bloco RESULTADOS sem esperar a resposta inteira.
+class DivisorLinhas:
+    def __init__(self, ao_completar_linha):
+        self.ao_completar_linha = ao_completar_linha
+        self.buffer = ""
+
+    def __call__(self, trecho):
+        self.buffer += trecho
+        while "\n" in self.buffer:
+            linha, self.buffer = self.buffer.split("\n", 1)
+            self.ao_completar_linha(linha)
+
+    def finalizar(self):
+        if self.buffer:
+            self.ao_completar_linha(self.buffer)
+            self.buffer = ""
+
+# Usa streaming se ao_receber for informado; caso contrário, espera a resposta completa.
+# O tempo inclui as retentativas; falhas que chegam a quem chamou contam como erro da API.
+def _postar(payload, timeout, limitador, ao_receber=None, deve_parar=None):
+    with metricas.cronometrar("chamada_api"):
+        try:
+            if ao_receber:
+                return postar_deepseek_stream(payload, ao_receber, timeout=timeout, limitador=limitador,
+                                              deve_parar=deve_parar)
+            return postar_deepseek(payload, timeout=timeout, limitador=limitador)
+        except Exception:
+            metricas.incrementar("api_erros")
+            raise
+
+# Executa funcao(*argumentos) para cada item, mantendo até max_concorrencia requisições em andamento.
+# Os resultados voltam na mesma ordem dos itens.
+def executar_em_paralelo(funcao, lista_argumentos, max_concorrencia=4):
+    with ThreadPoolExecutor(max_workers=max(1, max_concorrencia)) as executor:
+        return list(executor.map(lambda argumentos: funcao(*argumentos), lista_argumentos))
+
+# Função para análise via DeepSeek, onde são passadas as instruções necessárias para a IA verificar os inputs.
+# O prompt leva só o trecho do banco relevante para o input (montar_contexto_hardware), em JSON compacto.
+# Com ao_receber, a resposta chega em streaming (trecho a trecho). Com campos, só essas linhas são pedidas.
+def analisar_deepseek(banco_de_dados, input_json, limitador=None, ao_receber=None, deve_parar=None, campos=None):
+    payload = {
+        "model": MODELO_DEEPSEEK,
+        "messages": montar_mensagens_analise(banco_de_dados, input_json, campos),
+        "temperature": 0,
+        "max_tokens": 800
+    }
+
+    try:
+        return _postar(payload, 60, limitador, ao_receber, deve_parar)
+    except Exception as e:
+        return f"ERRO: {str(e)}"
+
+# Roteamento híbrido: o motor local decide tudo o que pode com certeza (rotear_campos)
+# e só os campos duvidosos são enviados ao DeepSeek. Cada ResultadoCampo registra quem o decidiu (origem).
+def analisar_hibrido(banco_de_dados, input_json, limitador=None):
+    resultados, duvidosos = rotear_campos(banco_de_dados, input_json)
+    if not duvidosos:
+        return resultados # Nenhuma chamada à API
+    return completar_com_deepseek(banco_de_dados, input_json, resultados, duvidosos, limitador)
+
+def completar_com_deepseek(banco_de_dados, input_json, resultados, duvidosos, limitador=None):
+    """Substitui os campos duvidosos pela resposta da IA. Se ela falhar, o resultado local fica marcado como incerto."""
+    banco = banco_de_dados.banco if isinstance(banco_de_dados, IndiceBanco) else banco_de_dados
+    campos = [campo for campo in CAMPOS_RESULTADO if campo in duvidosos]
+    resposta = analisar_deepseek(banco, input_json, limitador, campos=campos)
+    da_ia = {} if resposta.startswith("ERRO") else {r.campo: r for r in interpretar_resultados(resposta, ORIGEM_DEEPSEEK)}
+    combinados = []
+    for r in resultados:
+        if r.campo not in duvidosos:
+            combinados.append(r)
+        elif r.campo in da_ia:
+            combinados.append(da_ia[r.campo]._replace(origem=ORIGEM_DEEPSEEK))
+        else:
+            combinados.append(r._replace(origem=ORIGEM_LOCAL_INCERTO))
+    return combinados
+
+# Vários inputs do mesmo hardware em uma única requisição: itens é uma lista de (id, input_json).
+# A resposta traz um bloco RESULTADOS por ID; use dividir_resposta_lote para separá-los.
+def analisar_lote_deepseek(banco_de_dados, itens, limitador=None):
+    payload = {
+        "model": MODELO_DEEPSEEK,
+        "messages": montar_mensagens_analise_lote(banco_de_dados, itens),
+        "temperature": 0,
+        "max_tokens": min(MAX_TOKENS_POR_INPUT_LOTE * len(itens), MAX_TOKENS_RESPOSTA)
+    }
+
+    try:
+        return _postar(payload, 60 + 10 * len(itens), limitador)
+    except Exception as e:
+        return f"ERRO: {str(e)}"
+
+# Etapa opcional: pede ao DeepSeek apenas uma explicação do resultado já decidido pelo motor local
+def explicar_deepseek(banco_de_dados, input_json, resultado_local, limitador=None, ao_receber=None, deve_parar=None):
+    payload = {
+        "model": MODELO_DEEPSEEK,
+        "messages": montar_mensagens_explicacao(banco_de_dados, input_json, resultado_local),
+        "temperature": 0,
+        "max_tokens": 500
+    }
+
+    try:
+        return _postar(payload, 60, limitador, ao_receber, deve_parar)
+    except Exception as e:
+        return f"ERRO: {str(e)}"
@@ -0,0 +1,113 @@
+import re # Leitura do texto livre dos feedbacks
+from cache_resultados import impressao_digital_banco
+from registro_feedback import hardware_do_registro
+from resultados import ORIGEM_CORRECAO, ResultadoCampo, interpretar_resultados
+
+# Correções aprendidas com os feedbacks do tipo "correcao": quando alguém informa que um campo deveria ter dado
+# PASS (ou FAIL) para um valor de um hardware, o mesmo veredito é aplicado localmente nas próximas análises,
+# antes de qualquer chamada à API. Chave: (hardware, campo, valor observado).
+# Cada correção guarda a impressão digital da entrada do hardware no banco (campo "impressao_banco" do feedback):
+# se o software_db.json mudar para aquele hardware, a correção deixa de valer e o motor local volta a decidir.
+# Feedbacks antigos, gravados sem a impressão digital, continuam valendo.
+
+# Formas de escrever o nome de cada campo no feedback. O nome precisa aparecer inteiro logo antes de "deveria",
+# no máximo seguido de ":" e de valores com números ("Bluetooth 5.0", "Android 14", "Rede 4G").
+# "sim" em minúsculas é a resposta "sim", não o campo: SIM só vale em maiúsculas ou como rótulo ("Sim: ...").
+# Os nomes mais longos vêm antes dos mais curtos que começam igual ("versão android" antes de "versão").
+_NOMES_CAMPOS = {
+    "RELAÇÃO_SOFTWARE_REGIAO": [r"rela[çc][ãa]o(?:[\s_]*software[\s_/]*regi[ãa]o)?", r"software[\s_/]*regi[ãa]o"],
+    "VERSAO_ANDROID": [r"vers[ãa]o[\s_]*(?:do[\s_]+)?android", r"android", r"vers[ãa]o"],
+    "HARDWARE": [r"hardware"],
+    "SOFTWARE": [r"software"],
+    "WIFI": [r"wi[\s-]?fi"],
+    "NFC": [r"nfc"],
+    "BLUETOOTH": [r"bluetooth"],
+    "SIM": [r"(?-i:SIM)", r"sim(?=\s*:)"],
+    "REDE": [r"rede"],
+}
+_CAMPOS = list(_NOMES_CAMPOS)
+
+# "<campo> deveria ser PASS", "<campo> deveria ter dado pass", "<campo> 5.0 deveria dar FAIL"...
+_CORRECAO = re.compile(
+    r"(?<![\w-])(?:" + "|".join(f"(?P<c{i}>{'|'.join(nomes)})" for i, nomes in enumerate(_NOMES_CAMPOS.values())) + ")"
+    # Valores separados por espaços; cada um se divide de um jeito só (letras, primeiro dígito, resto),
+    # para que uma sequência longa de números não faça a expressão testar combinações sem fim
+    r"(?:\s*:)?(?:\s*[^\W\d]*\d[\w.+]*(?:\s+[^\W\d]*\d[\w.+]*)*)?"
+    r"\s+deveria\s+(?:ser|ter\s+dado|ter\s+sido|dar|estar|ficar)?\s*(?:como\s+)?(?P<status>PASS|FAIL)\b\s*\.?\s*"
+    r"(?:Motivo\s*:\s*(?P<motivo>[^\n]*))?",
+    re.IGNORECASE
+)
+
+def interpretar_correcao(texto):
+    """Extrai de um feedback as correções pedidas: lista de (campo, status, motivo)."""
+    correcoes = []
+    for encontrado in _CORRECAO.finditer(texto or ""):
+        campo = next(campo for i, campo in enumerate(_CAMPOS) if encontrado.group(f"c{i}"))
+        correcoes.append((campo, encontrado.group("status").upper(), (encontrado.group("motivo") or "").strip() or None))
+    return correcoes
+
+def _chave(hardware, campo, valor):
+    return (hardware, campo, str(valor).strip().casefold())
+
+def _resultados_do_registro(registro):
+    if registro.get("resultados"):
+        return [ResultadoCampo(**r) for r in registro["resultados"]]
+    return interpretar_resultados(registro.get("resultado_original") or "")
+
+class CacheCorrecoes:
+    def __init__(self, registro_feedback=None):
+        self.correcoes = {} # (hardware, campo, valor) -> (status, motivo, impressão digital do banco ou None)
+        if registro_feedback is not None:
+            self.carregar(registro_feedback)
+
+    def __len__(self):
+        return len(self.correcoes)
+
+    def carregar(self, registro_feedback):
+        """Lê todos os feedbacks de correção (pelo índice de tipo); os mais recentes prevalecem."""
+        self.correcoes.clear()
+        for registro in registro_feedback.listar(tipo="correcao"):
+            self.registrar(registro)
+
+    def registrar(self, registro):
+        """Acrescenta as correções de um feedback recém-salvo. Feedbacks de outros tipos são ignorados."""
+        if registro.get("tipo") != "correcao":
+            return 0
+        hardware = hardware_do_registro(registro)
+        valores = {r.campo: r.valor for r in _resultados_do_registro(registro)}
+        novas = 0
+        for campo, status, motivo in interpretar_correcao(registro.get("feedback")):
+            if hardware and campo in valores:
+                self.correcoes[_chave(hardware, campo, valores[campo])] = (status, motivo, registro.get("impressao_banco"))
+                novas += 1
+        return novas
+
+    def aplicar(self, resultados, banco):
+        """Aplica as correções conhecidas que ainda valem para o banco atual (dicionário ou IndiceBanco).
+        Retorna (resultados, conjunto dos campos cobertos por uma correção).
+        Os campos cobertos não precisam ir para a IA, mesmo quando a correção confirma o veredito local."""
+        if not self.correcoes:
+            return resultados, set()
+        banco = getattr(banco, "banco", banco)
+        hardware = next((r.valor for r in resultados if r.campo == "HARDWARE"), None)
+        atual = None # Impressão digital da entrada do hardware, calculada só se alguma correção for encontrada
+        corrigidos = []
+        cobertos = set()
+        for r in resultados:
+            correcao = self.correcoes.get(_chave(hardware, r.campo, r.valor))
+            if correcao is not None and correcao[2] is not None:
+                atual = atual or impressao_digital_banco(banco, hardware)
+                if correcao[2] != atual:
+                    correcao = None # Feita para outra versão do banco
+            if correcao is None:
+                corrigidos.append(r)
+                continue
+            cobertos.add(r.campo)
+            status, motivo, _ = correcao
+            if status == r.status:
+                corrigidos.append(r)
+            elif status == "PASS":
+                corrigidos.append(r._replace(status="PASS", esperado=None, origem=ORIGEM_CORRECAO))
+            else:
+                corrigidos.append(r._replace(status="FAIL", esperado=motivo or "corrigido por feedback", origem=ORIGEM_CORRECAO))
+        return corrigidos, cobertos
@@ -0,0 +1,209 @@
+import argparse # Leitura dos argumentos da linha de comando
+import json # Permite ler, escrever e manipular dados no formato JSON
+import os # Fornece acesso a funções do sistema operacional
+import random # Sorteios com semente: o mesmo tamanho e a mesma semente geram sempre o mesmo catálogo
+import string
+import zipfile
+
+from indice_banco import versao_numerica
+
+# Gerador de catálogos sintéticos no formato do software_db.json, de qualquer tamanho (milhares de hardwares,
+# centenas de regiões, Regioes como dicionário ou como lista), e de inputs válidos e inválidos que combinam com eles,
+# na mesma estrutura de pastas do Inputs.zip. Serve para medir como carga, memória, índice e validação crescem
+# com o tamanho dos dados (benchmark.py --escala). Uso:
+#   python gerador_sintetico.py sintetico --hardwares 5000 --regioes 300 --inputs 20000 --zip
+
+PAISES = [
+    "Australia", "Brazil", "Canada", "France", "Germany", "India", "Japan", "Mexico", "South Africa", "USA",
+    "Argentina", "Chile", "China", "Egypt", "Indonesia", "Italy", "Kenya", "Nigeria", "Poland", "Portugal",
+    "South Korea", "Spain", "Sweden", "Turkey", "United Kingdom", "Vietnam"
+]
+ANDROIDS = [f"Android {v}" for v in range(8, 17)]
+WIFI = ["2.4GHz", "5GHz", "6GHz"]
+REDES = ["2G", "3G", "4G", "5G", "6G"]
+BLUETOOTH = ["4.0", "4.2", "5.0", "5.1", "5.2", "5.3"]
+SIMS = ["Single SIM", "Dual SIM", "eSIM", "Single SIM (fisico)", "sem eSIM"]
+
+PASTA_VALIDOS = "Inputs/Inputs_Validos"
+PASTA_INVALIDOS = "Inputs/Inputs_Invalidos_Renomeados"
+
+def gerar_regioes(quantidade):
+    """Nomes de região: os países do banco real e, depois deles, "Regiao_0027", "Regiao_0028"..."""
+    return (PAISES + [f"Regiao_{i:04d}" for i in range(len(PAISES), quantidade)])[:quantidade]
+
+def _subsequencia(aleatorio, opcoes, minimo=1):
+    # Trecho contínuo de uma lista ordenada (versões e tecnologias costumam ser faixas)
+    tamanho = aleatorio.randint(minimo, len(opcoes))
+    inicio = aleatorio.randint(0, len(opcoes) - tamanho)
+    return opcoes[inicio:inicio + tamanho]
+
+def gerar_hardware(aleatorio, regioes, softwares_por_hardware=10, regioes_por_hardware=10, regioes_em_lista=False):
+    familia = "".join(aleatorio.choices(string.ascii_uppercase, k=5))
+    softwares = [f"{aleatorio.choice('TUV')}{familia}-VS{i}" for i in range(1, softwares_por_hardware + 1)]
+    escolhidas = sorted(aleatorio.sample(regioes, min(len(regioes), aleatorio.randint(2, regioes_por_hardware))))
+    if regioes_em_lista:
+        regioes_hw = escolhidas
+    else:
+        regioes_hw = {regiao: aleatorio.sample(softwares, aleatorio.randint(1, len(softwares))) for regiao in escolhidas}
+
+    androids = _subsequencia(aleatorio, ANDROIDS)
+    mais_recente = ANDROIDS[min(ANDROIDS.index(androids[-1]) + aleatorio.randint(0, 1), len(ANDROIDS) - 1)]
+    if aleatorio.random() < 0.7:
+        bluetooth = aleatorio.choice(BLUETOOTH) + "+"
+    else:
+        bluetooth = aleatorio.choice(BLUETOOTH)
+    sim = _subsequencia(aleatorio, SIMS)
+    return {
+        "Softwares": softwares,
+        "Regioes": regioes_hw,
+        "Androids_disponiveis": androids,
+        "Android_mais_recente": mais_recente,
+        "Tecnologias_suportadas": {
+            "NFC": aleatorio.random() < 0.8,
+            "WiFi": _subsequencia(aleatorio, WIFI),
+            "Rede": _subsequencia(aleatorio, REDES),
+            "Bluetooth": bluetooth,
+            "SIM": sim[0] if len(sim) == 1 else sim
+        }
+    }
+
+def gerar_catalogo(hardwares=1000, regioes=100, softwares_por_hardware=10, regioes_por_hardware=10,
+                   fracao_lista=0.2, semente=0):
+    """Catálogo no formato do software_db.json. fracao_lista: parte dos hardwares com Regioes como lista."""
+    aleatorio = random.Random(semente)
+    nomes_regioes = gerar_regioes(regioes)
+    largura = len(str(hardwares))
+    return {
+        f"Hardware_{i:0{largura}d}": gerar_hardware(aleatorio, nomes_regioes, softwares_por_hardware,
+                                                     regioes_por_hardware, aleatorio.random() < fracao_lista)
+        for i in range(1, hardwares + 1)
+    }
+
+def _como_lista(valor):
+    return valor if isinstance(valor, list) else [valor]
+
+def _fora_de(aleatorio, opcoes, aceitos, padrao):
+    # Um valor da lista de opções que o hardware não aceita; padrao se ele aceitar todas
+    recusados = [o for o in opcoes if o not in aceitos]
+    return aleatorio.choice(recusados) if recusados else padrao
+
+def gerar_input_valido(aleatorio, nome, hw):
+    """Input que passa em todas as regras do motor local para o hardware nome."""
+    regioes = hw["Regioes"]
+    regiao = aleatorio.choice(list(regioes))
+    softwares = hw["Softwares"] if isinstance(regioes, list) else regioes[regiao]
+    tecnologias = hw["Tecnologias_suportadas"]
+    bluetooth = tecnologias["Bluetooth"]
+    if bluetooth.endswith("+"):
+        # Versão mínima: qualquer versão igual ou superior também passa
+        bluetooth = aleatorio.choice([b for b in BLUETOOTH if versao_numerica(b) >= versao_numerica(bluetooth)] or [bluetooth[:-1]])
+    return {
+        "Hardware": nome,
+        "Software": aleatorio.choice(softwares),
+        "Regiao_Execucao": regiao,
+        "Versao_Android": aleatorio.choice(hw["Androids_disponiveis"]),
+        "WiFi": aleatorio.choice(tecnologias["WiFi"]),
+        "NFC": tecnologias["NFC"],
+        "Bluetooth": bluetooth,
+        "SIM": aleatorio.choice(_como_lista(tecnologias["SIM"])),
+        "Rede": aleatorio.choice(tecnologias["Rede"])
+    }
+
+# Falhas possíveis, como nos arquivos de Inputs_Invalidos_Renomeados: cada uma altera um campo do input válido
+FALHAS = ["hardware", "software", "regiao", "regiao_nula", "android", "wifi", "nfc", "bluetooth", "sim", "rede"]
+
+def _quebrar(aleatorio, falha, input_json, hw, banco, regioes):
+    tecnologias = hw["Tecnologias_suportadas"]
+    if falha == "hardware":
+        input_json["Hardware"] = f"Hardware_Inexistente_{aleatorio.randint(1, 999)}"
+    elif falha == "software":
+        outro = banco[aleatorio.choice(list(banco))]
+        input_json["Software"] = _fora_de(aleatorio, outro["Softwares"], hw["Softwares"], "XSOFT-VS0")
+    elif falha == "regiao":
+        input_json["Regiao_Execucao"] = _fora_de(aleatorio, regioes, hw["Regioes"], "Atlantida")
+    elif falha == "regiao_nula":
+        input_json["Regiao_Execucao"] = None
+    elif falha == "android":
+        aceitos = hw["Androids_disponiveis"] + [hw["Android_mais_recente"]] # O motor também aceita a mais recente
+        input_json["Versao_Android"] = _fora_de(aleatorio, ANDROIDS, aceitos, "Android 7")
+    elif falha == "wifi":
+        input_json["WiFi"] = _fora_de(aleatorio, WIFI, tecnologias["WiFi"], "60GHz")
+    elif falha == "nfc":
+        input_json["NFC"] = not tecnologias["NFC"]
+    elif falha == "bluetooth":
+        minimo = versao_numerica(tecnologias["Bluetooth"])
+        if tecnologias["Bluetooth"].endswith("+"):
+            input_json["Bluetooth"] = _fora_de(aleatorio, [b for b in BLUETOOTH if versao_numerica(b) < minimo], [], "3.0")
+        else:
+            input_json["Bluetooth"] = _fora_de(aleatorio, BLUETOOTH, [tecnologias["Bluetooth"]], "3.0")
+    elif falha == "sim":
+        input_json["SIM"] = _fora_de(aleatorio, SIMS, _como_lista(tecnologias["SIM"]), "Triplo SIM")
+    else:
+        input_json["Rede"] = _fora_de(aleatorio, REDES, tecnologias["Rede"], "8G")
+
+def gerar_inputs(banco, quantidade, fracao_invalidos=0.5, max_falhas=3, semente=0):
+    """Inputs para o catálogo: lista de (nome do arquivo, input). Os inválidos têm de 1 a max_falhas campos alterados
+    e o nome terminado em "_com_falha", como no Inputs.zip."""
+    aleatorio = random.Random(semente)
+    nomes = list(banco)
+    regioes = sorted({regiao for hw in banco.values() for regiao in hw.get("Regioes", [])})
+    inputs = []
+    for i in range(1, quantidade + 1):
+        nome = aleatorio.choice(nomes)
+        hw = banco[nome]
+        input_json = gerar_input_valido(aleatorio, nome, hw)
+        if aleatorio.random() < fracao_invalidos:
+            # Falhas distintas: repetir a de NFC, por exemplo, desfaria a primeira
+            for falha in aleatorio.sample(FALHAS, aleatorio.randint(1, max_falhas)):
+                _quebrar(aleatorio, falha, input_json, hw, banco, regioes)
+            inputs.append((f"{PASTA_INVALIDOS}/test_input_{i}_com_falha.json", input_json))
+        else:
+            inputs.append((f"{PASTA_VALIDOS}/test_input_{i}.json", input_json))
+    return inputs
+
+def gravar_conjunto(pasta, banco, inputs, compactar=False):
+    """Grava pasta/software_db.json e os inputs em pasta/Inputs/... (ou em pasta/Inputs.zip, com compactar=True)."""
+    os.makedirs(pasta, exist_ok=True)
+    caminho_banco = os.path.join(pasta, "software_db.json")
+    with open(caminho_banco, "w", encoding="utf-8") as f:
+        json.dump(banco, f, indent=2, ensure_ascii=False)
+
+    if compactar:
+        caminho_inputs = os.path.join(pasta, "Inputs.zip")
+        with zipfile.ZipFile(caminho_inputs, "w", zipfile.ZIP_DEFLATED) as zf:
+            for nome, input_json in inputs:
+                zf.writestr(nome, json.dumps(input_json, indent=2, ensure_ascii=False))
+        return caminho_banco, caminho_inputs
+
+    for subpasta in (PASTA_VALIDOS, PASTA_INVALIDOS):
+        os.makedirs(os.path.join(pasta, subpasta), exist_ok=True)
+    for nome, input_json in inputs:
+        with open(os.path.join(pasta, nome), "w", encoding="utf-8") as f:
+            json.dump(input_json, f, indent=2, ensure_ascii=False)
+    return caminho_banco, os.path.join(pasta, "Inputs")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um catálogo sintético (formato software_db.json) e inputs para ele.")
+    parser.add_argument("pasta", help="Pasta de saída (recebe software_db.json e Inputs/ ou Inputs.zip)")
+    parser.add_argument("--hardwares", type=int, default=1000, help="Quantidade de hardwares (padrão: 1000)")
+    parser.add_argument("--regioes", type=int, default=100, help="Quantidade de regiões distintas (padrão: 100)")
+    parser.add_argument("--softwares", type=int, default=10, help="Softwares por hardware (padrão: 10)")
+    parser.add_argument("--regioes-por-hardware", type=int, default=10, help="Máximo de regiões por hardware (padrão: 10)")
+    parser.add_argument("--fracao-lista", type=float, default=0.2, help="Fração dos hardwares com Regioes como lista (padrão: 0.2)")
+    parser.add_argument("--inputs", type=int, default=1000, help="Quantidade de inputs (padrão: 1000)")
+    parser.add_argument("--fracao-invalidos", type=float, default=0.5, help="Fração de inputs com falha (padrão: 0.5)")
+    parser.add_argument("--semente", type=int, default=0, help="Semente dos sorteios (padrão: 0)")
+    parser.add_argument("--zip", action="store_true", help="Grava os inputs em Inputs.zip em vez de arquivos soltos")
+    args = parser.parse_args(argv)
+
+    banco = gerar_catalogo(args.hardwares, args.regioes, args.softwares, args.regioes_por_hardware,
+                           args.fracao_lista, args.semente)
+    inputs = gerar_inputs(banco, args.inputs, args.fracao_invalidos, semente=args.semente)
+    caminho_banco, caminho_inputs = gravar_conjunto(args.pasta, banco, inputs, args.zip)
+    invalidos = sum(1 for nome, _ in inputs if nome.startswith(PASTA_INVALIDOS))
+    print(f"Catálogo: {caminho_banco} ({len(banco)} hardwares, {os.path.getsize(caminho_banco) / 1e6:.1f} MB)")
+    print(f"Inputs: {caminho_inputs} ({len(inputs) - invalidos} válidos, {invalidos} com falha)")
+    return 0
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+import argparse # Leitura dos argumentos da linha de comando
+import hashlib # Resumo do conteúdo de cada input, que identifica o mesmo input entre execuções
+import json # Permite ler, escrever e manipular dados no formato JSON
+import os # Fornece acesso a funções do sistema operacional
+import sqlite3 # Armazenamento do histórico de resultados
+import sys
+import threading
+from datetime import datetime, timedelta # Fornece ferramentas para manipular datas e horários.
+
+from motor_regras import CAMPOS_RESULTADO
+
+# Histórico de resultados: cada execução (modo em lote, modo de observação ou interface) grava no SQLite
+# o resultado de cada input, com o hash do conteúdo, o caminho do arquivo, o veredito de cada campo,
+# o motor usado, a latência, a impressão digital do banco e a data. As consultas usam os índices e
+# respondem sem revalidar nada, ex: todas as falhas do Hardware_C no Japão nesta semana, ou os inputs
+# cujo veredito mudou entre duas versões do banco. Uso:
+#   python historico_resultados.py consultar --hardware Hardware_C --regiao Japan --status FAIL --semana
+#   python historico_resultados.py versoes
+#   python historico_resultados.py mudancas 3f2a9c 81be04
+
+HISTORICO_DB_PADRAO = os.getenv("HISTORICO_DB", "historico_resultados.db")
+
+# Motores da validação local; quando o DeepSeek foi consultado para o input, o modo é acrescentado (ex: "local+deepseek-explicar")
+MOTOR_LOCAL = "local"
+MOTOR_COLUNAR = "colunar"
+
+FORMATO_DATA = "%Y-%m-%d %H:%M:%S"
+_ORDEM_CAMPOS = {campo: posicao for posicao, campo in enumerate(CAMPOS_RESULTADO)}
+
+def resumo_conteudo(conteudo):
+    """Hash (sha256) do conteúdo do arquivo: o mesmo input tem o mesmo resumo em qualquer execução."""
+    return hashlib.sha256(conteudo).hexdigest()
+
+def _limite_data(texto, fim=False):
+    # Datas sem horário valem o dia inteiro: "AAAA-MM-DD" vira o início ou o fim do dia
+    if texto is not None and len(texto) == 10:
+        return texto + (" 23:59:59" if fim else " 00:00:00")
+    return texto
+
+class HistoricoResultados:
+    def __init__(self, caminho=HISTORICO_DB_PADRAO):
+        self.caminho = caminho
+        self._local = threading.local() # Uma conexão por thread, como no registro de feedbacks
+        with self._conexao() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS execucoes ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, origem TEXT NOT NULL, "
+                "banco TEXT, impressao TEXT NOT NULL, modo_ia TEXT, total INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_execucoes_impressao ON execucoes(impressao)")
+            # Data e impressão do banco repetidas em cada resultado, para os índices filtrarem sem juntar tabelas
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS resultados ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, execucao INTEGER NOT NULL REFERENCES execucoes(id), "
+                "timestamp TEXT NOT NULL, impressao TEXT NOT NULL, arquivo TEXT NOT NULL, hash TEXT, "
+                "hardware TEXT, software TEXT, regiao TEXT, valido INTEGER, falhas TEXT, erro TEXT, "
+                "motor TEXT, latencia_ms REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_resultados_timestamp ON resultados(timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_resultados_hardware ON resultados(hardware, regiao, timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_resultados_regiao ON resultados(regiao, timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_resultados_impressao ON resultados(impressao, hash)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_resultados_arquivo ON resultados(arquivo, timestamp)")
+            # Um veredito por campo (CAMPOS_RESULTADO), com o valor do input e quem decidiu
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS campos ("
+                "resultado INTEGER NOT NULL, campo TEXT NOT NULL, status TEXT NOT NULL, valor TEXT, origem TEXT, "
+                "PRIMARY KEY (resultado, campo)) WITHOUT ROWID"
+            )
+
+    def _conexao(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.caminho, timeout=30)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL") # Consultas não bloqueiam a execução que está gravando
+            except sqlite3.OperationalError:
+                pass # Outro processo está ativando o WAL ao mesmo tempo; o modo fica gravado no arquivo
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def registrar(self, registros, impressao, origem, banco=None, modo_ia=None):
+        """Grava uma execução com os registros do validador_lote (arquivo, hash, hardware, resultado...)
+        em uma única transação e devolve o id da execução."""
+        registros = list(registros)
+        timestamp = datetime.now().strftime(FORMATO_DATA)
+        with self._conexao() as conn:
+            execucao = conn.execute(
+                "INSERT INTO execucoes (timestamp, origem, banco, impressao, modo_ia, total) VALUES (?, ?, ?, ?, ?, ?)",
+                (timestamp, origem, banco, impressao, modo_ia, len(registros))
+            ).lastrowid
+            campos = []
+            for registro in registros:
+                motor = registro.get("motor")
+                if modo_ia and registro.get("resposta_deepseek") is not None:
+                    motor = f"{motor}+deepseek-{modo_ia}"
+                falhas = registro.get("falhas")
+                resultado = conn.execute(
+                    "INSERT INTO resultados (execucao, timestamp, impressao, arquivo, hash, hardware, software, regiao, "
+                    "valido, falhas, erro, motor, latencia_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (execucao, timestamp, impressao, registro["arquivo"], registro.get("hash"),
+                     _texto(registro.get("hardware")), _texto(registro.get("software")), _texto(registro.get("regiao")),
+                     None if registro["erro"] else int(registro["valido"]),
+                     None if falhas is None else ",".join(falhas), registro["erro"], motor, registro.get("latencia_ms"))
+                ).lastrowid
+                campos.extend(
+                    (resultado, campo["campo"], campo["status"], campo["valor"], campo["origem"])
+                    for campo in registro.get("resultado") or []
+                )
+            conn.executemany("INSERT INTO campos (resultado, campo, status, valor, origem) VALUES (?, ?, ?, ?, ?)", campos)
+        return execucao
+
+    def consultar(self, hardware=None, regiao=None, software=None, status=None, campo=None, desde=None, ate=None,
+                  impressao=None, arquivo=None, limite=None):
+        """Resultados gravados, do mais recente para o mais antigo, filtrados pelos índices.
+        status: "PASS", "FAIL" ou "ERRO". campo: só os resultados em que esse campo falhou.
+        desde/ate no formato "AAAA-MM-DD" ou "AAAA-MM-DD HH:MM:SS"."""
+        condicoes, parametros = [], []
+        for coluna, operador, valor in (("hardware", "=", hardware), ("regiao", "=", regiao),
+                                        ("software", "=", software), ("arquivo", "=", arquivo),
+                                        ("timestamp", ">=", _limite_data(desde)),
+                                        ("timestamp", "<=", _limite_data(ate, fim=True))):
+            if valor is not None:
+                condicoes.append(f"r.{coluna} {operador} ?")
+                parametros.append(valor)
+        if impressao is not None:
+            condicoes.append("r.impressao = ?")
+            parametros.append(self.resolver_impressao(impressao))
+        if status == "ERRO":
+            condicoes.append("r.erro IS NOT NULL")
+        elif status is not None:
+            condicoes.append("r.valido = ?")
+            parametros.append(int(status == "PASS"))
+        if campo is not None:
+            condicoes.append("EXISTS (SELECT 1 FROM campos c WHERE c.resultado = r.id AND c.campo = ? AND c.status = 'FAIL')")
+            parametros.append(campo)
+        sql = "SELECT r.* FROM resultados r"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += " ORDER BY r.id DESC"
+        if limite:
+            sql += " LIMIT ?"
+            parametros.append(limite)
+        for linha in self._conexao().execute(sql, parametros):
+            yield dict(linha)
+
+    def campos(self, resultado):
+        """Veredito de cada campo de um resultado, na ordem de CAMPOS_RESULTADO."""
+        linhas = self._conexao().execute("SELECT campo, status, valor, origem FROM campos WHERE resultado = ?", (resultado,))
+        return sorted((dict(linha) for linha in linhas), key=lambda c: _ORDEM_CAMPOS.get(c["campo"], len(_ORDEM_CAMPOS)))
+
+    def versoes(self):
+        """Versões do banco (impressões digitais) presentes no histórico, pela última execução que usou cada uma:
+        a última da lista é a versão atual, mesmo que o banco tenha voltado a uma versão anterior."""
+        return [dict(linha) for linha in self._conexao().execute(
+            "SELECT impressao, MIN(timestamp) AS primeira, MAX(timestamp) AS ultima, COUNT(*) AS execucoes, "
+            "SUM(total) AS resultados FROM execucoes GROUP BY impressao ORDER BY MAX(id)"
+        )]
+
+    def resolver_impressao(self, prefixo):
+        """Impressão digital completa a partir do início dela (como um hash abreviado do git)."""
+        encontradas = [linha[0] for linha in self._conexao().execute(
+            "SELECT DISTINCT impressao FROM execucoes WHERE substr(impressao, 1, ?) = ?", (len(prefixo), prefixo)
+        )]
+        if len(encontradas) != 1:
+            motivo = "nenhuma versão do banco" if not encontradas else f"{len(encontradas)} versões do banco"
+            raise ValueError(f"'{prefixo}' corresponde a {motivo} no histórico")
+        return encontradas[0]
+
+    def mudancas(self, antes, depois):
+        """Inputs (pelo hash do conteúdo) validados nas duas versões do banco com vereditos diferentes.
+        Para cada versão vale o resultado mais recente do input."""
+        antes, depois = self.resolver_impressao(antes), self.resolver_impressao(depois)
+        # Em uma consulta com MAX(), o SQLite devolve as demais colunas da linha que tem o máximo
+        ultimo = ("SELECT hash, arquivo, hardware, valido, falhas, MAX(id) AS id FROM resultados "
+                  "WHERE impressao = ? AND erro IS NULL GROUP BY hash")
+        sql = (f"SELECT b.arquivo, b.hardware, a.valido AS valido_antes, a.falhas AS falhas_antes, "
+               f"b.valido AS valido_depois, b.falhas AS falhas_depois, a.id AS resultado_antes, b.id AS resultado_depois "
+               f"FROM ({ultimo}) a JOIN ({ultimo}) b ON a.hash = b.hash WHERE a.falhas != b.falhas ORDER BY b.arquivo")
+        return [dict(linha) for linha in self._conexao().execute(sql, (antes, depois))]
+
+    def execucoes(self, limite=20):
+        return [dict(linha) for linha in self._conexao().execute(
+            "SELECT * FROM execucoes ORDER BY id DESC LIMIT ?", (limite,)
+        )]
+
+def _texto(valor):
+    # Hardware, software e região fora do formato esperado (número, lista...) são gravados como JSON
+    return valor if valor is None or isinstance(valor, str) else json.dumps(valor, ensure_ascii=False)
+
+# Resumo de um resultado gravado para a saída no terminal, no mesmo formato do validador_lote
+def situacao(resultado):
+    if resultado["erro"]:
+        return f"ERRO ({resultado['erro']})"
+    return "PASS" if resultado["valido"] else f"FAIL {resultado['falhas'].replace(',', ', ')}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consulta o histórico de resultados sem revalidar os inputs.")
+    parser.add_argument("--historico", default=HISTORICO_DB_PADRAO, help="Arquivo do histórico (padrão: historico_resultados.db)")
+    parser.add_argument("--json", action="store_true", help="Mostra os resultados em JSON")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    consulta = comandos.add_parser("consultar", help="Resultados gravados, filtrados por hardware, região, status, data...")
+    consulta.add_argument("--hardware")
+    consulta.add_argument("--regiao")
+    consulta.add_argument("--software")
+    consulta.add_argument("--arquivo", help="Caminho do arquivo, como gravado na execução")
+    consulta.add_argument("--status", choices=["PASS", "FAIL", "ERRO"])
+    consulta.add_argument("--campo", help="Só os resultados em que esse campo falhou (ex: BLUETOOTH)")
+    consulta.add_argument("--desde", help="Data inicial (AAAA-MM-DD ou AAAA-MM-DD HH:MM:SS)")
+    consulta.add_argument("--ate", help="Data final (AAAA-MM-DD ou AAAA-MM-DD HH:MM:SS)")
+    consulta.add_argument("--dias", type=int, help="Só os últimos N dias")
+    consulta.add_argument("--semana", action="store_true", help="Só a semana atual (desde segunda-feira)")
+    consulta.add_argument("--banco", dest="impressao", help="Impressão digital do banco (ou o início dela)")
+    consulta.add_argument("--limite", type=int, default=100, help="Máximo de resultados (0 = todos; padrão: 100)")
+
+    comandos.add_parser("versoes", help="Versões do banco presentes no histórico")
+    mudancas = comandos.add_parser("mudancas", help="Inputs cujo veredito mudou entre duas versões do banco")
+    mudancas.add_argument("antes", nargs="?", help="Impressão digital (ou início) da versão antiga (padrão: a usada antes da atual)")
+    mudancas.add_argument("depois", nargs="?", help="Impressão digital (ou início) da versão nova (padrão: a mais recente)")
+    execucoes = comandos.add_parser("execucoes", help="Últimas execuções gravadas")
+    execucoes.add_argument("--limite", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    historico = HistoricoResultados(args.historico)
+    try:
+        if args.comando == "consultar":
+            desde = args.desde
+            if args.dias is not None:
+                desde = (datetime.now() - timedelta(days=args.dias)).strftime(FORMATO_DATA)
+            elif args.semana:
+                hoje = datetime.now().date()
+                desde = (hoje - timedelta(days=hoje.weekday())).isoformat()
+            linhas = list(historico.consultar(args.hardware, args.regiao, args.software, args.status, args.campo,
+                                              desde, args.ate, args.impressao, args.arquivo, args.limite or None))
+            texto = [f"{r['timestamp']}  {r['arquivo']}: {situacao(r)}  [{r['hardware']}, {r['regiao']}, "
+                     f"banco {r['impressao'][:8]}, {r['motor']}]" for r in linhas]
+        elif args.comando == "versoes":
+            linhas = historico.versoes()
+            texto = [f"{v['impressao'][:12]}  {v['primeira']} a {v['ultima']}: {v['execucoes']} execuções, "
+                     f"{v['resultados']} resultados" for v in linhas]
+        elif args.comando == "mudancas":
+            antes, depois = args.antes, args.depois
+            if antes is None or depois is None:
+                versoes = [v["impressao"] for v in historico.versoes()]
+                if len(versoes) < 2:
+                    print("O histórico ainda não tem duas versões do banco para comparar.", file=sys.stderr)
+                    return 2
+                antes, depois = antes or versoes[-2], depois or versoes[-1]
+            antes, depois = historico.resolver_impressao(antes), historico.resolver_impressao(depois)
+            linhas = historico.mudancas(antes, depois)
+            texto = [f"{m['arquivo']}: {situacao({'erro': None, 'valido': m['valido_antes'], 'falhas': m['falhas_antes']})}"
+                     f" -> {situacao({'erro': None, 'valido': m['valido_depois'], 'falhas': m['falhas_depois']})}"
+                     for m in linhas]
+            texto.append(f"-- {len(linhas)} input(s) com veredito diferente entre {antes[:12]} e {depois[:12]}")
+        else:
+            linhas = historico.execucoes(args.limite)
+            texto = [f"#{e['id']}  {e['timestamp']}  {e['origem']}: {e['total']} inputs, banco {e['impressao'][:12]}"
+                     + (f", IA {e['modo_ia']}" if e["modo_ia"] else "") for e in linhas]
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps(linhas, indent=2, ensure_ascii=False))
+    else:
+        print("\n".join(texto))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
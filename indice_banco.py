@@ -0,0 +1,120 @@
+import hashlib # Utilizado para criar hashes (resumos únicos) de dados, útil para identificar arquivos ou entradas de forma segura.
+import json # Permite ler, escrever e manipular dados no formato JSON
+import os # Fornece acesso a funções do sistema operacional
+import threading
+
+from metricas import metricas
+
+# Índice pré-compilado do software_db.json: o arquivo é lido e convertido uma única vez em estruturas
+# de busca O(1) (frozensets e dicionários), compartilhadas pela interface, pelo modo em lote e pelo motor de regras.
+# O índice é recarregado sozinho quando o arquivo muda (data de modificação, tamanho ou conteúdo).
+
+BANCO_PADRAO = "software_db.json"
+
+# Extrai a parte numérica de uma versão ("5.0+" -> 5.0, "Bluetooth 5.1" -> 5.1). Retorna None se não houver número.
+def versao_numerica(texto):
+    try:
+        return float(''.join(filter(lambda x: x.isdigit() or x == '.', str(texto))))
+    except ValueError:
+        return None
+
+# Normaliza um valor (texto ou lista) em um frozenset sem diferença de maiúsculas, para que "2.4GHz" e "2.4GHZ" sejam iguais
+def normalizar_opcoes(valor):
+    if isinstance(valor, list):
+        return frozenset(str(v).strip().casefold() for v in valor)
+    return frozenset([str(valor).strip().casefold()])
+
+# Dados de um hardware já preparados para consulta
+class HardwareCompilado:
+    def __init__(self, nome, dados):
+        self.nome = nome
+        self.dados = dados # Entrada original do banco, usada para mostrar os valores esperados
+        self.softwares = frozenset(dados.get("Softwares", []))
+        regioes = dados.get("Regioes", {})
+        # Regioes como dicionário: região -> frozenset de softwares; como lista: região -> None (qualquer software)
+        if isinstance(regioes, dict):
+            self.regioes = {regiao: frozenset(softwares) for regiao, softwares in regioes.items()}
+        elif isinstance(regioes, list):
+            self.regioes = dict.fromkeys(regioes)
+        else:
+            self.regioes = {}
+        self.regioes_por_lista = isinstance(regioes, list)
+
+        androids = list(dados.get("Androids_disponiveis", []))
+        if dados.get("Android_mais_recente") and dados["Android_mais_recente"] not in androids:
+            androids.append(dados["Android_mais_recente"])
+        self.androids_lista = androids
+        self.androids = normalizar_opcoes(androids) if androids else frozenset()
+
+        tecnologias = dados.get("Tecnologias_suportadas", {})
+        self.tecnologias = tecnologias
+        self.wifi = normalizar_opcoes(tecnologias["WiFi"]) if "WiFi" in tecnologias else None
+        self.rede = normalizar_opcoes(tecnologias["Rede"]) if "Rede" in tecnologias else None
+        self.sim = normalizar_opcoes(tecnologias["SIM"]) if "SIM" in tecnologias else None
+        self.nfc = tecnologias.get("NFC")
+        # Bluetooth: "5.0+" vira versão mínima 5.0; qualquer outro valor exige comparação exata
+        bluetooth = tecnologias.get("Bluetooth")
+        self.bluetooth_minimo = None
+        self.bluetooth_exato = None
+        if isinstance(bluetooth, str):
+            if bluetooth.strip().endswith("+"):
+                self.bluetooth_minimo = versao_numerica(bluetooth)
+            else:
+                self.bluetooth_exato = bluetooth.strip().casefold()
+
+    def relacao_valida(self, software, regiao):
+        """Mesma regra de validar_relacao_software_regiao, em O(1)."""
+        if not isinstance(regiao, str) or regiao not in self.regioes:
+            return False
+        if self.regioes_por_lista:
+            return True
+        return isinstance(software, str) and software in self.regioes[regiao]
+
+class IndiceBanco:
+    def __init__(self, banco, impressao_digital=None):
+        self.banco = banco # Banco original (dicionário), usado nos prompts e nas chaves de cache
+        self.hardwares = {nome: HardwareCompilado(nome, dados) for nome, dados in banco.items()}
+        # Mapa reverso: software -> hardwares que o possuem
+        software_para_hw = {}
+        for nome, hw in self.hardwares.items():
+            for software in hw.softwares:
+                software_para_hw.setdefault(software, set()).add(nome)
+        self.software_para_hardware = {sw: frozenset(hws) for sw, hws in software_para_hw.items()}
+        self.impressao_digital = impressao_digital or hashlib.sha256(
+            json.dumps(banco, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+
+    def hardware(self, nome):
+        return self.hardwares.get(nome) if isinstance(nome, str) else None
+
+    def relacao_software_regiao(self, hardware, software, regiao):
+        hw = self.hardware(hardware)
+        return hw is not None and hw.relacao_valida(software, regiao)
+
+    def hardwares_do_software(self, software):
+        return self.software_para_hardware.get(software, frozenset()) if isinstance(software, str) else frozenset()
+
+# Índices já carregados: caminho -> (mtime, tamanho, hash do conteúdo, índice)
+_indices = {}
+_lock = threading.Lock()
+
+def obter_indice(caminho=BANCO_PADRAO):
+    """Devolve o índice do banco, recompilando só se o arquivo tiver mudado desde a última leitura."""
+    estado = os.stat(caminho)
+    with _lock:
+        atual = _indices.get(caminho)
+        if atual and atual[0] == estado.st_mtime_ns and atual[1] == estado.st_size:
+            return atual[3]
+
+        # Só a leitura de fato entra na etapa carregar_banco; o caminho rápido acima não é cronometrado
+        with metricas.cronometrar("carregar_banco"):
+            with open(caminho, "rb") as f:
+                conteudo = f.read()
+            digest = hashlib.sha256(conteudo).hexdigest()
+            if atual and atual[2] == digest:
+                # Arquivo tocado sem mudar o conteúdo: mantém o índice e só atualiza a data
+                indice = atual[3]
+            else:
+                indice = IndiceBanco(json.loads(conteudo.decode("utf-8")), digest)
+        _indices[caminho] = (estado.st_mtime_ns, estado.st_size, digest, indice)
+        return indice
@@ -0,0 +1,112 @@
+import json # Permite ler, escrever e manipular dados no formato JSON
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime # Fornece ferramentas para manipular datas e horários.
+
+# Métricas de execução compartilhadas pela interface, pelo modo em lote e pelo cliente do DeepSeek:
+# tempo de cada etapa (leitura do arquivo, leitura do banco, validação local, consulta ao cache, chamada à API)
+# e contadores (acertos e falhas do cache, requisições, erros e retentativas da API, tokens de prompt e de resposta).
+# O retrato atual pode ser exportado em JSON ou no formato de texto do Prometheus.
+
+PREFIXO_PROMETHEUS = "verificador"
+
+# Etapas cronometradas e contadores, na ordem em que aparecem no relatório
+ETAPAS = ["carregar_arquivo", "carregar_banco", "validacao_local", "validacao_colunar", "consulta_cache", "chamada_api"]
+CONTADORES = ["cache_acertos", "cache_falhas", "api_requisicoes", "api_erros", "api_retentativas",
+              "tokens_prompt", "tokens_resposta"]
+
+class Metricas:
+    def __init__(self):
+        self.lock = threading.Lock() # As análises rodam em threads de trabalho e no pool do modo em lote
+        self.zerar()
+
+    def zerar(self):
+        with self.lock:
+            self.inicio = datetime.now()
+            self.contadores = dict.fromkeys(CONTADORES, 0)
+            self.etapas = {etapa: {"n": 0, "soma": 0.0, "maximo": 0.0} for etapa in ETAPAS}
+
+    def incrementar(self, nome, quantidade=1):
+        with self.lock:
+            self.contadores[nome] = self.contadores.get(nome, 0) + quantidade
+
+    def registrar_tempo(self, etapa, segundos):
+        with self.lock:
+            medida = self.etapas.setdefault(etapa, {"n": 0, "soma": 0.0, "maximo": 0.0})
+            medida["n"] += 1
+            medida["soma"] += segundos
+            medida["maximo"] = max(medida["maximo"], segundos)
+
+    @contextmanager
+    def cronometrar(self, etapa):
+        """Mede o bloco "with" e registra o tempo na etapa, mesmo que ele termine com exceção."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar_tempo(etapa, time.perf_counter() - inicio)
+
+    def mesclar(self, retrato):
+        """Soma a este registro o retrato de outro processo (ex: cada fatia da validação em vários processos)."""
+        with self.lock:
+            for nome, valor in retrato["contadores"].items():
+                self.contadores[nome] = self.contadores.get(nome, 0) + valor
+            for etapa, medida in retrato["etapas"].items():
+                atual = self.etapas.setdefault(etapa, {"n": 0, "soma": 0.0, "maximo": 0.0})
+                atual["n"] += medida["n"]
+                atual["soma"] += medida["total_s"]
+                atual["maximo"] = max(atual["maximo"], medida["max_ms"] / 1000)
+
+    def registrar_uso(self, uso):
+        """Soma os tokens do campo "usage" de uma resposta da API (ausente em alguns streams)."""
+        if not isinstance(uso, dict):
+            return
+        self.incrementar("tokens_prompt", uso.get("prompt_tokens") or 0)
+        self.incrementar("tokens_resposta", uso.get("completion_tokens") or 0)
+
+    def retrato(self):
+        """Cópia das métricas atuais: contadores e, por etapa, chamadas, tempo total, médio e máximo."""
+        with self.lock:
+            return {
+                "desde": self.inicio.strftime("%Y-%m-%d %H:%M:%S"),
+                "gerado_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "contadores": dict(self.contadores),
+                "etapas": {
+                    etapa: {
+                        "n": m["n"],
+                        "total_s": round(m["soma"], 6),
+                        "media_ms": round(m["soma"] / m["n"] * 1000, 4) if m["n"] else 0.0,
+                        "max_ms": round(m["maximo"] * 1000, 4)
+                    }
+                    for etapa, m in self.etapas.items()
+                }
+            }
+
+    def para_prometheus(self):
+        """Retrato no formato de texto do Prometheus (contadores e um summary por etapa, em segundos)."""
+        retrato = self.retrato()
+        linhas = []
+        for nome, valor in retrato["contadores"].items():
+            metrica = f"{PREFIXO_PROMETHEUS}_{nome}_total"
+            linhas += [f"# TYPE {metrica} counter", f"{metrica} {valor}"]
+        linhas.append(f"# TYPE {PREFIXO_PROMETHEUS}_etapa_segundos summary")
+        for etapa, medida in retrato["etapas"].items():
+            linhas.append(f'{PREFIXO_PROMETHEUS}_etapa_segundos_sum{{etapa="{etapa}"}} {medida["total_s"]}')
+            linhas.append(f'{PREFIXO_PROMETHEUS}_etapa_segundos_count{{etapa="{etapa}"}} {medida["n"]}')
+        linhas.append(f"# TYPE {PREFIXO_PROMETHEUS}_etapa_segundos_max gauge")
+        for etapa, medida in retrato["etapas"].items():
+            linhas.append(f'{PREFIXO_PROMETHEUS}_etapa_segundos_max{{etapa="{etapa}"}} {medida["max_ms"] / 1000}')
+        return "\n".join(linhas) + "\n"
+
+    def para_json(self):
+        return json.dumps(self.retrato(), indent=2, ensure_ascii=False)
+
+    def exportar(self, caminho):
+        """Grava o retrato em caminho: formato Prometheus se terminar em .prom ou .txt, JSON nos demais casos."""
+        texto = self.para_prometheus() if caminho.lower().endswith((".prom", ".txt")) else self.para_json()
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write(texto)
+
+# Instância única do processo, usada por todos os módulos
+metricas = Metricas()
@@ -0,0 +1,207 @@
+import json # Permite ler, escrever e manipular dados no formato JSON
+import re # Normalização de valores fora do padrão
+from indice_banco import IndiceBanco, normalizar_opcoes, versao_numerica
+from resultados import ResultadoCampo, formatar_resultados
+
+# Motor de regras local: aplica as mesmas REGRAS RÍGIDAS descritas no prompt do DeepSeek,
+# sem nenhuma chamada de rede. Gera o mesmo bloco RESULTADOS que a IA devolveria.
+
+CAMPOS_OBRIGATORIOS = [
+    "Hardware", "Software", "Regiao_Execucao",
+    "Versao_Android", "WiFi", "NFC", "Bluetooth", "SIM", "Rede"
+]
+
+# Ordem e nome de cada linha do bloco RESULTADOS
+CAMPOS_RESULTADO = [
+    "HARDWARE", "SOFTWARE", "RELAÇÃO_SOFTWARE_REGIAO", "VERSAO_ANDROID",
+    "WIFI", "NFC", "BLUETOOTH", "SIM", "REDE"
+]
+
+#A função garante que o arquivo de entrada tenha todas as informações essenciais antes de prosseguir com a análise.
+# Se faltar algum campo importante, ela interrompe o processo e avisa qual campo está faltando, evitando que a validação continue com dados incompletos.
+def validar_estrutura_input(input_json):
+    for campo in CAMPOS_OBRIGATORIOS:
+        if campo not in input_json:
+            raise ValueError(f"Campo obrigatório faltando: {campo}")
+
+# A função verifica se o software informado pode ser usado em determinada região,
+# de acordo com o banco de dados do hardware. Isso garante que testes e validações respeitem regras regionais de compatibilidade.
+def validar_relacao_software_regiao(banco, hardware, software, regiao):
+    if isinstance(banco, IndiceBanco):
+        return banco.relacao_software_regiao(hardware, software, regiao) # Consulta O(1) no índice compilado
+    hw_data = banco.get(hardware, {})
+    regioes = hw_data.get("Regioes", {})
+
+    if isinstance(regioes, dict):
+        # Caso dicionário: verifica se o software está na lista da região
+        if regiao in regioes:
+            return software in regioes[regiao]
+        return False
+    elif isinstance(regioes, list):
+        # Caso lista: verifica apenas se a região existe
+        return regiao in regioes
+    return False
+
+# Representação do valor como aparece entre colchetes no bloco RESULTADOS
+def _formatar_valor(valor):
+    if isinstance(valor, str):
+        return valor
+    if isinstance(valor, bool) or valor is None:
+        return _JSON_ESCALARES[valor] # Mesmo texto do json.dumps, sem o custo do codificador (NFC em todo input)
+    return json.dumps(valor, ensure_ascii=False)
+
+_JSON_ESCALARES = {True: "true", False: "false", None: "null"}
+
+def _validar_opcoes(valor_input, opcoes_db):
+    """Todas as opções do input precisam existir no banco (comparação exata, sem diferenciar maiúsculas).
+    Uma lista vazia não informa nenhuma opção e falha."""
+    if opcoes_db is None or valor_input is None:
+        return False
+    opcoes = normalizar_opcoes(valor_input)
+    return bool(opcoes) and opcoes <= opcoes_db
+
+def _validar_nfc(valor_input, valor_db):
+    # Comparação exata: true só combina com true
+    return isinstance(valor_input, bool) and valor_input == valor_db
+
+def _validar_bluetooth(valor_input, hw):
+    if not isinstance(valor_input, str):
+        return False
+    if hw.bluetooth_minimo is not None:
+        # "5.0+" no banco: aceita versões iguais ou superiores
+        versao = versao_numerica(valor_input)
+        return versao is not None and versao >= hw.bluetooth_minimo
+    return hw.bluetooth_exato is not None and valor_input.strip().casefold() == hw.bluetooth_exato
+
+# Aplica as regras campo a campo. Retorna uma lista de ResultadoCampo (campo, status, valor no input, valor esperado),
+# onde valor esperado é None quando o campo passou.
+# banco pode ser o dicionário do software_db.json ou um IndiceBanco já compilado (obter_indice), que evita recompilar a cada input.
+# aprovados: decisões já tomadas (um bool por campo, na ordem de CAMPOS_RESULTADO), ex: uma linha da matriz
+# de validacao_colunar.avaliar_colunar; nesse caso só os valores e os esperados são montados.
+def avaliar_campos(banco, input_json, aprovados=None):
+    indice = banco if isinstance(banco, IndiceBanco) else IndiceBanco(banco)
+    hw = indice.hardware(input_json.get("Hardware"))
+    if aprovados is None:
+        aprovados = aplicar_regras(hw, input_json)
+    return _montar_resultados(indice, hw, input_json, aprovados)
+
+def aplicar_regras(hw, input_json):
+    """Decisão de cada campo (True = PASS), na ordem de CAMPOS_RESULTADO. hw é o HardwareCompilado ou None."""
+    if hw is None:
+        return [False] * len(CAMPOS_RESULTADO) # Sem hardware no banco, nenhuma outra regra pode passar
+    software = input_json.get("Software")
+    return [
+        True,
+        isinstance(software, str) and software in hw.softwares,
+        hw.relacao_valida(software, input_json.get("Regiao_Execucao")),
+        bool(hw.androids) and _validar_opcoes(input_json.get("Versao_Android"), hw.androids),
+        _validar_opcoes(input_json.get("WiFi"), hw.wifi),
+        _validar_nfc(input_json.get("NFC"), hw.nfc),
+        _validar_bluetooth(input_json.get("Bluetooth"), hw),
+        _validar_opcoes(input_json.get("SIM"), hw.sim),
+        _validar_opcoes(input_json.get("Rede"), hw.rede),
+    ]
+
+def _montar_resultados(indice, hw, input_json, aprovados):
+    hardware = input_json.get("Hardware")
+    software = input_json.get("Software")
+    regiao = input_json.get("Regiao_Execucao")
+    relacao = f"{_formatar_valor(software)}/{_formatar_valor(regiao)}"
+    if hw is None:
+        # A lista de hardwares só é montada quando o campo falha: em catálogos grandes ela custaria O(n) por input
+        esperados = [list(indice.banco.keys())] + [None] * (len(CAMPOS_RESULTADO) - 1)
+    else:
+        dados = hw.dados
+        tecnologias = hw.tecnologias
+        regioes = dados.get("Regioes")
+        if isinstance(regioes, dict):
+            esperado_relacao = regioes.get(regiao, list(regioes.keys())) if isinstance(regiao, str) else list(regioes.keys())
+        else:
+            esperado_relacao = regioes
+        esperados = [
+            None, dados.get("Softwares"), esperado_relacao, hw.androids_lista or None, tecnologias.get("WiFi"),
+            tecnologias.get("NFC"), tecnologias.get("Bluetooth"), tecnologias.get("SIM"), tecnologias.get("Rede")
+        ]
+    valores = [
+        _formatar_valor(hardware), _formatar_valor(software), relacao
+    ] + [_formatar_valor(input_json.get(chave)) for chave in ["Versao_Android", "WiFi", "NFC", "Bluetooth", "SIM", "Rede"]]
+    return [
+        ResultadoCampo(campo, "PASS" if passou else "FAIL", valor, None if passou else esperado)
+        for campo, passou, valor, esperado in zip(CAMPOS_RESULTADO, aprovados, valores, esperados)
+    ]
+
+# --- Roteamento híbrido ---
+# O motor local decide com certeza quase todos os campos. Um FAIL só é considerado duvidoso quando o valor
+# parece ser uma grafia diferente de um valor aceito ("Yes" em vez de true, "Android14", "2.4 GHz", "trevan-vs7")
+# ou quando o hardware não existe no banco. Só esses campos precisam ser enviados ao DeepSeek.
+
+# Remove espaços, pontuação e maiúsculas: "2.4 GHz" e "2.4GHz" ficam iguais
+def _normalizar_livre(valor):
+    return re.sub(r"[\W_]+", "", str(valor).casefold())
+
+def _quase_igual(valor, opcoes, numerico=False):
+    """True se valor não é igual a nenhuma opção, mas se parece com alguma (mesma grafia sem pontuação, ou mesmo número)."""
+    if isinstance(opcoes, str):
+        opcoes = [opcoes]
+    if not opcoes or valor in opcoes:
+        return False
+    livre = _normalizar_livre(valor)
+    if any(livre == _normalizar_livre(opcao) for opcao in opcoes):
+        return True
+    return numerico and versao_numerica(valor) in {versao_numerica(opcao) for opcao in opcoes} - {None}
+
+def _valor_duvidoso(valor, opcoes, numerico=False):
+    # Ausente: FAIL certo. Tipo inesperado (número, booleano) ou parecido com uma opção: duvidoso.
+    if valor is None:
+        return False
+    for item in (valor if isinstance(valor, list) else [valor]):
+        if not isinstance(item, str) or _quase_igual(item, opcoes, numerico):
+            return True
+    return False
+
+def campos_duvidosos(banco, input_json, resultados=None):
+    """Campos com FAIL que as regras locais não conseguem decidir com certeza."""
+    indice = banco if isinstance(banco, IndiceBanco) else IndiceBanco(banco)
+    resultados = resultados if resultados is not None else avaliar_campos(indice, input_json)
+    if all(r.passou for r in resultados):
+        return set() # Só FAILs podem ser duvidosos
+    hw = indice.hardware(input_json.get("Hardware"))
+    if hw is None:
+        if input_json.get("Hardware") is None:
+            return set() # Sem hardware nenhum: não há o que a IA possa decidir
+        return {r.campo for r in resultados} # Hardware desconhecido (talvez com outra grafia): tudo vai para a IA
+
+    tecnologias = hw.tecnologias
+    software = input_json.get("Software")
+    regiao = input_json.get("Regiao_Execucao")
+    software_duvidoso = _valor_duvidoso(software, sorted(hw.softwares))
+    duvidas = {
+        "SOFTWARE": software_duvidoso,
+        "RELAÇÃO_SOFTWARE_REGIAO": software_duvidoso or _valor_duvidoso(regiao, list(hw.regioes)),
+        "VERSAO_ANDROID": _valor_duvidoso(input_json.get("Versao_Android"), hw.androids_lista, numerico=True),
+        "WIFI": _valor_duvidoso(input_json.get("WiFi"), tecnologias.get("WiFi")),
+        # NFC só aceita true/false: "Yes", "sim", 1 ou "true" entre aspas ficam para a IA
+        "NFC": input_json.get("NFC") is not None and not isinstance(input_json.get("NFC"), bool),
+        "BLUETOOTH": _bluetooth_duvidoso(input_json.get("Bluetooth"), tecnologias.get("Bluetooth")),
+        "SIM": _valor_duvidoso(input_json.get("SIM"), tecnologias.get("SIM")),
+        "REDE": _valor_duvidoso(input_json.get("Rede"), tecnologias.get("Rede")),
+    }
+    return {r.campo for r in resultados if not r.passou and duvidas.get(r.campo)}
+
+def _bluetooth_duvidoso(valor, valor_db):
+    if valor is None:
+        return False
+    if not isinstance(valor, str) or versao_numerica(valor) is None:
+        return True # Número sem aspas ou texto livre sem versão ("BLE")
+    return isinstance(valor_db, str) and not valor_db.strip().endswith("+") and _quase_igual(valor, valor_db, numerico=True)
+
+def rotear_campos(banco, input_json, aprovados=None):
+    """Valida localmente e separa os campos decididos com certeza dos que precisam da IA.
+    Retorna (lista de ResultadoCampo, conjunto com os nomes dos campos duvidosos)."""
+    indice = banco if isinstance(banco, IndiceBanco) else IndiceBanco(banco)
+    resultados = avaliar_campos(indice, input_json, aprovados)
+    return resultados, campos_duvidosos(indice, input_json, resultados)
+
+def validar_localmente(banco, input_json):
+    """Valida o input inteiro com as regras locais e devolve o bloco RESULTADOS."""
+    return formatar_resultados(avaliar_campos(banco, input_json))
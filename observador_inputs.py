@@ -0,0 +1,181 @@
+import argparse # Leitura dos argumentos da linha de comando
+import glob # Expansão de padrões como Inputs/**/*.json
+import hashlib # Resumo do conteúdo de cada arquivo, para ignorar arquivos salvos sem alteração
+import os # Fornece acesso a funções do sistema operacional
+import sys
+import time
+
+from cache_resultados import impressao_digital_banco
+from correcoes import CacheCorrecoes
+from historico_resultados import HISTORICO_DB_PADRAO, HistoricoResultados
+from indice_banco import BANCO_PADRAO, obter_indice
+from registro_feedback import FEEDBACK_DB_PADRAO, RegistroFeedback
+from validador_lote import CAMPOS_SO_PARA_IA, SAIDA_PADRAO, salvar_resultados, situacao, validar_input
+
+# Modo de observação: acompanha as pastas de inputs e o software_db.json e revalida só o que mudou.
+# Cada arquivo fica em um manifesto com data de modificação, tamanho e hash do conteúdo: arquivos com a mesma
+# data e tamanho nem são lidos, e arquivos salvos sem alteração (mesmo hash) não são revalidados.
+# Quando o banco muda, só os inputs dos hardwares cuja entrada mudou (incluídos, alterados ou removidos)
+# são revalidados. O arquivo de resultados é regravado a cada rodada com mudanças, e os inputs revalidados
+# são gravados no histórico de resultados (historico_resultados.py). Uso:
+#   python observador_inputs.py Inputs/
+#   python observador_inputs.py Inputs/Inputs_Validos Inputs/Inputs_Invalidos_Renomeados --intervalo 2
+
+INTERVALO_PADRAO = 1.0 # Segundos entre duas verificações
+
+def _ler(caminho):
+    with open(caminho, "rb") as f:
+        conteudo = f.read()
+    return conteudo, hashlib.sha256(conteudo).hexdigest()
+
+def _hardware_do_registro(registro):
+    # None: erro de leitura, não depende do banco. Hardware fora do formato (lista, número...) vira "",
+    # que não é nome de nenhum hardware do banco e é tratado como hardware desconhecido
+    if registro["erro"]:
+        return None
+    hardware = registro.get("hardware")
+    return hardware if isinstance(hardware, str) else ""
+
+class ObservadorInputs:
+    def __init__(self, caminhos, caminho_banco=BANCO_PADRAO, correcoes=None, historico=None):
+        self.caminhos = caminhos
+        self.caminho_banco = caminho_banco
+        self.correcoes = correcoes
+        self.historico = historico # HistoricoResultados opcional: cada rodada com mudanças vira uma execução
+        self.indice = None
+        self.erro_banco = None # Último erro de leitura do banco, para avisar uma vez só
+        self.hardwares = {} # Nome do hardware -> impressão digital da sua entrada no banco
+        self.arquivos = {} # Caminho -> {"assinatura": (mtime, tamanho), "hash", "hardware", "registro"}
+
+    def listar(self):
+        """Arquivos .json atuais: das pastas (recursivamente), arquivos avulsos e padrões glob."""
+        arquivos = set()
+        for caminho in self.caminhos:
+            if os.path.isdir(caminho):
+                arquivos.update(glob.glob(os.path.join(caminho, "**", "*.json"), recursive=True))
+            elif os.path.isfile(caminho):
+                arquivos.add(caminho)
+            else:
+                arquivos.update(glob.glob(caminho, recursive=True))
+        return arquivos
+
+    def atualizar_banco(self):
+        """Recarrega o banco se ele mudou. Devolve (hardwares alterados, se a lista de nomes mudou).
+        Se o banco não puder ser lido (ex: salvo pela metade), continua com o índice anterior e tenta de novo
+        na próxima rodada; só é erro se nenhum índice foi carregado ainda."""
+        try:
+            indice = obter_indice(self.caminho_banco) # Só relê o arquivo se a data ou o tamanho mudarem
+        except (OSError, ValueError) as e:
+            if self.indice is None:
+                raise
+            if str(e) != self.erro_banco:
+                print(f"Aviso: banco de dados ilegível ({e}); mantendo a versão anterior", file=sys.stderr)
+                self.erro_banco = str(e)
+            return set(), False
+        self.erro_banco = None
+        if indice is self.indice:
+            return set(), False
+        hardwares = {nome: impressao_digital_banco(indice.banco, nome) for nome in indice.banco}
+        alterados = {nome for nome in hardwares.keys() | self.hardwares.keys()
+                     if hardwares.get(nome) != self.hardwares.get(nome)}
+        nomes_mudaram = hardwares.keys() != self.hardwares.keys()
+        self.indice, self.hardwares = indice, hardwares
+        return alterados, nomes_mudaram
+
+    def _afetado(self, estado, alterados, nomes_mudaram):
+        # Inputs de hardware desconhecido também dependem da lista de nomes (valor esperado do campo HARDWARE)
+        hardware = estado["hardware"]
+        if hardware is None:
+            return False # Erro de leitura: não depende do banco
+        return hardware in alterados or (nomes_mudaram and hardware not in self.hardwares)
+
+    def verificar(self):
+        """Uma rodada de verificação. Devolve a lista de (caminho, registro ou None se o arquivo foi removido)."""
+        alterados, nomes_mudaram = self.atualizar_banco()
+        atuais = self.listar()
+        mudancas = []
+        for caminho in sorted(atuais):
+            estado = self.arquivos.get(caminho)
+            try:
+                status = os.stat(caminho)
+            except OSError:
+                continue # Removido entre a listagem e a leitura: tratado na próxima rodada
+            assinatura = (status.st_mtime_ns, status.st_size)
+            afetado = estado is not None and self._afetado(estado, alterados, nomes_mudaram)
+            if estado is not None and estado["assinatura"] == assinatura and not afetado:
+                continue
+
+            try:
+                conteudo, digest = _ler(caminho)
+            except OSError:
+                continue
+            if estado is not None and estado["hash"] == digest and not afetado:
+                estado["assinatura"] = assinatura # Salvo de novo sem alterar o conteúdo
+                continue
+
+            registro = validar_input(self.indice, caminho, conteudo, self.correcoes)
+            for campo in CAMPOS_SO_PARA_IA:
+                registro.pop(campo, None)
+            self.arquivos[caminho] = {
+                "assinatura": assinatura, "hash": digest, "hardware": _hardware_do_registro(registro),
+                "registro": registro
+            }
+            mudancas.append((caminho, registro))
+
+        for caminho in sorted(self.arquivos.keys() - atuais):
+            del self.arquivos[caminho]
+            mudancas.append((caminho, None))
+        return mudancas
+
+    def registros(self):
+        return [self.arquivos[caminho]["registro"] for caminho in sorted(self.arquivos)]
+
+def observar(observador, caminho_saida=SAIDA_PADRAO, intervalo=INTERVALO_PADRAO, rodadas=None):
+    """Verifica a cada intervalo segundos, mostra o que mudou e regrava os resultados. rodadas=None: até Ctrl+C."""
+    rodada = 0
+    while rodadas is None or rodada < rodadas:
+        if rodada:
+            time.sleep(intervalo)
+        rodada += 1
+        inicio = time.perf_counter()
+        mudancas = observador.verificar()
+        if not mudancas:
+            continue
+        for caminho, registro in mudancas:
+            print(f"{caminho}: {situacao(registro) if registro else 'removido'}")
+        dados = salvar_resultados(observador.registros(), caminho_saida)
+        if observador.historico is not None:
+            observador.historico.registrar([registro for _, registro in mudancas if registro],
+                                           observador.indice.impressao_digital, "observador", observador.caminho_banco)
+        print(f"-- {len(mudancas)} arquivo(s) revalidado(s) em {(time.perf_counter() - inicio) * 1000:.0f} ms; "
+              f"{dados['total']} inputs, {dados['validos']} válidos. Resultados em {caminho_saida}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Revalida os inputs sempre que eles ou o banco mudarem (só o que mudou).")
+    parser.add_argument("caminhos", nargs="+", help="Pastas, arquivos .json ou padrões glob a observar")
+    parser.add_argument("--banco", default=BANCO_PADRAO, help="Banco de dados técnico (padrão: software_db.json)")
+    parser.add_argument("--saida", default=SAIDA_PADRAO, help="Arquivo JSON de resultados (padrão: resultados_lote.json)")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_PADRAO, help="Segundos entre verificações (padrão: 1)")
+    parser.add_argument("--feedback", default=FEEDBACK_DB_PADRAO, help="Registro de feedbacks com as correções a aplicar (padrão: feedback_logs.db)")
+    parser.add_argument("--sem-correcoes", action="store_true", help="Não aplica as correções enviadas como feedback")
+    parser.add_argument("--historico", default=HISTORICO_DB_PADRAO, help="Histórico de resultados (padrão: historico_resultados.db)")
+    parser.add_argument("--sem-historico", action="store_true", help="Não grava as revalidações no histórico")
+    args = parser.parse_args(argv)
+
+    correcoes = None if args.sem_correcoes else CacheCorrecoes(RegistroFeedback(args.feedback))
+    historico = None if args.sem_historico else HistoricoResultados(args.historico)
+    observador = ObservadorInputs(args.caminhos, args.banco, correcoes, historico)
+    try:
+        observador.atualizar_banco() # Primeira leitura: sem um banco válido não há o que observar
+    except (OSError, ValueError) as e:
+        print(f"Erro ao ler banco de dados: {str(e)}", file=sys.stderr)
+        return 2
+    print(f"Observando {', '.join(args.caminhos)} e {args.banco} (Ctrl+C para encerrar)")
+    try:
+        observar(observador, args.saida, args.intervalo)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
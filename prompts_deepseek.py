@@ -0,0 +1,231 @@
+import json # Permite ler, escrever e manipular dados no formato JSON
+import re # Contagem aproximada de tokens
+from motor_regras import CAMPOS_RESULTADO
+from resultados import ORIGEM_DEEPSEEK, interpretar_linha
+
+# Montagem dos prompts enviados ao DeepSeek. Em vez do software_db.json inteiro, cada prompt leva
+# só o trecho do banco que decide o resultado do input: o hardware, a região pedida e as tecnologias.
+
+# Versões dos prompts: ao alterar o texto de um prompt, aumente a versão para invalidar o cache das respostas antigas.
+# As respostas do modo em lote (PROMPT_LOTE) são guardadas com a mesma versão da análise individual.
+VERSAO_PROMPT_ANALISE = "analisar-v2"
+VERSAO_PROMPT_EXPLICACAO = "explicar-v2"
+VERSAO_PROMPT_HIBRIDO = "hibrido-v1" # Análise só dos campos duvidosos (montar_mensagens_analise com campos)
+
+PROMPT_SISTEMA_ANALISE = """Você é um validador técnico. Formato OBRIGATÓRIO:
+
+RESULTADOS:
+- HARDWARE: PASS/FAIL [valor no input]
+- SOFTWARE: PASS/FAIL [valor no input]
+- RELAÇÃO_SOFTWARE_REGIAO: PASS/FAIL [Software/Região] 
+  → Se 'Regioes' for dicionário: FAIL se software não estiver na lista da região
+  → Se 'Regioes' for lista: FAIL se região não existir
+- VERSAO_ANDROID: PASS/FAIL [valor no input]
+- WIFI: PASS/FAIL [valor no input]
+- NFC: PASS/FAIL [valor no input]
+- BLUETOOTH: PASS/FAIL [valor no input]
+- SIM: PASS/FAIL [valor no input]
+- REDE: PASS/FAIL [valor no input]
+
+Exemplo de RESULTADOS:
+
+RESULTADOS:
+- HARDWARE: PASS [Hardware_A]
+- SOFTWARE: PASS [TREVAN-VS7]
+- RELAÇÃO_SOFTWARE_REGIAO: PASS [TREVAN-VS7 está na lista da região Germany]
+- VERSAO_ANDROID: PASS [Android 15]
+- WIFI: PASS [2.4GHz]
+- NFC: PASS [true]
+- BLUETOOTH: FAIL [4.0] → Valor esperado: "5.0+"
+- SIM: FAIL [Single SIM] → Valor esperado: "Dual SIM"
+- REDE: FAIL [8G] → Valores esperados: ["4G", "5G", "6G"]
+
+REGRAS RÍGIDAS:
+1. Para RELAÇÃO_SOFTWARE_REGIAO:
+   - Caso 1: Se 'Regioes' for um dicionário {região: [softwares]}, o software deve estar na lista da região especificada.
+   - Caso 2: Se 'Regioes' for uma lista [regiões], a região do input deve existir na lista.
+2. Para tecnologias (WiFi, NFC, Bluetooth, SIM, Rede): comparação exata de valores entre aspas. 
+Exemplo: se o valor do input for 2.4GHz e no banco tiver uma das opções como 2.4GHZ, considere como PASS.
+3. Sempre mostre o valor esperado no banco em caso de FAIL.
+4. Para Bluetooth:
+   - Se o valor no banco terminar com '+' (ex: "5.0+"), considere PASS para versões iguais ou superiores.
+   - Caso contrário, faça comparação exata.
+"""
+
+# Acrescentado ao prompt de análise quando vários inputs do mesmo hardware vão na mesma requisição
+PROMPT_LOTE = """
+MODO LOTE:
+Você receberá vários inputs, cada um com um ID. Para CADA input, na mesma ordem, escreva uma linha
+### INPUT <ID>
+seguida do bloco RESULTADOS completo daquele input, no formato acima. Não junte inputs nem omita campos.
+"""
+
+PROMPT_SISTEMA_EXPLICACAO = "Você é um validador técnico. O resultado abaixo já foi decidido por regras locais e não deve ser alterado. Explique de forma concisa o motivo de cada FAIL e como corrigir o input."
+
+# JSON compacto: sem indentação nem espaços extras, o que reduz bastante o número de tokens
+def json_compacto(dados):
+    return json.dumps(dados, separators=(",", ":"), ensure_ascii=False)
+
+# Estimativa simples de tokens (palavras e sinais de pontuação), suficiente para comparar tamanhos de prompt
+def estimar_tokens(texto):
+    return len(re.findall(r"\w+|[^\w\s]", texto))
+
+# Recorta do banco apenas o que é necessário para validar o input:
+# dados do hardware, a lista de softwares da região pedida (ou a lista de regiões, se a região não existir)
+# e as tecnologias suportadas.
+def montar_contexto_hardware(banco, input_json):
+    nome_hw = input_json.get("Hardware")
+    hw = banco.get(nome_hw) if isinstance(nome_hw, str) else None
+    if hw is None:
+        return {"Hardware_nao_encontrado": nome_hw, "Hardwares_existentes": list(banco.keys())}
+
+    regiao = input_json.get("Regiao_Execucao")
+    regioes = hw.get("Regioes", {})
+    if isinstance(regioes, dict):
+        regioes_recorte = {regiao: regioes[regiao]} if isinstance(regiao, str) and regiao in regioes else {}
+    else:
+        regioes_recorte = [regiao] if regiao in regioes else []
+
+    contexto = {
+        nome_hw: {
+            "Softwares": hw.get("Softwares", []),
+            "Regioes": regioes_recorte,
+            "Androids_disponiveis": hw.get("Androids_disponiveis", []),
+            "Android_mais_recente": hw.get("Android_mais_recente"),
+            "Tecnologias_suportadas": hw.get("Tecnologias_suportadas", {})
+        }
+    }
+    if not regioes_recorte:
+        # Região ausente: manda só os nomes das regiões, para a IA mostrar o valor esperado no FAIL
+        contexto[nome_hw]["Regioes_existentes"] = list(regioes.keys()) if isinstance(regioes, dict) else regioes
+    return contexto
+
+# campos: se informado, a IA responde só essas linhas do bloco RESULTADOS (roteamento híbrido)
+def montar_mensagens_analise(banco, input_json, campos=None):
+    mensagens = [
+        {"role": "system", "content": PROMPT_SISTEMA_ANALISE},
+        {
+            "role": "user",
+            "content": f"""Dados para análise:
+
+BANCO DE DADOS:
+{json_compacto(montar_contexto_hardware(banco, input_json))}
+
+INPUT:
+{json_compacto(input_json)}
+
+INSTRUÇÕES:
+1. Para cada campo no input, verifique no banco
+2. Seja rigoroso nas comparações e consulte apenas o banco de dados.
+3. Mostre valores reais do banco em caso de FAIL"""
+        }
+    ]
+    if campos:
+        mensagens[1]["content"] += (
+            f"\n4. Os demais campos já foram validados. Responda APENAS as linhas: {', '.join(campos)}. "
+            "Valores escritos de outra forma (ex: \"Yes\" para true, \"Android14\", \"2.4 GHz\") "
+            "devem ser comparados pelo significado."
+        )
+    return mensagens
+
+# Contexto de vários inputs do mesmo hardware: junta os recortes de cada um (as regiões pedidas por todos)
+def montar_contexto_lote(banco, inputs):
+    contexto = {}
+    for input_json in inputs:
+        for nome, dados in montar_contexto_hardware(banco, input_json).items():
+            if nome not in contexto:
+                contexto[nome] = dict(dados) if isinstance(dados, dict) else dados
+                continue
+            if not isinstance(dados, dict):
+                continue
+            atual = contexto[nome]
+            if isinstance(dados["Regioes"], dict):
+                atual["Regioes"] = {**atual["Regioes"], **dados["Regioes"]}
+            else:
+                atual["Regioes"] = atual["Regioes"] + [r for r in dados["Regioes"] if r not in atual["Regioes"]]
+            if "Regioes_existentes" in dados:
+                atual["Regioes_existentes"] = dados["Regioes_existentes"]
+    return contexto
+
+# itens: lista de (id, input_json), todos do mesmo hardware. O prompt de sistema e o banco vão uma vez só.
+def montar_mensagens_analise_lote(banco, itens):
+    inputs = "\n".join(f"{id_input}: {json_compacto(input_json)}" for id_input, input_json in itens)
+    return [
+        {"role": "system", "content": PROMPT_SISTEMA_ANALISE + PROMPT_LOTE},
+        {
+            "role": "user",
+            "content": f"""Dados para análise:
+
+BANCO DE DADOS:
+{json_compacto(montar_contexto_lote(banco, [input_json for _, input_json in itens]))}
+
+INPUTS:
+{inputs}
+
+INSTRUÇÕES:
+1. Para cada campo de cada input, verifique no banco
+2. Seja rigoroso nas comparações e consulte apenas o banco de dados.
+3. Mostre valores reais do banco em caso de FAIL"""
+        }
+    ]
+
+_CABECALHO_LOTE = re.compile(r"^\s*#*\s*\**\s*INPUT\s+([\w.-]+?)\**\s*:?\s*$", re.IGNORECASE)
+
+def dividir_resposta_lote(texto, ids):
+    """Separa a resposta do modo lote por ID: {id: [ResultadoCampo, ...]}.
+    Só entram os blocos com todos os campos de RESULTADOS; os IDs que faltarem devem ser refeitos um a um."""
+    blocos = {}
+    atual = None
+    for linha in texto.splitlines():
+        cabecalho = _CABECALHO_LOTE.match(linha)
+        if cabecalho:
+            atual = cabecalho.group(1) if cabecalho.group(1) in ids else None
+            if atual is not None:
+                blocos[atual] = [] # Um ID repetido fica com o último bloco
+            continue
+        resultado = interpretar_linha(linha, ORIGEM_DEEPSEEK) if atual is not None else None
+        if resultado:
+            blocos[atual].append(resultado)
+    return {id_input: resultados for id_input, resultados in blocos.items()
+            if set(CAMPOS_RESULTADO) <= {r.campo for r in resultados}}
+
+def montar_mensagens_explicacao(banco, input_json, resultado_local):
+    return [
+        {"role": "system", "content": PROMPT_SISTEMA_EXPLICACAO},
+        {
+            "role": "user",
+            "content": f"""HARDWARE NO BANCO:
+{json_compacto(montar_contexto_hardware(banco, input_json))}
+
+INPUT:
+{json_compacto(input_json)}
+
+{resultado_local}"""
+        }
+    ]
+
+_tokens_banco = (None, 0) # (banco, tokens do prompt antigo sem o input): calculado uma vez por banco
+
+def _tokens_prompt_antigo(banco):
+    # A parte que depende só do banco é a mesma para todos os inputs: serializada e contada uma única vez.
+    # As partes terminam e começam com pontuação, então a soma das contagens é igual à contagem do texto inteiro.
+    global _tokens_banco
+    atual, tokens = _tokens_banco
+    if atual is not banco:
+        tokens = estimar_tokens(PROMPT_SISTEMA_ANALISE + json.dumps(banco, indent=2))
+        _tokens_banco = (banco, tokens)
+    return tokens
+
+# Compara o prompt reduzido com o prompt antigo (banco inteiro com indent=2), em tokens estimados
+def relatorio_tokens_prompt(banco, input_json):
+    antigo = _tokens_prompt_antigo(banco) + estimar_tokens(json.dumps(json.dumps(input_json, indent=4), indent=2))
+    novo = "".join(mensagem["content"] for mensagem in montar_mensagens_analise(banco, input_json))
+    return {"tokens_antes": antigo, "tokens_depois": estimar_tokens(novo)}
+
+# Mesmo relatório para uma requisição em lote: os tokens do prompt são divididos entre os inputs
+def relatorio_tokens_lote(banco, itens):
+    novo = estimar_tokens("".join(mensagem["content"] for mensagem in montar_mensagens_analise_lote(banco, itens)))
+    return [
+        {"tokens_antes": relatorio_tokens_prompt(banco, input_json)["tokens_antes"], "tokens_depois": round(novo / len(itens))}
+        for _, input_json in itens
+    ]
@@ -0,0 +1,110 @@
+import json # Permite ler, escrever e manipular dados no formato JSON
+import os # Fornece acesso a funções do sistema operacional
+import sqlite3 # Armazenamento dos feedbacks
+import threading
+from resultados import interpretar_resultados
+
+# Registro de feedbacks só de acréscimo: cada feedback é um INSERT, sem reler nem regravar os anteriores,
+# então o custo de salvar não cresce com o tamanho do histórico. O SQLite garante que cada acréscimo é atômico
+# e que vários processos podem gravar ao mesmo tempo sem perder registros (o que acontecia com o feedback_logs.json).
+# Índices por data, tipo e hardware permitem consultar o histórico sem percorrê-lo inteiro.
+
+FEEDBACK_DB_PADRAO = os.getenv("FEEDBACK_DB", "feedback_logs.db")
+FEEDBACK_JSON_ANTIGO = "feedback_logs.json" # Formato antigo, importado uma única vez
+
+# Hardware ao qual o feedback se refere: campo próprio, resultados estruturados ou a linha HARDWARE do texto
+def hardware_do_registro(registro):
+    if registro.get("hardware"):
+        return registro["hardware"]
+    for resultado in registro.get("resultados") or []:
+        if resultado.get("campo") == "HARDWARE":
+            return resultado.get("valor")
+    for resultado in interpretar_resultados(registro.get("resultado_original") or ""):
+        if resultado.campo == "HARDWARE":
+            return resultado.valor
+    return None
+
+class RegistroFeedback:
+    def __init__(self, caminho=FEEDBACK_DB_PADRAO, migrar_de=FEEDBACK_JSON_ANTIGO):
+        self.caminho = caminho
+        self._local = threading.local() # Uma conexão por thread, como no cache persistente
+        with self._conexao() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS feedbacks ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, tipo TEXT NOT NULL, "
+                "hardware TEXT, registro TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_feedbacks_timestamp ON feedbacks(timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_feedbacks_tipo ON feedbacks(tipo, timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_feedbacks_hardware ON feedbacks(hardware, timestamp)")
+            conn.execute("CREATE TABLE IF NOT EXISTS migracoes (origem TEXT PRIMARY KEY, quantidade INTEGER NOT NULL)")
+        if migrar_de:
+            self.migrar(migrar_de)
+
+    def _conexao(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.caminho, timeout=30)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL") # Leitores não bloqueiam quem está gravando
+            except sqlite3.OperationalError:
+                pass # Outro processo está ativando o WAL ao mesmo tempo; o modo fica gravado no arquivo
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def adicionar(self, registro):
+        """Acrescenta um feedback (dicionário com timestamp, tipo, feedback, ...) e devolve o id dele."""
+        with self._conexao() as conn:
+            return self._inserir(conn, registro)
+
+    def _inserir(self, conn, registro):
+        cursor = conn.execute(
+            "INSERT INTO feedbacks (timestamp, tipo, hardware, registro) VALUES (?, ?, ?, ?)",
+            (registro["timestamp"], registro["tipo"], hardware_do_registro(registro),
+             json.dumps(registro, ensure_ascii=False))
+        )
+        return cursor.lastrowid
+
+    def listar(self, tipo=None, hardware=None, desde=None, ate=None, limite=None):
+        """Feedbacks em ordem de gravação, filtrados pelos índices. desde/ate no formato "AAAA-MM-DD HH:MM:SS"."""
+        condicoes, parametros = [], []
+        for coluna, operador, valor in (("tipo", "=", tipo), ("hardware", "=", hardware),
+                                        ("timestamp", ">=", desde), ("timestamp", "<=", ate)):
+            if valor is not None:
+                condicoes.append(f"{coluna} {operador} ?")
+                parametros.append(valor)
+        sql = "SELECT registro FROM feedbacks"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += " ORDER BY id"
+        if limite:
+            sql += " LIMIT ?"
+            parametros.append(limite)
+        for (registro,) in self._conexao().execute(sql, parametros):
+            yield json.loads(registro)
+
+    def contar(self, tipo=None):
+        if tipo is None:
+            return self._conexao().execute("SELECT COUNT(*) FROM feedbacks").fetchone()[0]
+        return self._conexao().execute("SELECT COUNT(*) FROM feedbacks WHERE tipo = ?", (tipo,)).fetchone()[0]
+
+    def migrar(self, caminho_json):
+        """Importa uma única vez os feedbacks do feedback_logs.json. O arquivo antigo não é alterado."""
+        origem = os.path.abspath(caminho_json)
+        if not os.path.exists(caminho_json):
+            return 0
+        conn = self._conexao()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE") # Dois programas abertos ao mesmo tempo não importam o arquivo duas vezes
+            if conn.execute("SELECT 1 FROM migracoes WHERE origem = ?", (origem,)).fetchone():
+                return 0
+            try:
+                with open(caminho_json, "r", encoding="utf-8") as f:
+                    feedbacks = json.load(f).get("feedbacks", [])
+            except (json.JSONDecodeError, AttributeError):
+                feedbacks = [] # Arquivo corrompido ou em outro formato: nada a importar
+            for registro in feedbacks:
+                self._inserir(conn, registro)
+            conn.execute("INSERT INTO migracoes (origem, quantidade) VALUES (?, ?)", (origem, len(feedbacks)))
+        return len(feedbacks)
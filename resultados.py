@@ -0,0 +1,123 @@
+import json # Permite ler, escrever e manipular dados no formato JSON
+import re # Leitura das linhas do bloco RESULTADOS
+from typing import Any, NamedTuple
+
+# Resultados estruturados: cada linha do bloco RESULTADOS vira um ResultadoCampo (campo, status, valor, esperado, origem).
+# É nessa forma que os resultados são guardados no cache, no modo em lote e nos feedbacks;
+# o texto só é montado (formatar_resultados) na hora de mostrar na tela ou de enviar ao DeepSeek.
+
+# Quem decidiu o campo
+ORIGEM_LOCAL = "local" # Motor de regras, com certeza
+ORIGEM_DEEPSEEK = "deepseek" # IA, porque as regras locais não tinham certeza (ou na análise completa pela IA)
+ORIGEM_LOCAL_INCERTO = "local-incerto" # Motor de regras sem certeza, e a IA não respondeu
+ORIGEM_CORRECAO = "correcao" # Veredito trocado por uma correção enviada como feedback (correcoes.py)
+
+# Marcação acrescentada depois do valor, no texto, para os campos que não foram decididos com certeza pelo motor local
+_MARCAS_ORIGEM = {ORIGEM_DEEPSEEK: "(DeepSeek)", ORIGEM_LOCAL_INCERTO: "(incerto)", ORIGEM_CORRECAO: "(corrigido)"}
+
+class ResultadoCampo(NamedTuple):
+    campo: str # Nome da linha, ex: "BLUETOOTH"
+    status: str # "PASS" ou "FAIL"
+    valor: str # Valor do input, como aparece entre colchetes
+    esperado: Any = None # Valor(es) esperado(s) no banco; None quando passou ou quando o hardware não existe
+    origem: str = ORIGEM_LOCAL
+
+    @property
+    def passou(self):
+        return self.status == "PASS"
+
+# "- CAMPO: PASS/FAIL resto". Aceita os enfeites que a IA às vezes coloca (negrito, marcadores, emojis antes do status)
+_LINHA = re.compile(r"^\s*[-•*]?\s*\**\s*([A-ZÇÃÕÁÉÍÓÚ_ ]+?)\s*\**\s*:\s*\**\s*\W*\s*(PASS|FAIL)\b\**\s*(.*)$")
+_SETA = re.compile(r"\s*(?:→|->)\s*")
+_ESPERADO = re.compile(r"^(?:Valor(?:es)? )?esperados?\s*:\s*(.*)$", re.IGNORECASE)
+HARDWARE_NAO_ENCONTRADO = "Hardware não encontrado no banco de dados"
+
+def _interpretar_esperado(texto):
+    if not texto or texto.startswith(HARDWARE_NAO_ENCONTRADO):
+        return None
+    encontrado = _ESPERADO.match(texto)
+    if not encontrado:
+        return texto # Comentário livre da IA: guardado como texto
+    try:
+        return json.loads(encontrado.group(1))
+    except ValueError:
+        return encontrado.group(1).strip()
+
+def interpretar_linha(linha, origem=ORIGEM_LOCAL):
+    """Converte uma linha do bloco RESULTADOS em ResultadoCampo. Retorna None se a linha não for de resultado.
+    origem é usada quando a linha não traz marcação (ORIGEM_DEEPSEEK para respostas da IA)."""
+    encontrado = _LINHA.match(linha)
+    if not encontrado:
+        return None
+    campo, status, resto = encontrado.groups()
+    partes = _SETA.split(resto, maxsplit=1)
+    valor = partes[0].strip()
+    for nome_origem, marca in _MARCAS_ORIGEM.items():
+        if valor.endswith(marca):
+            valor, origem = valor[:-len(marca)].strip(), nome_origem
+    if valor.startswith("[") and "]" in valor:
+        valor = valor[1:valor.rindex("]")] # O valor pode conter colchetes (listas), então vai até o último "]"
+    esperado = _interpretar_esperado(partes[1].strip()) if len(partes) > 1 and status == "FAIL" else None
+    return ResultadoCampo(campo.strip().replace(" ", "_"), status, valor, esperado, origem)
+
+def interpretar_resultados(texto, origem=ORIGEM_LOCAL):
+    """Extrai os ResultadoCampo de um texto (resposta da IA ou bloco local), ignorando as demais linhas."""
+    resultados = []
+    for linha in texto.splitlines():
+        resultado = interpretar_linha(linha, origem)
+        if resultado:
+            resultados.append(resultado)
+    return resultados
+
+# Monta o texto no mesmo formato OBRIGATÓRIO pedido ao DeepSeek
+def formatar_resultados(resultados):
+    linhas = ["RESULTADOS:"]
+    for campo, status, valor, esperado, origem in resultados:
+        linha = f"- {campo}: {status} [{valor}]"
+        if origem in _MARCAS_ORIGEM:
+            linha += f" {_MARCAS_ORIGEM[origem]}"
+        if status == "FAIL":
+            if esperado is None:
+                linha += f" → {HARDWARE_NAO_ENCONTRADO}"
+            elif isinstance(esperado, list):
+                linha += f" → Valores esperados: {json.dumps(esperado, ensure_ascii=False)}"
+            else:
+                linha += f" → Valor esperado: {json.dumps(esperado, ensure_ascii=False)}"
+        linhas.append(linha)
+    return "\n".join(linhas)
+
+def falhas(resultados):
+    return [r.campo for r in resultados if not r.passou]
+
+# Campos em que dois resultados discordam: lista de (campo, status em a, status em b).
+# Usado para comparar a análise da IA com o motor local.
+def comparar_resultados(a, b):
+    status_b = {r.campo: r.status for r in b}
+    diferencas = []
+    for r in a:
+        if status_b.get(r.campo) != r.status:
+            diferencas.append((r.campo, r.status, status_b.get(r.campo)))
+    campos_a = {r.campo for r in a}
+    diferencas.extend((campo, None, status) for campo, status in status_b.items() if campo not in campos_a)
+    return diferencas
+
+# Forma compacta para JSON (cache e arquivos): uma lista [campo, status, valor, esperado, origem] por linha
+def para_json(resultados):
+    return [list(r) for r in resultados]
+
+def de_json(dados):
+    """Inverso de para_json. Aceita também texto, como os valores antigos do cache, que guardavam a resposta crua."""
+    if isinstance(dados, str):
+        return interpretar_resultados(dados)
+    return [ResultadoCampo(*linha) for linha in dados]
+
+# Forma legível para relatórios: uma lista de dicionários {campo, status, valor, esperado, origem}
+def para_dicionarios(resultados):
+    return [r._asdict() for r in resultados]
+
+# Quantos campos cada motor decidiu, ex: {"local": 7, "deepseek": 2}
+def contar_origens(resultados):
+    contagem = {}
+    for r in resultados:
+        contagem[r.origem] = contagem.get(r.origem, 0) + 1
+    return contagem
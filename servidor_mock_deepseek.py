@@ -0,0 +1,233 @@
+import argparse # Leitura dos argumentos da linha de comando
+import json # Permite ler, escrever e manipular dados no formato JSON
+import math
+import random # Latência e falhas simuladas (com semente, para testes reproduzíveis)
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from motor_regras import avaliar_campos
+from prompts_deepseek import PROMPT_SISTEMA_EXPLICACAO, estimar_tokens
+from resultados import formatar_resultados
+
+# Servidor local que imita a rota /chat/completions do DeepSeek, para testar concorrência, retentativas e cache
+# sem rede e sem gastar créditos. As respostas são determinísticas: o bloco RESULTADOS é gerado pelo motor de regras
+# local a partir do próprio prompt. Latência (com cauda longa), erros 5xx e 429 são configuráveis. Uso:
+#   python servidor_mock_deepseek.py --porta 8765 --latencia 800 --latencia-p99 4000 --taxa-429 0.05
+# e, no .env ou no terminal: DEEPSEEK_BASE_URL=http://127.0.0.1:8765/v1
+
+PORTA_PADRAO = 8765
+_Z_P99 = 2.3263 # Quantil 99% da normal padrão, usado para calibrar a cauda da latência
+
+_BANCO_NO_PROMPT = re.compile(r"(?:BANCO DE DADOS|HARDWARE NO BANCO):\n(.*)\n")
+_INPUT_NO_PROMPT = re.compile(r"INPUT:\n(.*)\n")
+_INPUTS_NO_PROMPT = re.compile(r"INPUTS:\n(.*?)\n\n", re.DOTALL)
+_CAMPOS_NO_PROMPT = re.compile(r"APENAS as linhas: (.*?)\. ")
+
+# O prompt leva só o recorte do banco (montar_contexto_hardware); ele já serve como banco para o motor local
+def _banco_do_contexto(contexto):
+    if "Hardware_nao_encontrado" in contexto:
+        return dict.fromkeys(contexto.get("Hardwares_existentes") or [], {})
+    return contexto
+
+def _resultados_texto(banco, input_json, campos=None):
+    resultados = avaliar_campos(banco, input_json)
+    if campos:
+        resultados = [r for r in resultados if r.campo in campos]
+    return formatar_resultados(resultados)
+
+def _explicacao(banco, input_json):
+    falhas = [r for r in avaliar_campos(banco, input_json) if not r.passou]
+    if not falhas:
+        return "Todos os campos passaram; nada a corrigir."
+    return "\n".join(
+        f"- {r.campo}: o valor [{r.valor}] não é aceito pelo banco"
+        + (f"; use {json.dumps(r.esperado, ensure_ascii=False)}." if r.esperado is not None else ".")
+        for r in falhas
+    )
+
+def gerar_resposta(mensagens):
+    """Texto que o servidor devolve para uma lista de mensagens no formato chat completions."""
+    sistema = next((m["content"] for m in mensagens if m.get("role") == "system"), "")
+    usuario = next((m["content"] for m in reversed(mensagens) if m.get("role") == "user"), "")
+    banco = _BANCO_NO_PROMPT.search(usuario)
+    try:
+        banco = _banco_do_contexto(json.loads(banco.group(1))) if banco else None
+    except ValueError:
+        banco = None
+    if banco is None:
+        return "Resposta simulada pelo servidor local de testes."
+
+    inputs = _INPUTS_NO_PROMPT.search(usuario)
+    if inputs:
+        # Modo lote: um bloco por ID
+        blocos = []
+        for linha in inputs.group(1).splitlines():
+            id_input, _, dados = linha.partition(": ")
+            blocos.append(f"### INPUT {id_input}\n{_resultados_texto(banco, json.loads(dados))}")
+        return "\n\n".join(blocos)
+
+    input_json = json.loads(_INPUT_NO_PROMPT.search(usuario).group(1))
+    if sistema == PROMPT_SISTEMA_EXPLICACAO:
+        return _explicacao(banco, input_json)
+    campos = _CAMPOS_NO_PROMPT.search(usuario)
+    return _resultados_texto(banco, input_json, campos.group(1).split(", ") if campos else None)
+
+class ServidorMockDeepSeek(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, porta=PORTA_PADRAO, latencia_ms=0, latencia_p99_ms=None, taxa_erro=0.0, taxa_429=0.0,
+                 retry_after=1, intervalo_trecho_ms=5, semente=None, host="127.0.0.1"):
+        super().__init__((host, porta), _Manipulador)
+        self.latencia = latencia_ms / 1000
+        # Latência log-normal: mediana = latencia, percentil 99 = latencia_p99 (cauda longa, como na API real)
+        if latencia_ms and latencia_p99_ms and latencia_p99_ms > latencia_ms:
+            self.sigma = math.log(latencia_p99_ms / latencia_ms) / _Z_P99
+        else:
+            self.sigma = 0.0
+        self.taxa_erro = taxa_erro
+        self.taxa_429 = taxa_429
+        self.retry_after = retry_after
+        self.intervalo_trecho = intervalo_trecho_ms / 1000
+        self.aleatorio = random.Random(semente)
+        self._lock = threading.Lock()
+        self.contadores = {"requisicoes": 0, "respostas": 0, "erros_5xx": 0, "erros_429": 0, "streams": 0}
+
+    @property
+    def url_base(self):
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}/v1"
+
+    def contar(self, nome):
+        with self._lock:
+            self.contadores[nome] += 1
+
+    def sortear(self):
+        """Decide o destino da requisição: ("429" | "5xx" | "ok", latência em segundos)."""
+        with self._lock:
+            u = self.aleatorio.random()
+            latencia = self.latencia * math.exp(self.aleatorio.gauss(0, self.sigma)) if self.sigma else self.latencia
+        if u < self.taxa_429:
+            return "429", 0.0
+        if u < self.taxa_429 + self.taxa_erro:
+            return "5xx", latencia
+        return "ok", latencia
+
+    def estatisticas(self):
+        with self._lock:
+            return dict(self.contadores)
+
+class _Manipulador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Mantém a conexão aberta entre requisições, como a API real
+    disable_nagle_algorithm = True # Cabeçalho e corpo saem sem esperar o ACK (evita ~40 ms extras por resposta)
+
+    def log_message(self, formato, *argumentos):
+        pass # Sem uma linha no terminal por requisição
+
+    def _responder_json(self, status, dados, cabecalhos=None):
+        corpo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _trecho_http(self, dados):
+        self.wfile.write(f"{len(dados):x}\r\n".encode("ascii") + dados + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/estatisticas"):
+            self._responder_json(200, self.server.estatisticas())
+        else:
+            self._responder_json(404, {"error": {"message": "rota não encontrada"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._responder_json(404, {"error": {"message": "rota não encontrada"}})
+            return
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        servidor = self.server
+        servidor.contar("requisicoes")
+
+        destino, latencia = servidor.sortear()
+        if destino == "429":
+            servidor.contar("erros_429")
+            self._responder_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                                 {"Retry-After": str(servidor.retry_after)})
+            return
+        time.sleep(latencia)
+        if destino == "5xx":
+            servidor.contar("erros_5xx")
+            self._responder_json(503, {"error": {"message": "Service unavailable (simulado)", "type": "server_error"}})
+            return
+
+        mensagens = payload.get("messages", [])
+        texto = gerar_resposta(mensagens)
+        uso = {
+            "prompt_tokens": sum(estimar_tokens(m.get("content", "")) for m in mensagens),
+            "completion_tokens": estimar_tokens(texto)
+        }
+        uso["total_tokens"] = uso["prompt_tokens"] + uso["completion_tokens"]
+        modelo = payload.get("model", "deepseek-chat")
+        servidor.contar("respostas")
+
+        if not payload.get("stream"):
+            self._responder_json(200, {
+                "id": f"mock-{time.monotonic_ns()}", "object": "chat.completion", "created": int(time.time()),
+                "model": modelo, "usage": uso,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": texto}, "finish_reason": "stop"}]
+            })
+            return
+
+        # Streaming SSE com transferência em pedaços, um evento "data:" por trecho, terminando em [DONE]
+        servidor.contar("streams")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for inicio in range(0, len(texto), 20):
+            evento = {"object": "chat.completion.chunk", "model": modelo,
+                      "choices": [{"index": 0, "delta": {"content": texto[inicio:inicio + 20]}}]}
+            self._trecho_http(f"data: {json.dumps(evento, ensure_ascii=False)}\n\n".encode("utf-8"))
+            time.sleep(servidor.intervalo_trecho)
+        final = {"object": "chat.completion.chunk", "model": modelo, "usage": uso,
+                 "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        self._trecho_http(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+def iniciar_servidor_mock(porta=0, **opcoes):
+    """Sobe o servidor em uma thread e devolve-o (porta=0 escolhe uma porta livre; veja servidor.url_base)."""
+    servidor = ServidorMockDeepSeek(porta, **opcoes)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local que imita a API de chat do DeepSeek, para testes sem rede.")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO, help=f"Porta (padrão: {PORTA_PADRAO})")
+    parser.add_argument("--latencia", type=float, default=0, help="Latência mediana de cada resposta, em ms (padrão: 0)")
+    parser.add_argument("--latencia-p99", type=float, help="Percentil 99 da latência, em ms (cauda longa; padrão: sem variação)")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="Fração das requisições respondidas com 503 (padrão: 0)")
+    parser.add_argument("--taxa-429", type=float, default=0.0, help="Fração das requisições respondidas com 429 (padrão: 0)")
+    parser.add_argument("--retry-after", type=float, default=1, help="Valor do cabeçalho Retry-After nos 429, em segundos (padrão: 1)")
+    parser.add_argument("--semente", type=int, help="Semente do sorteio de latência e falhas, para repetir um teste")
+    args = parser.parse_args(argv)
+
+    servidor = ServidorMockDeepSeek(args.porta, args.latencia, args.latencia_p99, args.taxa_erro, args.taxa_429,
+                                    args.retry_after, semente=args.semente)
+    print(f"Servidor de testes em {servidor.url_base} (DEEPSEEK_BASE_URL). Ctrl+C para encerrar.")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        print(f"\nEstatísticas: {json.dumps(servidor.estatisticas())}")
+    return 0
+
+if __name__ == "__main__":
+    main()
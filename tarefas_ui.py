@@ -0,0 +1,123 @@
+import queue # Filas seguras entre a thread da interface e a thread de trabalho
+import threading
+import tkinter as tk
+from tkinter import filedialog, scrolledtext
+
+from metricas import metricas
+
+# Execução das análises fora da thread do Tkinter: a janela continua respondendo (e a barra de status
+# é redesenhada) enquanto a validação e as chamadas ao DeepSeek acontecem em segundo plano.
+# Os resultados voltam para a thread da interface por janela.after, único lugar onde os widgets são alterados.
+
+class ExecutorEmSegundoPlano:
+    def __init__(self, janela, ao_mudar_estado=None, intervalo_ms=100):
+        self.janela = janela
+        self.ao_mudar_estado = ao_mudar_estado # Chamada com o número de tarefas pendentes sempre que ele muda
+        self.intervalo_ms = intervalo_ms
+        self.tarefas = queue.Queue() # Tarefas aguardando a thread de trabalho
+        self.respostas = queue.Queue() # Resultados aguardando a thread da interface
+        self.geracao = 0 # Incrementada ao cancelar: tarefas de gerações antigas são descartadas
+        self.geracao_em_andamento = 0 # Geração da tarefa que a thread de trabalho está executando
+        self.pendentes = 0
+        threading.Thread(target=self._trabalhar, daemon=True).start()
+        self.janela.after(self.intervalo_ms, self._entregar)
+
+    @property
+    def ocupado(self):
+        return self.pendentes > 0
+
+    def enviar(self, funcao, argumentos, ao_concluir):
+        """Coloca a tarefa na fila. ao_concluir(resultado, erro) é chamado depois na thread da interface."""
+        self.pendentes += 1
+        self.tarefas.put((self.geracao, funcao, argumentos, ao_concluir))
+        self._notificar()
+
+    def cancelar(self):
+        """Descarta as tarefas na fila e ignora o resultado da que estiver em andamento."""
+        self.geracao += 1
+        while True:
+            try:
+                self.tarefas.get_nowait()
+            except queue.Empty:
+                break
+        self.pendentes = 0
+        self._notificar()
+
+    def cancelada(self, geracao):
+        return geracao != self.geracao
+
+    def tarefa_cancelada(self):
+        """Chamada pela thread de trabalho para saber se deve interromper a tarefa atual."""
+        return self.cancelada(self.geracao_em_andamento)
+
+    def na_interface(self, funcao, *argumentos):
+        """Chamada pela thread de trabalho: agenda funcao(*argumentos) na thread da interface
+        (ex: acrescentar um trecho de texto recebido em streaming). Descartada se a tarefa for cancelada."""
+        self.respostas.put((self.geracao_em_andamento, funcao, argumentos, False))
+
+    def _trabalhar(self):
+        while True:
+            geracao, funcao, argumentos, ao_concluir = self.tarefas.get()
+            if self.cancelada(geracao):
+                continue
+            self.geracao_em_andamento = geracao
+            try:
+                resultado, erro = funcao(*argumentos), None
+            except Exception as e:
+                resultado, erro = None, e
+            self.respostas.put((geracao, ao_concluir, (resultado, erro), True))
+
+    def _entregar(self):
+        # Roda na thread da interface: repassa os resultados prontos e se reagenda
+        while True:
+            try:
+                geracao, funcao, argumentos, final = self.respostas.get_nowait()
+            except queue.Empty:
+                break
+            if self.cancelada(geracao):
+                continue
+            funcao(*argumentos) # Resultado final (ao_concluir) ou atualização parcial vinda de na_interface
+            if final:
+                self.pendentes -= 1
+                self._notificar()
+        self.janela.after(self.intervalo_ms, self._entregar)
+
+    def _notificar(self):
+        if self.ao_mudar_estado:
+            self.ao_mudar_estado(self.pendentes)
+
+# Janela com o retrato atual das métricas (metricas.py), em JSON ou no formato do Prometheus,
+# com opção de atualizar, exportar para arquivo e zerar os contadores
+def abrir_janela_metricas(janela):
+    janela_metricas = tk.Toplevel(janela)
+    janela_metricas.title("Métricas")
+    janela_metricas.geometry("700x500")
+    formato = tk.StringVar(value="json")
+    texto = scrolledtext.ScrolledText(janela_metricas, wrap=tk.NONE, font=("Consolas", 10))
+
+    def atualizar():
+        texto.delete(1.0, tk.END)
+        texto.insert(tk.END, metricas.para_json() if formato.get() == "json" else metricas.para_prometheus())
+
+    def exportar():
+        caminho = filedialog.asksaveasfilename(
+            parent=janela_metricas,
+            title="Exportar métricas",
+            defaultextension=".json" if formato.get() == "json" else ".prom",
+            filetypes=[("JSON", "*.json"), ("Prometheus", "*.prom")]
+        )
+        if caminho:
+            metricas.exportar(caminho)
+
+    def zerar():
+        metricas.zerar()
+        atualizar()
+
+    barra = tk.Frame(janela_metricas, padx=5, pady=5)
+    barra.pack(fill=tk.X)
+    for rotulo, valor in (("JSON", "json"), ("Prometheus", "prometheus")):
+        tk.Radiobutton(barra, text=rotulo, variable=formato, value=valor, command=atualizar).pack(side=tk.LEFT)
+    for rotulo, comando in (("Zerar", zerar), ("Exportar", exportar), ("Atualizar", atualizar)):
+        tk.Button(barra, text=rotulo, command=comando).pack(side=tk.RIGHT, padx=2)
+    texto.pack(fill=tk.BOTH, expand=True)
+    atualizar()
@@ -0,0 +1,43 @@
+import copy
+import json
+import os
+import sys
+
+import pytest
+
+# Os módulos ficam na raiz do repositório, sem pacote instalável
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+BANCO_REAL = os.path.join(RAIZ, "software_db.json")
+INPUTS_REAIS = os.path.join(RAIZ, "Inputs.zip")
+
+# Input que passa em todos os campos para o Hardware_B do software_db.json
+INPUT_VALIDO = {
+    "Hardware": "Hardware_B", "Software": "TMAUL-VS1", "Regiao_Execucao": "USA",
+    "Versao_Android": "Android 13", "WiFi": "5GHz", "NFC": True, "Bluetooth": "5.0+",
+    "SIM": "Dual SIM", "Rede": "6G"
+}
+
+def gravar_json(caminho, dados):
+    """Grava o JSON e avança a data do arquivo: duas gravações no mesmo instante não passam despercebidas."""
+    anterior = os.stat(caminho).st_mtime_ns if os.path.exists(caminho) else 0
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f, indent=2, ensure_ascii=False)
+    momento = max(anterior + 1_000_000_000, os.stat(caminho).st_mtime_ns)
+    os.utime(caminho, ns=(momento, momento))
+
+@pytest.fixture
+def banco():
+    with open(BANCO_REAL, encoding="utf-8") as f:
+        return json.load(f)
+
+@pytest.fixture
+def input_valido():
+    return copy.deepcopy(INPUT_VALIDO)
+
+@pytest.fixture
+def caminho_banco(tmp_path, banco):
+    caminho = str(tmp_path / "software_db.json")
+    gravar_json(caminho, banco)
+    return caminho
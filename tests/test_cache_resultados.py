@@ -0,0 +1,102 @@
+import sqlite3
+
+import pytest
+
+import cache_resultados
+from cache_resultados import ResultCache, ResultCachePersistente, gerar_chave_cache
+
+class Relogio:
+    """Substitui o módulo time do cache_resultados: o tempo só anda quando o teste manda."""
+    def __init__(self):
+        self.agora = 1000.0
+
+    def monotonic(self):
+        return self.agora
+
+    def time(self):
+        return self.agora
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(cache_resultados, "time", relogio)
+    return relogio
+
+def test_item_expira_depois_do_ttl(relogio):
+    cache = ResultCache(ttl_hours=1)
+    cache.add("a", "valor")
+    relogio.agora += 3599
+    assert cache.get("a") == "valor"
+    relogio.agora += 1
+    assert cache.get("a") is None
+    assert cache.estatisticas()["expirations"] == 1
+    assert cache.estatisticas()["itens"] == 0
+
+def test_limpeza_periodica_antes_da_consulta_nao_quebra_o_get(relogio):
+    # Regressão: a limpeza periódica dentro do get removia o item já encontrado e o get dava KeyError
+    cache = ResultCache(ttl_hours=1, intervalo_limpeza=2)
+    for i in range(10):
+        cache.add(i, i)
+        relogio.agora += 3600
+        assert cache.get(i) is None
+    assert cache.estatisticas()["itens"] == 0
+
+def test_limpeza_periodica_remove_os_expirados(relogio):
+    cache = ResultCache(ttl_hours=1, intervalo_limpeza=3)
+    cache.add("a", 1)
+    cache.add("b", 2)
+    relogio.agora += 3600
+    cache.add("c", 3) # Terceira operação: a limpeza remove a e b sem que sejam consultados
+    assert list(cache.cache) == ["c"]
+    assert cache.estatisticas()["expirations"] == 2
+
+def test_lru_remove_o_usado_ha_mais_tempo():
+    cache = ResultCache(max_size=2)
+    cache.add("a", 1)
+    cache.add("b", 2)
+    cache.get("a")
+    cache.add("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.estatisticas()["evictions"] == 1
+
+def test_limite_de_bytes():
+    cache = ResultCache(max_size=100, max_bytes=10)
+    cache.add("a", "12345")
+    cache.add("b", "123456")
+    assert cache.get("a") is None and cache.get("b") == "123456"
+    cache.add("c", "x" * 11) # Maior que o cache inteiro: não é guardado
+    assert cache.get("c") is None and cache.get("b") == "123456"
+    assert cache.estatisticas()["bytes"] == 6
+
+def test_chave_muda_com_a_entrada_do_banco(banco, input_valido):
+    chave = gerar_chave_cache(input_valido, banco, "modelo", "v1")
+    outro = dict(banco, Hardware_A=dict(banco["Hardware_A"], Android_mais_recente="Android 17"))
+    assert gerar_chave_cache(input_valido, outro, "modelo", "v1") == chave # Outro hardware: mesma chave
+    banco["Hardware_B"]["Tecnologias_suportadas"]["NFC"] = False
+    assert gerar_chave_cache(input_valido, banco, "modelo", "v1") != chave
+
+def test_persistente_sobrevive_a_outra_instancia(tmp_path):
+    caminho = str(tmp_path / "cache.db")
+    ResultCachePersistente(caminho).add("a", {"resposta": "ok"})
+    assert ResultCachePersistente(caminho).get("a") == {"resposta": "ok"}
+
+def test_persistente_respeita_o_ttl_do_sqlite(tmp_path, relogio):
+    caminho = str(tmp_path / "cache.db")
+    ResultCachePersistente(caminho, ttl_hours=2).add("a", "valor")
+    relogio.agora += 2 * 3600 - 1
+    assert ResultCachePersistente(caminho, ttl_hours=2).get("a") == "valor"
+    relogio.agora += 1
+    assert ResultCachePersistente(caminho, ttl_hours=2).get("a") is None
+
+def test_persistente_limita_o_tamanho_a_cada_intervalo(tmp_path, relogio):
+    caminho = str(tmp_path / "cache.db")
+    cache = ResultCachePersistente(caminho, max_size=50, intervalo_limpeza=10)
+    for i in range(205):
+        relogio.agora += 1
+        cache.add(f"chave{i}", i)
+    with sqlite3.connect(caminho) as conn:
+        chaves = [linha[0] for linha in conn.execute("SELECT chave FROM cache ORDER BY timestamp")]
+    # Conferido na gravação 200; as 5 seguintes ainda não passaram pela limpeza
+    assert len(chaves) == 55
+    assert chaves[0] == "chave150"
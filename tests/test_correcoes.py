@@ -0,0 +1,89 @@
+from cache_resultados import impressao_digital_banco
+from correcoes import CacheCorrecoes, interpretar_correcao
+from indice_banco import IndiceBanco
+from motor_regras import avaliar_campos
+from registro_feedback import RegistroFeedback
+from resultados import ORIGEM_CORRECAO, para_dicionarios
+
+def _feedback(banco, input_json, texto, com_impressao=True):
+    registro = {
+        "timestamp": "2026-01-01 10:00:00", "tipo": "correcao", "feedback": texto,
+        "resultados": para_dicionarios(avaliar_campos(banco, input_json))
+    }
+    if com_impressao:
+        registro["impressao_banco"] = impressao_digital_banco(banco, input_json["Hardware"])
+    return registro
+
+def _status(resultados, campo):
+    return next(r for r in resultados if r.campo == campo)
+
+def test_interpretar_correcao():
+    assert interpretar_correcao("Acho que o Wi-Fi deveria ser PASS. Motivo: 6GHz é aceito") == [
+        ("WIFI", "PASS", "6GHz é aceito")
+    ]
+    assert interpretar_correcao("nfc deveria dar fail; rede deveria ter dado pass") == [
+        ("NFC", "FAIL", None), ("REDE", "PASS", None)
+    ]
+    assert interpretar_correcao("tudo certo") == []
+
+def test_campo_com_versao_antes_de_deveria():
+    assert interpretar_correcao("O Bluetooth 5.0 deveria ser PASS") == [("BLUETOOTH", "PASS", None)]
+    assert interpretar_correcao("A versão do Android 14 deveria ser FAIL") == [("VERSAO_ANDROID", "FAIL", None)]
+
+def test_muitos_valores_antes_de_deveria_nao_travam():
+    assert interpretar_correcao("Bluetooth " + " ".join(["5.0"] * 500) + " x deveria ser PASS") == []
+
+def test_sim_como_resposta_nao_e_o_campo_sim():
+    assert interpretar_correcao("Acho que sim deveria ser PASS") == []
+    assert interpretar_correcao("O SIM deveria ser PASS") == [("SIM", "PASS", None)]
+    assert interpretar_correcao("Sim: deveria ser FAIL") == [("SIM", "FAIL", None)]
+
+def test_correcao_muda_o_veredito_do_mesmo_valor(banco, input_valido):
+    input_valido["WiFi"] = "6GHz"
+    correcoes = CacheCorrecoes()
+    assert correcoes.registrar(_feedback(banco, input_valido, "WiFi deveria ser PASS")) == 1
+
+    resultados, cobertos = correcoes.aplicar(avaliar_campos(banco, input_valido), IndiceBanco(banco))
+    assert cobertos == {"WIFI"}
+    assert _status(resultados, "WIFI").status == "PASS"
+    assert _status(resultados, "WIFI").origem == ORIGEM_CORRECAO
+
+    input_valido["WiFi"] = "7GHz" # Outro valor: a correção não se aplica
+    resultados, cobertos = correcoes.aplicar(avaliar_campos(banco, input_valido), banco)
+    assert cobertos == set()
+    assert _status(resultados, "WIFI").status == "FAIL"
+
+def test_correcoes_carregadas_do_registro_de_feedback(tmp_path, banco, input_valido):
+    registro = RegistroFeedback(str(tmp_path / "feedback.db"), migrar_de=None)
+    registro.adicionar(_feedback(banco, input_valido, "NFC deveria ser FAIL. Motivo: sem antena"))
+    registro.adicionar(dict(_feedback(banco, input_valido, "SIM deveria ser FAIL"), tipo="sugestao"))
+    correcoes = CacheCorrecoes(registro)
+    assert len(correcoes) == 1
+
+    resultados, _ = correcoes.aplicar(avaliar_campos(banco, input_valido), banco)
+    assert _status(resultados, "NFC").status == "FAIL"
+    assert _status(resultados, "NFC").esperado == "sem antena"
+    assert _status(resultados, "SIM").status == "PASS"
+
+def test_correcao_deixa_de_valer_quando_o_hardware_muda_no_banco(banco, input_valido):
+    input_valido["WiFi"] = "6GHz"
+    correcoes = CacheCorrecoes()
+    correcoes.registrar(_feedback(banco, input_valido, "WiFi deveria ser PASS"))
+
+    banco["Hardware_A"]["Tecnologias_suportadas"]["NFC"] = False # Outro hardware: a correção continua valendo
+    resultados, _ = correcoes.aplicar(avaliar_campos(banco, input_valido), banco)
+    assert _status(resultados, "WIFI").status == "PASS"
+
+    banco["Hardware_B"]["Tecnologias_suportadas"]["WiFi"] = ["2.4GHz"]
+    resultados, cobertos = correcoes.aplicar(avaliar_campos(banco, input_valido), banco)
+    assert cobertos == set()
+    assert _status(resultados, "WIFI").status == "FAIL"
+    assert _status(resultados, "WIFI").origem != ORIGEM_CORRECAO
+
+def test_feedback_antigo_sem_impressao_continua_valendo(banco, input_valido):
+    correcoes = CacheCorrecoes()
+    correcoes.registrar(_feedback(banco, input_valido, "NFC deveria ser FAIL. Motivo: sem antena", com_impressao=False))
+    banco["Hardware_B"]["Androids_disponiveis"].append("Android 16")
+    resultados, _ = correcoes.aplicar(avaliar_campos(banco, input_valido), banco)
+    assert _status(resultados, "NFC").status == "FAIL"
+    assert _status(resultados, "NFC").esperado == "sem antena"
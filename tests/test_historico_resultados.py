@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from historico_resultados import HistoricoResultados, main
+from indice_banco import IndiceBanco
+from validador_lote import validar_input
+
+ANTIGA = "aaaa1111" + "0" * 56
+NOVA = "bbbb2222" + "0" * 56
+
+@pytest.fixture
+def historico(tmp_path):
+    return HistoricoResultados(str(tmp_path / "historico.db"))
+
+def _registros(banco, inputs):
+    indice = IndiceBanco(banco)
+    return [validar_input(indice, nome, json.dumps(input_json).encode("utf-8")) for nome, input_json in inputs]
+
+def test_consulta_por_hardware_regiao_status_e_campo(historico, banco, input_valido):
+    inputs = [
+        ("b.json", input_valido),
+        ("b_rede.json", dict(input_valido, Rede="2G")),
+        ("b_brasil.json", dict(input_valido, Regiao_Execucao="Brazil", Software="TMAUL-VS4")),
+        ("a.json", dict(input_valido, Hardware="Hardware_A", Software="TREVAN-VS1")),
+    ]
+    registros = _registros(banco, inputs) + [validar_input(banco, "quebrado.json", b"{")]
+    historico.registrar(registros, ANTIGA, "teste")
+
+    assert [r["arquivo"] for r in historico.consultar(hardware="Hardware_B")] == ["b_brasil.json", "b_rede.json", "b.json"]
+    assert [r["arquivo"] for r in historico.consultar(regiao="Brazil")] == ["b_brasil.json"]
+    assert [r["arquivo"] for r in historico.consultar(status="FAIL", campo="REDE")] == ["b_rede.json"]
+    assert [r["arquivo"] for r in historico.consultar(status="ERRO")] == ["quebrado.json"]
+    assert [r["arquivo"] for r in historico.consultar(status="PASS")] == ["b_brasil.json", "b.json"]
+    assert list(historico.consultar(desde="2000-01-01", ate="2000-12-31")) == []
+    assert len(list(historico.consultar(impressao="aaaa", limite=2))) == 2
+
+    rede = next(historico.consultar(arquivo="b_rede.json"))
+    campos = historico.campos(rede["id"])
+    assert [c["campo"] for c in campos][:2] == ["HARDWARE", "SOFTWARE"]
+    assert {c["campo"]: c["status"] for c in campos}["REDE"] == "FAIL"
+
+def test_mudancas_entre_versoes_do_banco(historico, banco, input_valido):
+    inputs = [("b.json", input_valido), ("a.json", dict(input_valido, Hardware="Hardware_A", Software="TREVAN-VS1"))]
+    historico.registrar(_registros(banco, inputs), ANTIGA, "teste")
+    banco["Hardware_B"]["Tecnologias_suportadas"]["SIM"] = "eSIM"
+    historico.registrar(_registros(banco, inputs), NOVA, "teste")
+
+    mudancas = historico.mudancas("aaaa", "bbbb")
+    assert [(m["arquivo"], m["falhas_antes"], m["falhas_depois"]) for m in mudancas] == [("b.json", "", "SIM")]
+
+def test_versao_atual_depois_de_voltar_o_banco(historico, banco, input_valido):
+    # Regressão: com a ordem pela primeira execução, voltar para uma versão antiga não a tornava a atual
+    historico.registrar(_registros(banco, [("b.json", input_valido)]), ANTIGA, "teste")
+    historico.registrar(_registros(banco, [("b.json", dict(input_valido, Rede="2G"))]), NOVA, "teste")
+    historico.registrar(_registros(banco, [("b.json", input_valido)]), ANTIGA, "teste")
+    assert [v["impressao"] for v in historico.versoes()] == [NOVA, ANTIGA]
+    assert [v["execucoes"] for v in historico.versoes()] == [1, 2]
+
+def test_prefixo_ambiguo_ou_desconhecido(historico, banco, input_valido):
+    registros = _registros(banco, [("b.json", input_valido)])
+    historico.registrar(registros, ANTIGA, "teste")
+    historico.registrar(registros, "aaaa9999" + "0" * 56, "teste")
+    assert historico.resolver_impressao("aaaa1") == ANTIGA
+    with pytest.raises(ValueError, match="2 versões"):
+        historico.resolver_impressao("aaaa")
+    with pytest.raises(ValueError, match="nenhuma versão"):
+        historico.resolver_impressao("ffff")
+
+def test_cli_mudancas_usa_as_duas_ultimas_versoes(historico, banco, input_valido, capsys):
+    historico.registrar(_registros(banco, [("b.json", input_valido)]), ANTIGA, "teste")
+    assert main(["--historico", historico.caminho, "mudancas"]) == 2
+    historico.registrar(_registros(banco, [("b.json", dict(input_valido, Rede="2G"))]), NOVA, "teste")
+    capsys.readouterr()
+    assert main(["--historico", historico.caminho, "--json", "mudancas"]) == 0
+    assert [m["arquivo"] for m in json.loads(capsys.readouterr().out)] == []
+    assert main(["--historico", historico.caminho, "consultar", "--banco", "zzzz"]) == 2
@@ -0,0 +1,70 @@
+import json
+import zipfile
+
+import pytest
+
+from conftest import INPUTS_REAIS
+from indice_banco import IndiceBanco
+from motor_regras import CAMPOS_RESULTADO, avaliar_campos, validar_estrutura_input
+
+def _status(banco, input_json):
+    return {campo: status for campo, status, *_ in avaliar_campos(banco, input_json)}
+
+def _falhas(banco, input_json):
+    return [campo for campo, status in _status(banco, input_json).items() if status == "FAIL"]
+
+def test_input_valido_passa_em_todos_os_campos(banco, input_valido):
+    assert list(_status(banco, input_valido)) == CAMPOS_RESULTADO
+    assert _falhas(banco, input_valido) == []
+
+def test_dicionario_e_indice_dao_o_mesmo_resultado(banco, input_valido):
+    input_valido["Rede"] = "3G"
+    input_valido["Hardware"] = "Hardware_C"
+    assert avaliar_campos(banco, input_valido) == avaliar_campos(IndiceBanco(banco), input_valido)
+
+def test_inputs_de_exemplo_batem_com_as_pastas(banco):
+    with zipfile.ZipFile(INPUTS_REAIS) as arquivo:
+        nomes = [nome for nome in arquivo.namelist() if nome.endswith(".json")]
+        assert nomes
+        for nome in nomes:
+            reprovados = _falhas(banco, json.loads(arquivo.read(nome)))
+            assert bool(reprovados) == ("/Inputs_Invalidos" in nome), (nome, reprovados)
+
+def test_hardware_desconhecido_reprova_os_campos_dependentes(banco, input_valido):
+    input_valido["Hardware"] = "Hardware_Z"
+    status = _status(banco, input_valido)
+    assert status["HARDWARE"] == "FAIL"
+    assert status["SOFTWARE"] == "FAIL"
+
+@pytest.mark.parametrize("versao, esperado", [("5.0", "PASS"), ("5.3", "PASS"), ("4.2", "FAIL"), ("", "FAIL")])
+def test_bluetooth_minimo(banco, input_valido, versao, esperado):
+    input_valido["Bluetooth"] = versao
+    assert _status(banco, input_valido)["BLUETOOTH"] == esperado
+
+@pytest.mark.parametrize("nfc, esperado", [(True, "PASS"), (False, "FAIL"), ("true", "FAIL")])
+def test_nfc_comparacao_exata(banco, input_valido, nfc, esperado):
+    input_valido["NFC"] = nfc
+    assert _status(banco, input_valido)["NFC"] == esperado
+
+@pytest.mark.parametrize("chave, campo", [("WiFi", "WIFI"), ("Rede", "REDE"), ("SIM", "SIM"),
+                                          ("Versao_Android", "VERSAO_ANDROID")])
+def test_lista_vazia_reprova(banco, input_valido, chave, campo):
+    # Nenhuma opção informada: o conjunto vazio não pode passar como subconjunto das opções do banco
+    input_valido[chave] = []
+    assert _status(banco, input_valido)[campo] == "FAIL"
+
+def test_relacao_software_regiao_em_dicionario(banco, input_valido):
+    input_valido["Regiao_Execucao"] = "Brazil" # TMAUL-VS1 não está na lista do Brazil
+    assert _status(banco, input_valido)["RELAÇÃO_SOFTWARE_REGIAO"] == "FAIL"
+
+def test_relacao_software_regiao_em_lista(banco, input_valido):
+    banco["Hardware_B"]["Regioes"] = ["Brazil", "USA"] # Lista: basta a região existir
+    input_valido["Regiao_Execucao"] = "Brazil"
+    assert _status(banco, input_valido)["RELAÇÃO_SOFTWARE_REGIAO"] == "PASS"
+    input_valido["Regiao_Execucao"] = "Germany"
+    assert _status(banco, input_valido)["RELAÇÃO_SOFTWARE_REGIAO"] == "FAIL"
+
+def test_estrutura_incompleta(input_valido):
+    del input_valido["SIM"]
+    with pytest.raises(ValueError, match="SIM"):
+        validar_estrutura_input(input_valido)
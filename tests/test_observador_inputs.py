@@ -0,0 +1,84 @@
+import pytest
+
+from conftest import gravar_json
+from historico_resultados import HistoricoResultados
+from observador_inputs import ObservadorInputs, main, observar
+
+@pytest.fixture
+def pasta(tmp_path, input_valido):
+    pasta = tmp_path / "inputs"
+    pasta.mkdir()
+    gravar_json(str(pasta / "b.json"), input_valido)
+    gravar_json(str(pasta / "a.json"), dict(input_valido, Hardware="Hardware_A", Software="TREVAN-VS1"))
+    return pasta
+
+def _nomes(mudancas):
+    return [caminho.rsplit("/", 1)[-1] for caminho, _ in mudancas]
+
+def test_so_revalida_o_que_mudou(pasta, caminho_banco, input_valido):
+    observador = ObservadorInputs([str(pasta)], caminho_banco)
+    assert _nomes(observador.verificar()) == ["a.json", "b.json"]
+    assert observador.verificar() == []
+
+    gravar_json(str(pasta / "b.json"), input_valido) # Salvo de novo sem mudar o conteúdo
+    assert observador.verificar() == []
+
+    gravar_json(str(pasta / "b.json"), dict(input_valido, Rede="2G"))
+    mudancas = observador.verificar()
+    assert _nomes(mudancas) == ["b.json"]
+    assert mudancas[0][1]["falhas"] == ["REDE"]
+
+    (pasta / "a.json").unlink()
+    assert observador.verificar() == [(str(pasta / "a.json"), None)]
+
+def test_mudanca_no_banco_revalida_so_o_hardware_afetado(pasta, caminho_banco, banco):
+    observador = ObservadorInputs([str(pasta)], caminho_banco)
+    observador.verificar()
+    banco["Hardware_B"]["Tecnologias_suportadas"]["Rede"] = ["4G", "5G"]
+    gravar_json(caminho_banco, banco)
+    mudancas = observador.verificar()
+    assert _nomes(mudancas) == ["b.json"]
+    assert mudancas[0][1]["falhas"] == ["REDE"]
+
+def test_hardware_fora_do_formato_com_mudanca_no_banco(pasta, caminho_banco, banco, input_valido):
+    # Regressão: um hardware em lista ia para o manifesto e o "in" do conjunto de alterados dava TypeError
+    gravar_json(str(pasta / "lista.json"), dict(input_valido, Hardware=["Hardware_B"]))
+    observador = ObservadorInputs([str(pasta)], caminho_banco)
+    observador.verificar()
+    banco["Hardware_F"] = banco["Hardware_B"] # Nova lista de nomes: hardwares desconhecidos são revalidados
+    gravar_json(caminho_banco, banco)
+    mudancas = observador.verificar()
+    assert _nomes(mudancas) == ["lista.json"]
+    assert "HARDWARE" in mudancas[0][1]["falhas"]
+
+def test_banco_ilegivel_mantem_a_versao_anterior(pasta, caminho_banco, banco, input_valido, capsys):
+    observador = ObservadorInputs([str(pasta)], caminho_banco)
+    observador.verificar()
+    with open(caminho_banco, "w", encoding="utf-8") as f:
+        f.write('{"Hardware_A": {') # Salvo pela metade
+    gravar_json(str(pasta / "b.json"), dict(input_valido, Rede="2G"))
+    assert _nomes(observador.verificar()) == ["b.json"]
+    assert observador.verificar() == []
+    assert capsys.readouterr().err.count("banco de dados ilegível") == 1 # Avisa uma vez só
+
+    banco["Hardware_A"]["Tecnologias_suportadas"]["NFC"] = False
+    gravar_json(caminho_banco, banco)
+    assert _nomes(observador.verificar()) == ["a.json"]
+
+def test_banco_ilegivel_na_primeira_leitura(pasta, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path) # O histórico padrão da linha de comando fica na pasta temporária
+    caminho_banco = tmp_path / "quebrado.json"
+    caminho_banco.write_text("{", encoding="utf-8")
+    with pytest.raises(ValueError):
+        ObservadorInputs([str(pasta)], str(caminho_banco)).verificar()
+    assert main([str(pasta), "--banco", str(caminho_banco), "--sem-correcoes"]) == 2
+    assert "Erro ao ler banco de dados" in capsys.readouterr().err
+
+def test_rodadas_com_mudancas_vao_para_o_historico(pasta, caminho_banco, tmp_path, input_valido):
+    historico = HistoricoResultados(str(tmp_path / "historico.db"))
+    observador = ObservadorInputs([str(pasta)], caminho_banco, historico=historico)
+    observar(observador, str(tmp_path / "saida.json"), intervalo=0, rodadas=1)
+    gravar_json(str(pasta / "b.json"), dict(input_valido, Rede="2G"))
+    observar(observador, str(tmp_path / "saida.json"), intervalo=0, rodadas=2)
+    assert [e["total"] for e in historico.execucoes()] == [1, 2]
+    assert [r["falhas"] for r in historico.consultar(hardware="Hardware_B")] == ["REDE", ""]
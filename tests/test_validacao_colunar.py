@@ -0,0 +1,49 @@
+import pytest
+
+from conftest import INPUTS_REAIS
+from gerador_sintetico import gerar_catalogo, gerar_inputs
+from indice_banco import IndiceBanco
+from motor_regras import avaliar_campos
+from validacao_colunar import NUMPY_DISPONIVEL, avaliar_colunar
+from validador_lote import iterar_inputs, validar_todos
+
+pytestmark = pytest.mark.skipif(not NUMPY_DISPONIVEL, reason="NumPy não instalado")
+
+# Inputs fora do formato esperado: os dois motores precisam reprovar exatamente os mesmos campos
+INPUTS_ESTRANHOS = [
+    {"Hardware": ["Hardware_B"], "Software": "TMAUL-VS1", "Regiao_Execucao": "USA"},
+    {"Hardware": "Hardware_B", "Software": None, "Regiao_Execucao": 3, "NFC": "true", "Bluetooth": 5},
+    {"Hardware": "Hardware_B", "Software": "TMAUL-VS1", "Regiao_Execucao": "USA", "WiFi": ["2.4GHz", "5GHz"],
+     "Rede": "4G, 5G", "SIM": "dual sim", "Versao_Android": "Android 16", "Bluetooth": "5.3"},
+    {"Hardware": "Hardware_B", "Software": "TMAUL-VS1", "Regiao_Execucao": "USA", "WiFi": "6GHz",
+     "Rede": [], "SIM": {"tipo": "Dual SIM"}, "Versao_Android": None, "NFC": 1},
+    {"Hardware": "Hardware_B", "Software": "TMAUL-VS1", "Regiao_Execucao": "USA", "WiFi": [], "Rede": [],
+     "SIM": [], "Versao_Android": []},
+    {},
+]
+
+def _por_linha(indice, inputs):
+    return [[r.status == "PASS" for r in avaliar_campos(indice, input_json)] for input_json in inputs]
+
+def test_colunar_igual_ao_motor_de_regras_no_banco_real(banco, input_valido):
+    indice = IndiceBanco(banco)
+    inputs = [input_valido] + [dict(input_valido, **estranho) for estranho in INPUTS_ESTRANHOS] + INPUTS_ESTRANHOS
+    assert avaliar_colunar(indice, inputs).tolist() == _por_linha(indice, inputs)
+
+@pytest.mark.parametrize("semente", [0, 1, 2])
+def test_colunar_igual_ao_motor_de_regras_em_dados_sinteticos(semente):
+    catalogo = gerar_catalogo(hardwares=40, regioes=15, softwares_por_hardware=6, regioes_por_hardware=4,
+                              fracao_lista=0.3, semente=semente)
+    inputs = [input_json for _, input_json in gerar_inputs(catalogo, 600, semente=semente)]
+    indice = IndiceBanco(catalogo)
+    matriz = avaliar_colunar(indice, inputs)
+    assert matriz.shape == (len(inputs), 9)
+    assert matriz.tolist() == _por_linha(indice, inputs)
+
+def test_validar_todos_igual_com_e_sem_colunar(banco):
+    indice = IndiceBanco(banco)
+    itens = list(iterar_inputs([INPUTS_REAIS]))
+    por_linha = validar_todos(indice, itens, colunar=False)
+    colunar = validar_todos(indice, itens, colunar=True)
+    campos = ("arquivo", "erro", "valido", "falhas", "resultado", "hash")
+    assert [{c: r.get(c) for c in campos} for r in colunar] == [{c: r.get(c) for c in campos} for r in por_linha]
@@ -0,0 +1,82 @@
+import io
+import json
+import tarfile
+import zipfile
+
+import pytest
+
+from conftest import INPUTS_REAIS
+from gerador_sintetico import gerar_catalogo, gerar_inputs, gravar_conjunto
+from indice_banco import obter_indice
+from validador_lote import iterar_inputs, main, validar_em_processos, validar_todos
+
+CAMPOS = ("arquivo", "erro", "valido", "falhas", "resultado", "hash")
+
+@pytest.fixture(autouse=True)
+def pasta_de_trabalho(tmp_path, monkeypatch):
+    # Arquivos com caminho padrão (resultados, cache, histórico...) ficam na pasta temporária
+    monkeypatch.chdir(tmp_path)
+
+def _comparaveis(registros):
+    return [{campo: registro.get(campo) for campo in CAMPOS} for registro in registros]
+
+def test_iterar_inputs_em_pasta_zip_e_tar(tmp_path, input_valido):
+    conteudo = json.dumps(input_valido).encode("utf-8")
+    (tmp_path / "pasta" / "sub").mkdir(parents=True)
+    (tmp_path / "pasta" / "sub" / "a.json").write_bytes(conteudo)
+    (tmp_path / "pasta" / "leiame.txt").write_text("ignorado")
+    with zipfile.ZipFile(tmp_path / "inputs.zip", "w") as arquivo:
+        arquivo.writestr("x/b.json", conteudo)
+        arquivo.writestr("x/", "")
+    with tarfile.open(tmp_path / "inputs.tar.gz", "w:gz") as arquivo:
+        membro = tarfile.TarInfo("y/c.json")
+        membro.size = len(conteudo)
+        arquivo.addfile(membro, io.BytesIO(conteudo))
+
+    itens = list(iterar_inputs([str(tmp_path / "pasta"), str(tmp_path / "inputs.zip"), str(tmp_path / "inputs.tar.gz")]))
+    assert [nome.rsplit("/", 1)[-1] for nome, _ in itens] == ["a.json", "b.json", "c.json"]
+    assert all(dados == conteudo for _, dados in itens)
+
+@pytest.mark.parametrize("colunar", [False, True])
+def test_processos_igual_a_um_processo(tmp_path, monkeypatch, colunar):
+    if colunar:
+        pytest.importorskip("numpy")
+    catalogo = gerar_catalogo(hardwares=30, regioes=10, softwares_por_hardware=5, regioes_por_hardware=3)
+    caminho_banco, caminho_inputs = gravar_conjunto(str(tmp_path), catalogo, gerar_inputs(catalogo, 300), compactar=True)
+    # Blocos pequenos: exercita a leitura em vários blocos com fatias pendentes entre eles
+    monkeypatch.setattr("validador_lote.ITENS_POR_BLOCO", 70)
+    itens = list(iterar_inputs([caminho_inputs])) + [("quebrado.json", b"{")]
+
+    esperado = validar_todos(obter_indice(caminho_banco), itens, colunar=colunar)
+    em_processos = validar_em_processos(caminho_banco, iter(itens), processos=3, colunar=colunar, para_ia=False)
+    assert _comparaveis(em_processos) == _comparaveis(esperado)
+    assert "campos" not in em_processos[0]
+
+def test_main_com_inputs_de_exemplo(tmp_path, caminho_banco, capsys):
+    saida = tmp_path / "resultados.json"
+    assert main([INPUTS_REAIS, "--banco", caminho_banco, "--saida", str(saida)]) == 0
+    dados = json.loads(saida.read_text(encoding="utf-8"))
+    assert (dados["total"], dados["validos"], dados["erros"]) == (51, 24, 0)
+    assert "51 inputs, 24 válidos" in capsys.readouterr().out
+
+def test_main_com_input_ilegivel(tmp_path, caminho_banco):
+    (tmp_path / "quebrado.json").write_text("{", encoding="utf-8")
+    saida = tmp_path / "resultados.json"
+    assert main([str(tmp_path / "quebrado.json"), "--banco", caminho_banco, "--saida", str(saida)]) == 1
+    registro = json.loads(saida.read_text(encoding="utf-8"))["resultados"][0]
+    assert registro["erro"].startswith("Erro ao ler arquivo JSON")
+
+def test_main_com_banco_ilegivel(tmp_path, capsys):
+    banco = tmp_path / "software_db.json"
+    banco.write_text('{"Hardware_A": ', encoding="utf-8")
+    assert main([INPUTS_REAIS, "--banco", str(banco), "--saida", str(tmp_path / "saida.json")]) == 2
+    assert "Erro ao ler banco de dados" in capsys.readouterr().err
+    assert not (tmp_path / "saida.json").exists()
+
+def test_main_com_zip_corrompido(tmp_path, caminho_banco, capsys):
+    corrompido = tmp_path / "inputs.zip"
+    with zipfile.ZipFile(corrompido, "w") as arquivo:
+        arquivo.writestr("a.json", "{}" * 100)
+    corrompido.write_bytes(corrompido.read_bytes().replace(b"{}{}", b"[][]", 1)) # CRC do membro não confere
+    assert main([str(corrompido), "--banco", caminho_banco, "--saida", str(tmp_path / "saida.json")]) == 2
+    assert "Erro ao ler os inputs" in capsys.readouterr().err
@@ -0,0 +1,195 @@
+import threading
+
+from indice_banco import versao_numerica
+from motor_regras import CAMPOS_RESULTADO
+
+try:
+    import numpy as np # Opcional: sem o NumPy, o modo em lote valida um input por vez (motor_regras.avaliar_campos)
+except ImportError:
+    np = None
+
+# Validação colunar para conjuntos grandes de inputs: em vez de aplicar as regras a um dicionário por vez,
+# os inputs viram colunas de códigos inteiros (Hardware, Software, Regiao_Execucao, WiFi, Rede, SIM...)
+# e cada regra é avaliada de uma vez para todos, como uma máscara do NumPy, contra tabelas de consulta
+# compiladas a partir do índice do banco. O resultado é uma matriz PASS/FAIL (inputs x CAMPOS_RESULTADO)
+# com as mesmas decisões de avaliar_campos.
+#
+# Relações do tipo "valor aceito pelo hardware" são guardadas como chaves inteiras ordenadas
+# (hardware * tamanho do vocabulário + valor) e testadas com np.isin, sem matrizes densas hardware x valor.
+
+NUMPY_DISPONIVEL = np is not None
+LIMIAR_COLUNAR = 5000 # A partir de quantos inputs o modo em lote usa a validação colunar, se o NumPy existir
+
+# Campos de opções (todas as opções do input precisam existir no banco, sem diferenciar maiúsculas)
+CAMPOS_OPCOES = {"VERSAO_ANDROID": "Versao_Android", "WIFI": "WiFi", "SIM": "SIM", "REDE": "Rede"}
+
+def _codificar(vocabulario, valor):
+    # Código do valor, criando um novo se ainda não existir (só durante a compilação das tabelas)
+    return vocabulario.setdefault(valor, len(vocabulario))
+
+def _chaves(pares, tamanho_vocabulario):
+    """Pares (hardware, código) viram chaves inteiras únicas e ordenadas, prontas para np.isin."""
+    if not pares:
+        return np.empty(0, dtype=np.int64)
+    pares = np.array(pares, dtype=np.int64)
+    return np.unique(pares[:, 0] * tamanho_vocabulario + pares[:, 1])
+
+# Tabelas de consulta compiladas uma vez por versão do banco
+class TabelasColunares:
+    def __init__(self, indice):
+        self.impressao_digital = indice.impressao_digital
+        self.hardwares = {nome: codigo for codigo, nome in enumerate(indice.hardwares)}
+        self.softwares = {}
+        self.regioes = {}
+        self.opcoes = {campo: {} for campo in CAMPOS_OPCOES} # Valores normalizados (normalizar_opcoes)
+        self.bluetooth = {} # Valores exatos de Bluetooth, já sem espaços e em minúsculas
+
+        total = len(self.hardwares)
+        pares_software, pares_regiao_lista, triplas_regiao = [], [], []
+        pares_opcoes = {campo: [] for campo in CAMPOS_OPCOES}
+        self.tem_opcoes = {campo: np.zeros(total, dtype=bool) for campo in CAMPOS_OPCOES}
+        self.nfc = np.full(total, -2, dtype=np.int8) # 1 = true, 0 = false, -2 = nenhum valor aceito
+        self.bluetooth_minimo = np.full(total, np.nan)
+        self.bluetooth_exato = np.full(total, -2, dtype=np.int64)
+
+        for h, hw in enumerate(indice.hardwares.values()):
+            pares_software.extend((h, _codificar(self.softwares, sw)) for sw in hw.softwares)
+            for regiao, softwares in hw.regioes.items():
+                r = _codificar(self.regioes, regiao)
+                if softwares is None: # Regioes como lista: qualquer software
+                    pares_regiao_lista.append((h, r))
+                else:
+                    triplas_regiao.extend((h, r, _codificar(self.softwares, sw)) for sw in softwares)
+
+            opcoes_hw = {"VERSAO_ANDROID": hw.androids or None, "WIFI": hw.wifi, "SIM": hw.sim, "REDE": hw.rede}
+            for campo, opcoes in opcoes_hw.items():
+                if opcoes is not None:
+                    self.tem_opcoes[campo][h] = True
+                    pares_opcoes[campo].extend((h, _codificar(self.opcoes[campo], o)) for o in opcoes)
+
+            # Mesma comparação de _validar_nfc (valor_input == valor_db), inclusive para 0/1 no banco
+            if isinstance(hw.nfc, (bool, int, float)) and hw.nfc in (0, 1):
+                self.nfc[h] = int(hw.nfc)
+            if hw.bluetooth_minimo is not None:
+                self.bluetooth_minimo[h] = hw.bluetooth_minimo
+            elif hw.bluetooth_exato is not None:
+                self.bluetooth_exato[h] = _codificar(self.bluetooth, hw.bluetooth_exato)
+
+        self.chaves_software = _chaves(pares_software, len(self.softwares))
+        self.chaves_regiao_lista = _chaves(pares_regiao_lista, len(self.regioes))
+        if triplas_regiao:
+            triplas = np.array(triplas_regiao, dtype=np.int64)
+            pares = triplas[:, 0] * len(self.regioes) + triplas[:, 1]
+            self.chaves_regiao_software = np.unique(pares * len(self.softwares) + triplas[:, 2])
+        else:
+            self.chaves_regiao_software = np.empty(0, dtype=np.int64)
+        self.chaves_opcoes = {campo: _chaves(pares_opcoes[campo], len(self.opcoes[campo])) for campo in CAMPOS_OPCOES}
+
+_tabelas = None
+_lock = threading.Lock()
+
+def obter_tabelas(indice):
+    """Tabelas do índice, recompiladas só quando o banco muda (mesma impressão digital do IndiceBanco)."""
+    global _tabelas
+    with _lock:
+        if _tabelas is None or _tabelas.impressao_digital != indice.impressao_digital:
+            _tabelas = TabelasColunares(indice)
+        return _tabelas
+
+# Colunas dos inputs: um código inteiro por input e por campo (-1 para valores que o banco não conhece)
+class ColunasInputs:
+    def __init__(self, tabelas, inputs):
+        self.total = len(inputs)
+        hardwares, softwares, regioes = [], [], []
+        nfc, bluetooth_numero, bluetooth_codigo = [], [], []
+        itens = {campo: ([], []) for campo in CAMPOS_OPCOES} # Campos com listas: (linha, código) por item
+        self.nulos = {campo: np.zeros(self.total, dtype=bool) for campo in CAMPOS_OPCOES}
+
+        def exato(vocabulario, valor):
+            return vocabulario.get(valor, -1) if isinstance(valor, str) else -1
+
+        for linha, input_json in enumerate(inputs):
+            hardwares.append(exato(tabelas.hardwares, input_json.get("Hardware")))
+            softwares.append(exato(tabelas.softwares, input_json.get("Software")))
+            regioes.append(exato(tabelas.regioes, input_json.get("Regiao_Execucao")))
+
+            valor_nfc = input_json.get("NFC")
+            nfc.append(int(valor_nfc) if isinstance(valor_nfc, bool) else -1)
+
+            valor_bluetooth = input_json.get("Bluetooth")
+            if isinstance(valor_bluetooth, str):
+                versao = versao_numerica(valor_bluetooth)
+                bluetooth_numero.append(np.nan if versao is None else versao)
+                bluetooth_codigo.append(tabelas.bluetooth.get(valor_bluetooth.strip().casefold(), -1))
+            else:
+                bluetooth_numero.append(np.nan)
+                bluetooth_codigo.append(-1)
+
+            for campo, chave in CAMPOS_OPCOES.items():
+                valor = input_json.get(chave)
+                if valor is None:
+                    self.nulos[campo][linha] = True
+                    continue
+                linhas, codigos = itens[campo]
+                vocabulario = tabelas.opcoes[campo]
+                for item in (valor if isinstance(valor, list) else [valor]):
+                    linhas.append(linha)
+                    codigos.append(vocabulario.get(str(item).strip().casefold(), -1))
+
+        self.hardware = np.array(hardwares, dtype=np.int64)
+        self.software = np.array(softwares, dtype=np.int64)
+        self.regiao = np.array(regioes, dtype=np.int64)
+        self.nfc = np.array(nfc, dtype=np.int8)
+        self.bluetooth_numero = np.array(bluetooth_numero, dtype=float)
+        self.bluetooth_codigo = np.array(bluetooth_codigo, dtype=np.int64)
+        self.itens = {campo: (np.array(linhas, dtype=np.int64), np.array(codigos, dtype=np.int64))
+                      for campo, (linhas, codigos) in itens.items()}
+
+def _contido(tabelas, colunas, campo, existe, hw):
+    # Todas as opções do input no conjunto aceito pelo hardware: cada item é testado e a linha só passa
+    # se todos os seus itens passarem (np.logical_and.at agrupa os itens por linha).
+    # Linhas sem nenhum item (lista vazia) falham, como em motor_regras._validar_opcoes
+    linhas, codigos = colunas.itens[campo]
+    tamanho = len(tabelas.opcoes[campo])
+    hw_item = hw[linhas]
+    item_aceito = (codigos >= 0) & np.isin(hw_item * tamanho + codigos, tabelas.chaves_opcoes[campo])
+    aceito = np.ones(colunas.total, dtype=bool)
+    np.logical_and.at(aceito, linhas, item_aceito)
+    tem_itens = np.bincount(linhas, minlength=colunas.total) > 0
+    return aceito & tem_itens & existe & ~colunas.nulos[campo] & tabelas.tem_opcoes[campo][hw]
+
+def avaliar_colunar(indice, inputs):
+    """Matriz booleana (len(inputs) x len(CAMPOS_RESULTADO)): True onde o campo passou, na ordem de CAMPOS_RESULTADO."""
+    tabelas = obter_tabelas(indice)
+    colunas = ColunasInputs(tabelas, inputs)
+    existe = colunas.hardware >= 0
+    hw = np.where(existe, colunas.hardware, 0) # Código válido para indexar; as linhas sem hardware já falham em existe
+
+    software = existe & (colunas.software >= 0) & np.isin(
+        hw * len(tabelas.softwares) + colunas.software, tabelas.chaves_software
+    )
+    par_regiao = hw * len(tabelas.regioes) + colunas.regiao
+    regiao_lista = np.isin(par_regiao, tabelas.chaves_regiao_lista)
+    regiao_software = (colunas.software >= 0) & np.isin(
+        par_regiao * len(tabelas.softwares) + colunas.software, tabelas.chaves_regiao_software
+    )
+    relacao = existe & (colunas.regiao >= 0) & (regiao_lista | regiao_software)
+
+    nfc = existe & (colunas.nfc >= 0) & (colunas.nfc == tabelas.nfc[hw])
+    minimo = tabelas.bluetooth_minimo[hw]
+    bluetooth = existe & np.where(
+        np.isnan(minimo),
+        (colunas.bluetooth_codigo >= 0) & (colunas.bluetooth_codigo == tabelas.bluetooth_exato[hw]),
+        colunas.bluetooth_numero >= minimo # NaN (sem versão no input) nunca é >= mínimo
+    )
+
+    por_campo = {
+        "HARDWARE": existe,
+        "SOFTWARE": software,
+        "RELAÇÃO_SOFTWARE_REGIAO": relacao,
+        "NFC": nfc,
+        "BLUETOOTH": bluetooth,
+    }
+    for campo in CAMPOS_OPCOES:
+        por_campo[campo] = _contido(tabelas, colunas, campo, existe, hw)
+    return np.column_stack([por_campo[campo] for campo in CAMPOS_RESULTADO])
@@ -0,0 +1,510 @@
+import argparse # Leitura dos argumentos da linha de comando
+import glob # Expansão de padrões como Inputs/**/*.json
+import json # Permite ler, escrever e manipular dados no formato JSON
+import multiprocessing # Validação local em vários processos (um por núcleo)
+import os # Fornece acesso a funções do sistema operacional
+import re # Leitura rápida do hardware de cada input, só para dividir as fatias
+import sys
+import time
+import tarfile # Leitura direta de arquivos .tar (.tar.gz, .tgz...), em sequência
+import zipfile # Leitura dos arquivos de input direto de um .zip (ex: Inputs.zip)
+from collections import deque
+from itertools import chain, islice
+from datetime import datetime # Fornece ferramentas para manipular datas e horários.
+
+from cache_resultados import CACHE_DB_PADRAO, ResultCachePersistente, gerar_chave_cache
+from cliente_deepseek import (
+    MODELO_DEEPSEEK, VERSAO_PROMPT_ANALISE, VERSAO_PROMPT_EXPLICACAO, VERSAO_PROMPT_HIBRIDO, LimitadorTaxa,
+    configurar_cliente, analisar_deepseek, analisar_lote_deepseek, completar_com_deepseek, executar_em_paralelo,
+    explicar_deepseek
+)
+from correcoes import CacheCorrecoes
+from historico_resultados import HISTORICO_DB_PADRAO, MOTOR_COLUNAR, MOTOR_LOCAL, HistoricoResultados, resumo_conteudo
+from indice_banco import BANCO_PADRAO, obter_indice
+from metricas import metricas
+from registro_feedback import FEEDBACK_DB_PADRAO, RegistroFeedback
+from prompts_deepseek import dividir_resposta_lote, relatorio_tokens_lote, relatorio_tokens_prompt
+from motor_regras import rotear_campos, validar_estrutura_input, validar_relacao_software_regiao
+from validacao_colunar import LIMIAR_COLUNAR, NUMPY_DISPONIVEL, avaliar_colunar, obter_tabelas
+from resultados import (
+    ORIGEM_DEEPSEEK, ORIGEM_LOCAL_INCERTO, comparar_resultados, de_json, falhas, formatar_resultados,
+    interpretar_resultados, para_dicionarios, para_json
+)
+
+# Modo em lote (sem interface gráfica): valida todos os inputs de uma pasta, padrão glob ou arquivo .zip
+# e grava um arquivo de resultados. Uso:
+#   python validador_lote.py Inputs.zip
+#   python validador_lote.py Inputs/ "outros/**/*.json" --saida resultados.json
+
+SAIDA_PADRAO = "resultados_lote.json"
+MAX_BYTES_INPUT = 5 * 1024 * 1024 # Inputs maiores que isso são ignorados: limita a memória usada por arquivo
+FATIAS_POR_PROCESSO = 4 # Mais fatias que processos: uma fatia grande não deixa os outros núcleos parados
+ITENS_POR_BLOCO = 20000 # Inputs lidos por vez pelo processo principal na validação em vários processos
+
+# Percorre os caminhos informados e devolve (nome, conteúdo em bytes) de cada arquivo .json encontrado.
+# Arquivos .zip e .tar são lidos membro a membro, direto do arquivo compactado: nada é extraído para o disco
+# e só um input por vez fica na memória. Inputs com mais de MAX_BYTES_INPUT bytes são ignorados com um aviso.
+# A leitura de cada arquivo (e a descompactação) entra na etapa carregar_arquivo das métricas.
+def iterar_inputs(caminhos):
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            arquivos = glob.glob(os.path.join(caminho, "**", "*.json"), recursive=True)
+        elif zipfile.is_zipfile(caminho):
+            yield from _membros_zip(caminho)
+            continue
+        elif os.path.isfile(caminho) and not caminho.lower().endswith(".json") and tarfile.is_tarfile(caminho):
+            yield from _membros_tar(caminho)
+            continue
+        elif os.path.isfile(caminho):
+            arquivos = [caminho]
+        else:
+            # Não é pasta nem arquivo: trata como padrão glob
+            arquivos = glob.glob(caminho, recursive=True)
+
+        for arquivo in sorted(arquivos):
+            with open(arquivo, "rb") as f:
+                conteudo = _ler_limitado(arquivo, f)
+            if conteudo is not None:
+                yield arquivo, conteudo
+
+def _ler_limitado(nome, arquivo):
+    # Lê no máximo MAX_BYTES_INPUT + 1 bytes: o tamanho declarado no arquivo compactado pode não ser o real
+    with metricas.cronometrar("carregar_arquivo"):
+        conteudo = arquivo.read(MAX_BYTES_INPUT + 1)
+    if len(conteudo) > MAX_BYTES_INPUT:
+        print(f"Ignorado (maior que {MAX_BYTES_INPUT} bytes): {nome}", file=sys.stderr)
+        return None
+    return conteudo
+
+def _membros_zip(caminho):
+    with zipfile.ZipFile(caminho) as arquivo_zip:
+        for info in sorted(arquivo_zip.infolist(), key=lambda info: info.filename):
+            if info.is_dir() or not info.filename.lower().endswith(".json"):
+                continue
+            nome = f"{caminho}:{info.filename}"
+            with arquivo_zip.open(info) as membro:
+                conteudo = _ler_limitado(nome, membro)
+            if conteudo is not None:
+                yield nome, conteudo
+
+def _membros_tar(caminho):
+    # Modo "r|*": leitura em sequência (inclusive .tar.gz, .bz2 e .xz), sem voltar no arquivo nem montar
+    # a lista de membros antes; a lista que o tarfile acumula é esvaziada a cada membro
+    with tarfile.open(caminho, "r|*") as arquivo_tar:
+        for info in arquivo_tar:
+            arquivo_tar.members = []
+            if not info.isfile() or not info.name.lower().endswith(".json"):
+                continue
+            nome = f"{caminho}:{info.name}"
+            conteudo = _ler_limitado(nome, arquivo_tar.extractfile(info))
+            if conteudo is not None:
+                yield nome, conteudo
+
+# Executa a mesma sequência da interface gráfica para um único input.
+# correcoes: CacheCorrecoes opcional, com os vereditos corrigidos pelos feedbacks.
+def validar_input(banco, nome, conteudo, correcoes=None):
+    with metricas.cronometrar("validacao_local"):
+        inicio = time.perf_counter()
+        input_json, erro = ler_input(conteudo)
+        registro = {"arquivo": nome, "erro": erro} if erro else montar_registro(banco, nome, input_json, correcoes)
+        registro.update(hash=resumo_conteudo(conteudo), motor=MOTOR_LOCAL,
+                        latencia_ms=(time.perf_counter() - inicio) * 1000)
+        return registro
+
+# Devolve (input, None) ou (None, mensagem de erro) se o conteúdo não for um input válido
+def ler_input(conteudo):
+    try:
+        input_json = json.loads(conteudo.decode("utf-8"))
+        validar_estrutura_input(input_json)
+    except Exception as e:
+        return None, f"Erro ao ler arquivo JSON: {str(e)}"
+    return input_json, None
+
+# aprovados: decisões já tomadas pela validação colunar (uma linha da matriz de avaliar_colunar)
+def montar_registro(banco, nome, input_json, correcoes=None, aprovados=None):
+    registro = {"arquivo": nome, "erro": None}
+    resultados, duvidosos = rotear_campos(banco, input_json, aprovados)
+    if correcoes is not None:
+        resultados, corrigidos = correcoes.aplicar(resultados, banco)
+        duvidosos -= corrigidos
+    registro["hardware"] = input_json["Hardware"]
+    registro["software"] = input_json["Software"]
+    registro["regiao"] = input_json["Regiao_Execucao"]
+    registro["relacao_valida"] = validar_relacao_software_regiao(
+        banco, input_json["Hardware"], input_json["Software"], input_json["Regiao_Execucao"]
+    )
+    registro["falhas"] = falhas(resultados)
+    registro["valido"] = not registro["falhas"]
+    registro["resultado"] = para_dicionarios(resultados) # Estruturado: o texto RESULTADOS só é montado para exibição
+    registro["input"] = input_json
+    registro["campos"] = resultados
+    registro["duvidosos"] = duvidosos # Campos que o motor local não decide com certeza (modo "hibrido")
+    return registro
+
+# Consulta o DeepSeek para vários inputs ao mesmo tempo, com até max_concorrencia requisições em andamento.
+# modo "explicar": explica os FAILs já decididos localmente (só para inputs com falha)
+# modo "analisar": repete a validação completa pela IA, como na versão original da ferramenta
+# modo "hibrido": só os campos duvidosos para o motor local vão para a IA (só para inputs que tenham algum)
+# Respostas já presentes no cache persistente não geram nova chamada à API.
+# No modo "analisar" a resposta é convertida em ResultadoCampo, guardada assim no cache e comparada com o motor local.
+# Com tamanho_lote > 1, o modo "analisar" junta vários inputs do mesmo hardware por requisição (analisar_em_lotes).
+def consultar_ia_lote(banco, registros, modo, max_concorrencia=4, taxa_por_segundo=None, cache=None, tamanho_lote=1):
+    limitador = LimitadorTaxa(taxa_por_segundo) if taxa_por_segundo else None
+    configurar_cliente(tamanho_pool=max_concorrencia) # Uma conexão reaproveitável para cada requisição em andamento
+    if modo == "explicar":
+        alvos = [r for r in registros if not r["erro"] and not r["valido"]]
+    elif modo == "hibrido":
+        alvos = [r for r in registros if not r["erro"] and r["duvidosos"]]
+    else:
+        alvos = [r for r in registros if not r["erro"]]
+
+    versao_prompt = {"explicar": VERSAO_PROMPT_EXPLICACAO, "hibrido": VERSAO_PROMPT_HIBRIDO}.get(modo, VERSAO_PROMPT_ANALISE)
+    pendentes = []
+    for registro in alvos:
+        chave = gerar_chave_cache(registro["input"], banco, MODELO_DEEPSEEK, versao_prompt)
+        resposta = cache.get(chave) if cache else None
+        if resposta:
+            registrar_resposta(registro, resposta if modo == "explicar" else de_json(resposta), modo)
+        else:
+            pendentes.append((registro, chave))
+
+    if modo == "analisar" and tamanho_lote > 1:
+        respostas = analisar_em_lotes(banco, [r for r, _ in pendentes], tamanho_lote, limitador, max_concorrencia)
+    else:
+        if modo == "explicar":
+            argumentos = [(banco, r["input"], formatar_resultados(r["campos"]), limitador) for r, _ in pendentes]
+            funcao = explicar_deepseek
+        elif modo == "hibrido":
+            argumentos = [(banco, r["input"], r["campos"], r["duvidosos"], limitador) for r, _ in pendentes]
+            funcao = completar_com_deepseek
+        else:
+            argumentos = [(banco, r["input"], limitador) for r, _ in pendentes]
+            funcao = analisar_deepseek
+        for registro, _ in pendentes:
+            registro["tokens_prompt"] = relatorio_tokens_prompt(banco, registro["input"])
+        respostas = executar_em_paralelo(funcao, argumentos, max_concorrencia)
+
+    for (registro, chave), resposta in zip(pendentes, respostas):
+        if modo == "analisar" and isinstance(resposta, str) and not resposta.startswith("ERRO"):
+            resposta = interpretar_resultados(resposta, ORIGEM_DEEPSEEK) or resposta
+        if isinstance(resposta, str) and (modo == "analisar" or resposta.startswith("ERRO")):
+            registro["resposta_deepseek"] = resposta # Erros de rede e respostas fora do formato não ficam no cache
+            continue
+        registrar_resposta(registro, resposta, modo)
+        if modo == "hibrido" and any(r.origem == ORIGEM_LOCAL_INCERTO for r in resposta):
+            continue # A IA não respondeu: o resultado local incerto não fica no cache
+        if cache:
+            cache.add(chave, resposta if modo == "explicar" else para_json(resposta))
+
+# Modo "analisar" em lote: agrupa os inputs por hardware e manda até tamanho_lote inputs por requisição,
+# repetindo o prompt de sistema e o trecho do banco uma vez por grupo em vez de uma vez por input.
+# Os inputs cujo bloco não puder ser separado da resposta são refeitos em requisições individuais.
+# Devolve, na ordem dos registros, a lista de ResultadoCampo ou o texto da resposta individual (ou do erro).
+def analisar_em_lotes(banco, registros, tamanho_lote, limitador=None, max_concorrencia=4):
+    por_hardware = {}
+    for posicao, registro in enumerate(registros):
+        por_hardware.setdefault(registro["hardware"], []).append(posicao)
+    grupos = []
+    for posicoes in por_hardware.values():
+        grupos.extend(posicoes[i:i + tamanho_lote] for i in range(0, len(posicoes), tamanho_lote))
+
+    # IDs curtos (posição no grupo) economizam tokens e são fáceis de achar na resposta
+    lotes = [[(str(n), registros[posicao]["input"]) for n, posicao in enumerate(grupo, 1)] for grupo in grupos]
+    for grupo, itens in zip(grupos, lotes):
+        for posicao, relatorio in zip(grupo, relatorio_tokens_lote(banco, itens)):
+            registros[posicao]["tokens_prompt"] = relatorio
+    respostas_lote = executar_em_paralelo(
+        analisar_lote_deepseek, [(banco, itens, limitador) for itens in lotes], max_concorrencia
+    )
+
+    respostas = [None] * len(registros)
+    for grupo, itens, resposta in zip(grupos, lotes, respostas_lote):
+        blocos = {} if resposta.startswith("ERRO") else dividir_resposta_lote(resposta, {id_input for id_input, _ in itens})
+        for posicao, (id_input, _) in zip(grupo, itens):
+            if id_input in blocos:
+                respostas[posicao] = blocos[id_input]
+                registros[posicao]["lote"] = len(itens)
+            elif resposta.startswith("ERRO"):
+                respostas[posicao] = resposta
+
+    # Reserva: requisições individuais para os inputs que ficaram sem bloco válido
+    faltantes = [posicao for posicao, resposta in enumerate(respostas) if resposta is None]
+    for posicao in faltantes:
+        registros[posicao]["tokens_prompt"] = relatorio_tokens_prompt(banco, registros[posicao]["input"])
+    individuais = executar_em_paralelo(
+        analisar_deepseek, [(banco, registros[posicao]["input"], limitador) for posicao in faltantes], max_concorrencia
+    )
+    for posicao, resposta in zip(faltantes, individuais):
+        respostas[posicao] = resposta
+    return respostas
+
+# Guarda a resposta no registro. No modo "hibrido" ela substitui o resultado local;
+# no "analisar" os resultados estruturados da IA geram a lista de divergências com o motor local.
+def registrar_resposta(registro, resposta, modo):
+    if isinstance(resposta, str):
+        registro["resposta_deepseek"] = resposta
+        return
+    if modo == "hibrido":
+        # Da resposta só valem os campos duvidosos; os demais continuam como decididos localmente (ou por correção)
+        da_ia = {r.campo: r for r in resposta}
+        resposta = [da_ia.get(r.campo, r) if r.campo in registro["duvidosos"] else r for r in registro["campos"]]
+        registro["campos"] = resposta
+        registro["resultado"] = para_dicionarios(resposta)
+        registro["falhas"] = falhas(resposta)
+        registro["valido"] = not registro["falhas"]
+        return
+    registro["resposta_deepseek"] = para_dicionarios(resposta)
+    registro["divergencias"] = [
+        {"campo": campo, "local": local, "deepseek": deepseek}
+        for campo, local, deepseek in comparar_resultados(registro["campos"], resposta)
+    ]
+
+# Valida todos os itens (nome, conteúdo). Com colunar, as regras são avaliadas de uma vez para todos os inputs
+# (validacao_colunar.py) e só os valores e esperados são montados input a input.
+# colunar=None escolhe sozinho: colunar se o NumPy estiver instalado e houver pelo menos LIMIAR_COLUNAR inputs.
+# Os itens são consumidos em sequência: o conteúdo de cada arquivo é descartado depois de lido.
+def validar_todos(indice, itens, correcoes=None, colunar=None):
+    itens = iter(itens)
+    if colunar is None:
+        # Só os primeiros LIMIAR_COLUNAR itens são lidos antes da escolha
+        inicio = list(islice(itens, LIMIAR_COLUNAR))
+        colunar = NUMPY_DISPONIVEL and len(inicio) >= LIMIAR_COLUNAR
+        itens = chain(inicio, itens)
+    if not colunar:
+        return [validar_input(indice, nome, conteudo, correcoes) for nome, conteudo in itens]
+
+    with metricas.cronometrar("validacao_colunar"):
+        inicio = time.perf_counter()
+        lidos = [(nome, resumo_conteudo(conteudo), *ler_input(conteudo)) for nome, conteudo in itens]
+        matriz = avaliar_colunar(indice, [input_json for _, _, input_json, erro in lidos if not erro])
+        linhas = iter(matriz.tolist())
+        registros = [
+            {"arquivo": nome, "erro": erro} if erro else
+            montar_registro(indice, nome, input_json, correcoes, next(linhas))
+            for nome, _, input_json, erro in lidos
+        ]
+        # Os inputs são avaliados juntos: a latência de cada um é a média do conjunto
+        latencia_ms = (time.perf_counter() - inicio) * 1000 / max(1, len(registros))
+        for registro, (_, resumo, _, _) in zip(registros, lidos):
+            registro.update(hash=resumo, motor=MOTOR_COLUNAR, latencia_ms=latencia_ms)
+        return registros
+
+# --- Validação em vários processos ---
+# O GIL limita a validação local a um núcleo. Aqui os inputs são lidos em blocos de ITENS_POR_BLOCO,
+# cada bloco é dividido em fatias por hardware (os inputs de um hardware no bloco ficam na mesma fatia)
+# e as fatias são validadas por um pool de processos. O próximo bloco só é lido quando o anterior está
+# quase todo validado, então no máximo dois blocos de conteúdo ficam na memória. Onde existe fork
+# (Linux), os processos herdam do processo principal o índice do banco, as tabelas colunares e as correções
+# já carregados (cópia sob demanda), sem reler o software_db.json; nos demais sistemas cada processo
+# lê o banco uma única vez ao iniciar. Os resultados das fatias voltam na ordem original dos inputs.
+
+_HARDWARE = re.compile(rb'"Hardware"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+def _hardware_do_conteudo(conteudo):
+    # Só agrupa as fatias: um input fora do padrão cai na fatia de "sem hardware" e é validado normalmente
+    encontrado = _HARDWARE.search(conteudo)
+    return encontrado.group(1) if encontrado else None
+
+def dividir_por_hardware(itens, quantidade):
+    """Divide os itens (nome, conteúdo) em até quantidade fatias, mantendo cada hardware inteiro em uma fatia
+    e equilibrando o número de inputs (o maior grupo vai para a fatia mais vazia). Devolve listas de posições."""
+    grupos = {}
+    for posicao, (_, conteudo) in enumerate(itens):
+        grupos.setdefault(_hardware_do_conteudo(conteudo), []).append(posicao)
+    fatias = [[] for _ in range(max(1, quantidade))]
+    for grupo in sorted(grupos.values(), key=len, reverse=True):
+        min(fatias, key=len).extend(grupo)
+    return [fatia for fatia in fatias if fatia]
+
+_processo = {} # Estado de cada processo do pool: índice, correções, modo colunar e se a IA vai ser consultada
+CAMPOS_SO_PARA_IA = ("input", "campos", "duvidosos") # Usados só por consultar_ia_lote
+
+def _iniciar_processo(caminho_banco, correcoes, colunar, para_ia):
+    # Com fork, obter_indice encontra o índice herdado do processo principal e não relê o arquivo
+    _processo.update(indice=obter_indice(caminho_banco), correcoes=correcoes, colunar=colunar, para_ia=para_ia)
+
+def _validar_fatia(itens):
+    metricas.zerar() # Cada fatia devolve só as próprias métricas, somadas depois no processo principal
+    registros = validar_todos(_processo["indice"], itens, _processo["correcoes"], _processo["colunar"])
+    if not _processo["para_ia"]:
+        # Os registros voltam serializados (pickle) e são lidos um a um no processo principal:
+        # sem a IA, os campos que só ela usa custariam mais que a própria validação
+        for registro in registros:
+            for campo in CAMPOS_SO_PARA_IA:
+                registro.pop(campo, None)
+    return registros, metricas.retrato()
+
+def validar_em_processos(caminho_banco, itens, correcoes=None, processos=None, colunar=None, para_ia=True):
+    """Como validar_todos, em processos paralelos (processos=None: um por núcleo).
+    para_ia=False descarta dos registros os campos usados só na consulta à IA."""
+    itens = iter(itens)
+    processos = processos or os.cpu_count() or 1
+    bloco = list(islice(itens, ITENS_POR_BLOCO))
+    if colunar is None:
+        colunar = NUMPY_DISPONIVEL and len(bloco) >= LIMIAR_COLUNAR
+    indice = obter_indice(caminho_banco)
+    if colunar:
+        obter_tabelas(indice) # Compiladas antes de criar os processos, para serem herdadas
+
+    quantidade = processos * FATIAS_POR_PROCESSO
+    registros = []
+    pendentes = deque() # (posições da fatia, resultado assíncrono), na ordem de envio
+
+    def recolher():
+        fatia, pendente = pendentes.popleft()
+        registros_fatia, retrato = pendente.get()
+        for posicao, registro in zip(fatia, registros_fatia):
+            registros[posicao] = registro
+        metricas.mesclar(retrato)
+
+    metodo = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    contexto = multiprocessing.get_context(metodo)
+    fatias = dividir_por_hardware(bloco, quantidade)
+    with contexto.Pool(min(processos, len(fatias) or 1), _iniciar_processo,
+                       (caminho_banco, correcoes, colunar, para_ia)) as pool:
+        while bloco:
+            inicio = len(registros)
+            registros.extend([None] * len(bloco))
+            for fatia in fatias:
+                pendentes.append((
+                    [inicio + posicao for posicao in fatia],
+                    pool.apply_async(_validar_fatia, ([bloco[posicao] for posicao in fatia],))
+                ))
+            while len(pendentes) > quantidade: # Espera o bloco anterior antes de ler o próximo
+                recolher()
+            bloco = list(islice(itens, ITENS_POR_BLOCO))
+            fatias = dividir_por_hardware(bloco, quantidade)
+        while pendentes:
+            recolher()
+    return registros
+
+def executar_lote(caminhos, caminho_banco=BANCO_PADRAO, modo_ia=None, max_concorrencia=4, taxa_por_segundo=None,
+                  caminho_cache=CACHE_DB_PADRAO, tamanho_lote=1, caminho_feedback=FEEDBACK_DB_PADRAO, colunar=None,
+                  processos=1, caminho_historico=HISTORICO_DB_PADRAO):
+    indice = obter_indice(caminho_banco)
+    banco = indice.banco
+    correcoes = CacheCorrecoes(RegistroFeedback(caminho_feedback)) if caminho_feedback else None
+    if processos == 1:
+        registros = validar_todos(indice, iterar_inputs(caminhos), correcoes, colunar)
+    else:
+        registros = validar_em_processos(caminho_banco, iterar_inputs(caminhos), correcoes, processos or None, colunar,
+                                         bool(modo_ia))
+    if modo_ia:
+        cache = ResultCachePersistente(caminho_cache) if caminho_cache else None
+        consultar_ia_lote(banco, registros, modo_ia, max_concorrencia, taxa_por_segundo, cache, tamanho_lote)
+    for registro in registros:
+        for campo in CAMPOS_SO_PARA_IA:
+            registro.pop(campo, None)
+    if caminho_historico:
+        # Gravado depois da IA: o histórico guarda os vereditos finais
+        HistoricoResultados(caminho_historico).registrar(registros, indice.impressao_digital, "lote", caminho_banco, modo_ia)
+    return registros
+
+def salvar_resultados(registros, caminho_saida):
+    dados = {
+        "gerado_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "total": len(registros),
+        "validos": sum(1 for r in registros if r.get("valido")),
+        "erros": sum(1 for r in registros if r["erro"]),
+        "metricas": metricas.retrato(),
+        "resultados": registros
+    }
+    with open(caminho_saida, "w", encoding="utf-8") as f:
+        json.dump(dados, f, indent=2, ensure_ascii=False)
+    return dados
+
+# Resumo de um registro para a saída no terminal: PASS, FAIL com os campos ou ERRO com a mensagem
+def situacao(registro):
+    if registro["erro"]:
+        texto = f"ERRO ({registro['erro']})"
+    elif registro["valido"]:
+        texto = "PASS"
+    else:
+        texto = "FAIL " + ", ".join(registro["falhas"])
+    if registro.get("divergencias"):
+        texto += " | DeepSeek diverge em " + ", ".join(d["campo"] for d in registro["divergencias"])
+    return texto
+
+# Uma linha por etapa executada e os contadores diferentes de zero
+def resumo_metricas(retrato):
+    linhas = ["Tempo por etapa:"]
+    for etapa, medida in retrato["etapas"].items():
+        if medida["n"]:
+            linhas.append(f"  {etapa}: {medida['n']}x, total {medida['total_s']:.3f} s, "
+                          f"média {medida['media_ms']:.3f} ms, máx {medida['max_ms']:.3f} ms")
+    contadores = {nome: valor for nome, valor in retrato["contadores"].items() if valor}
+    if contadores:
+        linhas.append("Contadores: " + ", ".join(f"{nome} {valor}" for nome, valor in contadores.items()))
+    return "\n".join(linhas)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Valida em lote arquivos de input (pastas, padrões glob ou .zip).")
+    parser.add_argument("caminhos", nargs="+", help="Pastas, arquivos .json, padrões glob ou arquivos .zip")
+    parser.add_argument("--banco", default=BANCO_PADRAO, help="Banco de dados técnico (padrão: software_db.json)")
+    parser.add_argument("--saida", default=SAIDA_PADRAO, help="Arquivo JSON de resultados (padrão: resultados_lote.json)")
+    parser.add_argument("--ia", choices=["explicar", "analisar", "hibrido"],
+                        help="Consulta também o DeepSeek: explicar os FAILs, analisar tudo pela IA ou só os campos duvidosos (hibrido)")
+    parser.add_argument("--concorrencia", type=int, default=4, help="Máximo de requisições ao DeepSeek em andamento (padrão: 4)")
+    parser.add_argument("--taxa", type=float, help="Limite de requisições por segundo ao DeepSeek (padrão: sem limite)")
+    parser.add_argument("--url-base", help="Endereço base da API (ex: http://127.0.0.1:8765/v1 para o servidor_mock_deepseek.py)")
+    parser.add_argument("--lote", type=int, default=1, help="Com --ia analisar: inputs do mesmo hardware por requisição (padrão: 1)")
+    parser.add_argument("--cache", default=CACHE_DB_PADRAO, help="Cache persistente das respostas do DeepSeek (padrão: cache_resultados.db)")
+    parser.add_argument("--sem-cache", action="store_true", help="Não usa o cache persistente")
+    parser.add_argument("--feedback", default=FEEDBACK_DB_PADRAO, help="Registro de feedbacks com as correções a aplicar (padrão: feedback_logs.db)")
+    parser.add_argument("--sem-correcoes", action="store_true", help="Não aplica as correções enviadas como feedback")
+    parser.add_argument("--colunar", action="store_true", default=None,
+                        help=f"Valida todos os inputs de uma vez, em colunas (requer NumPy; automático a partir de {LIMIAR_COLUNAR} inputs)")
+    parser.add_argument("--sem-colunar", dest="colunar", action="store_false", help="Valida sempre um input por vez")
+    parser.add_argument("--processos", type=int, default=1,
+                        help="Processos para a validação local, com os inputs divididos por hardware (0 = um por núcleo; padrão: 1)")
+    parser.add_argument("--historico", default=HISTORICO_DB_PADRAO, help="Histórico de resultados consultável com historico_resultados.py (padrão: historico_resultados.db)")
+    parser.add_argument("--sem-historico", action="store_true", help="Não grava esta execução no histórico")
+    parser.add_argument("--metricas", help="Exporta as métricas de tempo e contadores (.prom/.txt: formato Prometheus; demais: JSON)")
+    args = parser.parse_args(argv)
+    if args.url_base:
+        configurar_cliente(url_base=args.url_base)
+    if args.colunar and not NUMPY_DISPONIVEL:
+        print("A validação colunar requer o NumPy (pip install numpy).", file=sys.stderr)
+        return 2
+
+    try:
+        obter_indice(args.banco) # Fica no cache de índices: executar_lote não relê o arquivo
+    except (OSError, ValueError) as e:
+        print(f"Erro ao ler banco de dados: {str(e)}", file=sys.stderr)
+        return 2
+    try:
+        registros = executar_lote(args.caminhos, args.banco, args.ia, args.concorrencia, args.taxa,
+                                  None if args.sem_cache else args.cache, args.lote,
+                                  None if args.sem_correcoes else args.feedback, args.colunar, args.processos,
+                                  None if args.sem_historico else args.historico)
+    except (OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+        print(f"Erro ao ler os inputs: {str(e)}", file=sys.stderr)
+        return 2
+
+    try:
+        dados = salvar_resultados(registros, args.saida)
+    except OSError as e:
+        print(f"Erro ao gravar os resultados em {args.saida}: {str(e)}", file=sys.stderr)
+        return 2
+    for registro in registros:
+        print(f"{registro['arquivo']}: {situacao(registro)}")
+    com_tokens = [r["tokens_prompt"] for r in registros if "tokens_prompt" in r]
+    if com_tokens:
+        antes = sum(t["tokens_antes"] for t in com_tokens)
+        depois = sum(t["tokens_depois"] for t in com_tokens)
+        print(f"\nTokens de prompt (estimados): {antes} com o banco inteiro -> {depois} com o recorte do hardware")
+    if args.ia == "hibrido":
+        origens = {}
+        for registro in registros:
+            for campo in registro.get("resultado", []):
+                origens[campo["origem"]] = origens.get(campo["origem"], 0) + 1
+        print("\nCampos decididos por: " + ", ".join(f"{origem} ({n})" for origem, n in origens.items()))
+    print("\n" + resumo_metricas(dados["metricas"]))
+    if args.metricas:
+        metricas.exportar(args.metricas)
+        print(f"Métricas exportadas em {args.metricas}")
+    print(f"\n{dados['total']} inputs, {dados['validos']} válidos, {dados['erros']} com erro. Resultados em {args.saida}")
+    return 0 if dados["erros"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())